@@ -1,5 +1,8 @@
+import json
+
 from django.contrib import admin
 from django.utils.html import format_html
+from . import event_log
 from .models import (
     SkillTest,
     Contest,
@@ -16,10 +19,34 @@ from .models import (
     CertificationExam,
     CertificationSubmission,
     CertificationQuestionActivity,
-    Certificate
+    Certificate,
+    AssessmentEvent,
 )
 
 
+def event_stream_display(stream_name, description):
+    """
+    A readonly admin field listing an event stream of a submission or question
+    activity: what is stored on the row followed by the logged AssessmentEvents.
+    """
+
+    def display(self, obj):
+        if obj.pk is None:
+            return "-"
+        events = event_log.stream(obj, stream_name)
+        return format_html("<pre>{}</pre>", json.dumps(events, indent=2))
+
+    display.short_description = description
+    return display
+
+
+class BaseSubmissionAdmin(admin.ModelAdmin):
+    proctoring_events_log = event_stream_display(
+        "proctoring_events", "Proctoring events"
+    )
+    general_events_log = event_stream_display("general_events", "General events")
+
+
 @admin.register(SkillTest)
 class SkillTestAdmin(admin.ModelAdmin):
     list_display = [
@@ -143,11 +170,7 @@ class ContestAdmin(admin.ModelAdmin):
     actions = ["update_contest_status"]
 
     def update_contest_status(self, request, queryset):
-        updated = 0
-        for contest in queryset:
-            contest.update_status()
-            contest.save()
-            updated += 1
+        updated = Contest.sync_statuses(queryset)
         self.message_user(request, f"Updated status for {updated} contests.")
 
     update_contest_status.short_description = "Update contest status"
@@ -273,7 +296,7 @@ class JobTestAdmin(admin.ModelAdmin):
 
 
 @admin.register(SkillTestSubmission)
-class SkillTestSubmissionAdmin(admin.ModelAdmin):
+class SkillTestSubmissionAdmin(BaseSubmissionAdmin):
     list_display = [
         "user",
         "skill_test",
@@ -284,7 +307,14 @@ class SkillTestSubmissionAdmin(admin.ModelAdmin):
     ]
     list_filter = ["status", "skill_test__course", "started_at", "submitted_at"]
     search_fields = ["user__username", "user__email", "skill_test__title"]
-    readonly_fields = ["id", "created_at", "updated_at", "started_at"]
+    readonly_fields = [
+        "id",
+        "created_at",
+        "updated_at",
+        "started_at",
+        "proctoring_events_log",
+        "general_events_log",
+    ]
     fieldsets = (
         ("Submission Info", {"fields": ("user", "skill_test", "status")}),
         ("Timing", {"fields": ("started_at", "submitted_at", "completed_at")}),
@@ -293,7 +323,8 @@ class SkillTestSubmissionAdmin(admin.ModelAdmin):
             "Proctoring Data",
             {
                 "fields": (
-                    "proctoring_events",
+                    "proctoring_events_log",
+                    "general_events_log",
                     "browser_info",
                     "ip_address",
                     "user_agent",
@@ -312,11 +343,18 @@ class SkillTestSubmissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContestSubmission)
-class ContestSubmissionAdmin(admin.ModelAdmin):
+class ContestSubmissionAdmin(BaseSubmissionAdmin):
     list_display = ["user", "contest", "status", "marks", "started_at", "submitted_at"]
     list_filter = ["status", "contest__type", "started_at"]
     search_fields = ["user__username", "user__email", "contest__title"]
-    readonly_fields = ["id", "created_at", "updated_at", "started_at"]
+    readonly_fields = [
+        "id",
+        "created_at",
+        "updated_at",
+        "started_at",
+        "proctoring_events_log",
+        "general_events_log",
+    ]
     fieldsets = (
         ("Submission Info", {"fields": ("user", "contest", "status")}),
         ("Timing", {"fields": ("started_at", "submitted_at", "completed_at")}),
@@ -325,7 +363,8 @@ class ContestSubmissionAdmin(admin.ModelAdmin):
             "Proctoring Data",
             {
                 "fields": (
-                    "proctoring_events",
+                    "proctoring_events_log",
+                    "general_events_log",
                     "browser_info",
                     "ip_address",
                     "user_agent",
@@ -344,7 +383,7 @@ class ContestSubmissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(MockInterviewSubmission)
-class MockInterviewSubmissionAdmin(admin.ModelAdmin):
+class MockInterviewSubmissionAdmin(BaseSubmissionAdmin):
     list_display = [
         "user",
         "mock_interview",
@@ -361,7 +400,14 @@ class MockInterviewSubmissionAdmin(admin.ModelAdmin):
         "started_at",
     ]
     search_fields = ["user__username", "user__email", "mock_interview__title"]
-    readonly_fields = ["id", "created_at", "updated_at", "started_at"]
+    readonly_fields = [
+        "id",
+        "created_at",
+        "updated_at",
+        "started_at",
+        "proctoring_events_log",
+        "general_events_log",
+    ]
     fieldsets = (
         (
             "Submission Info",
@@ -373,7 +419,8 @@ class MockInterviewSubmissionAdmin(admin.ModelAdmin):
             "Proctoring Data",
             {
                 "fields": (
-                    "proctoring_events",
+                    "proctoring_events_log",
+                    "general_events_log",
                     "browser_info",
                     "ip_address",
                     "user_agent",
@@ -392,7 +439,7 @@ class MockInterviewSubmissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(JobTestSubmission)
-class JobTestSubmissionAdmin(admin.ModelAdmin):
+class JobTestSubmissionAdmin(BaseSubmissionAdmin):
     list_display = ["user", "job_test", "status", "marks", "started_at", "submitted_at"]
     list_filter = ["status", "job_test__company_name", "started_at"]
     search_fields = [
@@ -401,7 +448,14 @@ class JobTestSubmissionAdmin(admin.ModelAdmin):
         "job_test__title",
         "job_test__company_name",
     ]
-    readonly_fields = ["id", "created_at", "updated_at", "started_at"]
+    readonly_fields = [
+        "id",
+        "created_at",
+        "updated_at",
+        "started_at",
+        "proctoring_events_log",
+        "general_events_log",
+    ]
     fieldsets = (
         ("Submission Info", {"fields": ("user", "job_test", "status")}),
         ("Timing", {"fields": ("started_at", "submitted_at", "completed_at")}),
@@ -410,7 +464,8 @@ class JobTestSubmissionAdmin(admin.ModelAdmin):
             "Proctoring Data",
             {
                 "fields": (
-                    "proctoring_events",
+                    "proctoring_events_log",
+                    "general_events_log",
                     "browser_info",
                     "ip_address",
                     "user_agent",
@@ -447,11 +502,11 @@ class BaseQuestionActivityAdmin(admin.ModelAdmin):
         "id",
         "created_at",
         "updated_at",
-        "question_activities",
-        "navigation_activities",
-        "proctoring_activities",
-        "camera_snapshots",
-        "answer_history",
+        "question_activities_log",
+        "navigation_activities_log",
+        "proctoring_activities_log",
+        "camera_snapshots_log",
+        "answer_history_log",
         "answer_data",
     ]
 
@@ -461,7 +516,7 @@ class BaseQuestionActivityAdmin(admin.ModelAdmin):
         (
             "Activity Logs",
             {
-                "fields": ("question_activities", "navigation_activities"),
+                "fields": ("question_activities_log", "navigation_activities_log"),
                 "classes": ("collapse",),
             },
         ),
@@ -469,8 +524,8 @@ class BaseQuestionActivityAdmin(admin.ModelAdmin):
             "Proctoring Logs",
             {
                 "fields": (
-                    "proctoring_activities",
-                    "camera_snapshots",
+                    "proctoring_activities_log",
+                    "camera_snapshots_log",
                     "has_violations",
                     "violation_count",
                     "alert_priority",
@@ -492,7 +547,11 @@ class BaseQuestionActivityAdmin(admin.ModelAdmin):
         (
             "Answer Data",
             {
-                "fields": ("answer_data", "answer_history", "answer_attempt_count"),
+                "fields": (
+                    "answer_data",
+                    "answer_history_log",
+                    "answer_attempt_count",
+                ),
                 "classes": ("collapse",),
             },
         ),
@@ -505,6 +564,18 @@ class BaseQuestionActivityAdmin(admin.ModelAdmin):
         ),
     )
 
+    question_activities_log = event_stream_display(
+        "question_activities", "Question activities"
+    )
+    navigation_activities_log = event_stream_display(
+        "navigation_activities", "Navigation activities"
+    )
+    proctoring_activities_log = event_stream_display(
+        "proctoring_activities", "Proctoring activities"
+    )
+    camera_snapshots_log = event_stream_display("camera_snapshots", "Camera snapshots")
+    answer_history_log = event_stream_display("answer_history", "Answer history")
+
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("user", "question")
 
@@ -558,9 +629,11 @@ class CertificationExamAdmin(admin.ModelAdmin):
     )
 
 @admin.register(CertificationSubmission)
-class CertificationSubmissionAdmin(admin.ModelAdmin):
+class CertificationSubmissionAdmin(BaseSubmissionAdmin):
     list_display = ["user", "certification_exam", "status", "marks", "completed_at"]
     list_filter = ["status", "certification_exam__title"]
+    exclude = ["proctoring_events", "general_events"]
+    readonly_fields = ["proctoring_events_log", "general_events_log"]
     
 @admin.register(CertificationQuestionActivity)
 class CertificationQuestionActivityAdmin(BaseQuestionActivityAdmin):
@@ -570,3 +643,24 @@ class CertificationQuestionActivityAdmin(BaseQuestionActivityAdmin):
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ["certificate_id", "user", "course", "issued_at"]
     search_fields = ["certificate_id", "user__username", "course__name"]
+
+
+@admin.register(AssessmentEvent)
+class AssessmentEventAdmin(admin.ModelAdmin):
+    list_display = [
+        "stream",
+        "submission_type",
+        "submission_id",
+        "question_id",
+        "created_at",
+    ]
+    list_filter = ["stream", "submission_type"]
+    search_fields = ["submission_id", "question_id"]
+    readonly_fields = [
+        "submission_type",
+        "submission_id",
+        "question_id",
+        "stream",
+        "data",
+        "created_at",
+    ]
@@ -0,0 +1,103 @@
+"""
+Append-only storage for assessment activity events.
+
+log-activity events were appended to JSON lists on the submission
+(``general_events``, ``proctoring_events``) or the question activity
+(``question_activities``, ``navigation_activities``, ``proctoring_activities``,
+``camera_snapshots``, ``answer_history``) and the whole row saved, so each event
+rewrote everything logged before it and concurrent events overwrote each
+other. Events are now inserted as AssessmentEvent rows, and the counters on the
+question activity are updated with F() expressions.
+
+Readers still see the lists: stream() returns what is stored on the row (events
+from before this log existed) followed by the logged events, and loads every
+event of a submission with one query per ``cache`` dict it is given.
+"""
+from collections import defaultdict
+
+from .models import AssessmentEvent, BaseUserSubmission
+
+SUBMISSION_STREAMS = ["general_events", "proctoring_events"]
+QUESTION_STREAMS = [
+    "question_activities",
+    "navigation_activities",
+    "proctoring_activities",
+    "camera_snapshots",
+    "answer_history",
+]
+
+_submission_fields = {}
+
+
+def submission_type(submission_model):
+    return submission_model._meta.label_lower
+
+
+def event(submission, stream, data, question_id=None):
+    """An unsaved event for a submission (and question, if given)"""
+    return AssessmentEvent(
+        submission_type=submission_type(type(submission)),
+        submission_id=submission.pk,
+        question_id=question_id,
+        stream=stream,
+        data=data,
+    )
+
+
+def append(events):
+    """Insert events in order, with one query"""
+    if events:
+        AssessmentEvent.objects.bulk_create(events)
+
+
+def _submission_field(activity_model):
+    """The foreign key from a question activity model to its submission"""
+    if activity_model not in _submission_fields:
+        _submission_fields[activity_model] = next(
+            field
+            for field in activity_model._meta.fields
+            if field.is_relation
+            and field.related_model
+            and issubclass(field.related_model, BaseUserSubmission)
+        )
+    return _submission_fields[activity_model]
+
+
+def owner(obj):
+    """(submission_type, submission_id, question_id) of a submission or activity"""
+    if isinstance(obj, BaseUserSubmission):
+        return submission_type(type(obj)), obj.pk, None
+    field = _submission_field(type(obj))
+    return (
+        submission_type(field.related_model),
+        getattr(obj, field.attname),
+        obj.question_id,
+    )
+
+
+def load(submission_type_label, submission_id):
+    """{(question_id or None, stream): [event data, ...]} in insertion order"""
+    events = defaultdict(list)
+    rows = AssessmentEvent.objects.filter(
+        submission_type=submission_type_label, submission_id=submission_id
+    ).values_list("question_id", "stream", "data")
+    for question_id, stream_name, data in rows:
+        events[(question_id, stream_name)].append(data)
+    return events
+
+
+def stream(obj, stream_name, cache=None):
+    """
+    The full event list ``stream_name`` of a submission or question activity.
+
+    ``cache`` (any dict, e.g. a serializer context) keeps the loaded events of
+    each submission, so serializing a submission with all its question
+    activities reads the log once.
+    """
+    submission_type_label, submission_id, question_id = owner(obj)
+    cache = {} if cache is None else cache
+    key = ("assessment_events", submission_type_label, submission_id)
+    if key not in cache:
+        cache[key] = load(submission_type_label, submission_id)
+    stored = getattr(obj, stream_name) or []
+    return list(stored) + cache[key].get((question_id, stream_name), [])
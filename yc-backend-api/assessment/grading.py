@@ -0,0 +1,186 @@
+"""
+Bulk grading for assessment submissions.
+
+The SkillTest, Contest and CertificationExam ``submit`` actions all grade a set
+of answers against the question bank. Doing that one question at a time costs
+a query to load each question and two more to upsert its activity, which adds
+up when a whole cohort submits at once. Here the questions are loaded with a
+single ``id__in`` query, and the question activities are written with one
+bulk_create and one bulk_update.
+
+MCQs are graded against an answer key: the frozenset of correct option texts
+(only the first one for single-choice questions) plus the question's marks. Question.save() stores the sorted correct texts in
+``mcq_answer_key``, so grading only needs a few narrow columns, and compiled
+keys are kept in a process-local LRU keyed by question id and ``updated_at``;
+grading an answer is then a set lookup.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from course.models import Question
+
+MCQ_TYPES = ("mcq_single", "mcq_multiple")
+
+# Columns needed to grade a question and attach activities to it
+GRADING_FIELDS = ["id", "type", "marks", "mcq_answer_key", "updated_at"]
+
+ACTIVITY_UPDATE_FIELDS = [
+    "answer_data",
+    "is_final_answer",
+    "is_correct",
+    "marks_obtained",
+    "auto_graded",
+    "updated_at",
+]
+
+
+class GradedAnswer(NamedTuple):
+    question_id: Any  # as given by the client
+    question: Question
+    answer: Any
+    is_correct: bool
+    marks_obtained: int
+
+
+class AnswerKey(NamedTuple):
+    correct: frozenset
+    marks: int
+
+
+_keys = OrderedDict()
+_keys_lock = threading.Lock()
+
+
+def answer_key(question):
+    """The compiled AnswerKey of an MCQ question"""
+    cache_key = (question.id, question.updated_at)
+    with _keys_lock:
+        key = _keys.get(cache_key)
+        if key is not None:
+            _keys.move_to_end(cache_key)
+            return key
+
+    texts = question.mcq_answer_key
+    if texts is None:
+        # Saved without going through Question.save()
+        texts = question.build_answer_key() or []
+    key = AnswerKey(frozenset(texts), question.marks)
+
+    with _keys_lock:
+        _keys[cache_key] = key
+        while len(_keys) > settings.MCQ_ANSWER_KEY_CACHE_SIZE:
+            _keys.popitem(last=False)
+    return key
+
+
+def grade_answer(question, answer, strict=True):
+    """
+    (is_correct, marks_obtained) for one answer; only MCQs are auto-graded.
+
+    strict=False grades multiple-choice answers the way contests always have:
+    any scalar answer is one chosen option, even a falsy one, and a question
+    without correct options is answered by choosing none of them.
+    """
+    if question.type not in MCQ_TYPES:
+        return False, 0
+    key = answer_key(question)
+
+    if question.type == "mcq_single":
+        is_correct = any(answer == text for text in key.correct)
+    else:
+        if isinstance(answer, list):
+            chosen = set(answer)
+        elif answer or not strict:
+            chosen = {answer}
+        else:
+            chosen = set()
+        is_correct = chosen == key.correct and (bool(key.correct) or not strict)
+    return is_correct, key.marks if is_correct else 0
+
+
+def load_questions(question_ids):
+    """{str(question id): Question} in one query; unknown ids are left out"""
+    return {
+        str(question.id): question
+        for question in Question.objects.filter(id__in=list(question_ids)).only(
+            *GRADING_FIELDS
+        )
+    }
+
+
+def grade_answers(answers, question_ids=None, strict=True):
+    """
+    Grade ``answers`` ({question id: answer}) against the question bank.
+
+    ``question_ids`` defaults to the answered questions; pass a larger list to
+    also grade questions left unanswered; ``strict`` is passed to grade_answer.
+    Returns GradedAnswer tuples in the order of ``question_ids``, skipping ids
+    with no matching question.
+    """
+    if question_ids is None:
+        question_ids = list(answers)
+    questions = load_questions(question_ids)
+
+    graded = []
+    for question_id in question_ids:
+        question = questions.get(str(question_id))
+        if question is None:
+            continue
+        answer = answers.get(question_id)
+        is_correct, marks = grade_answer(question, answer, strict)
+        graded.append(GradedAnswer(question_id, question, answer, is_correct, marks))
+    return graded
+
+
+def total_marks(graded):
+    return sum(result.marks_obtained for result in graded)
+
+
+def save_activities(
+    activity_model, submission_field, submission, user, graded, answer_data, auto_graded
+):
+    """
+    Store one final question activity per graded answer for a submission.
+
+    ``answer_data(result)`` and ``auto_graded(result)`` give the stored payload
+    and auto_graded flag of each GradedAnswer. Existing activities of the user
+    for the submission are updated in place, the rest are created.
+    """
+    existing = {
+        activity.question_id: activity
+        for activity in activity_model.objects.filter(
+            **{submission_field: submission},
+            user=user,
+            question_id__in=[result.question.id for result in graded],
+        )
+    }
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for result in graded:
+        activity = existing.get(result.question.id)
+        if activity is None:
+            activity = activity_model(
+                **{submission_field: submission}, question=result.question, user=user
+            )
+            to_create.append(activity)
+        else:
+            activity.updated_at = now
+            to_update.append(activity)
+        activity.answer_data = answer_data(result)
+        activity.is_final_answer = True
+        activity.is_correct = result.is_correct
+        activity.marks_obtained = result.marks_obtained
+        activity.auto_graded = auto_graded(result)
+
+    with transaction.atomic():
+        if to_update:
+            activity_model.objects.bulk_update(to_update, ACTIVITY_UPDATE_FIELDS)
+        if to_create:
+            activity_model.objects.bulk_create(to_create)
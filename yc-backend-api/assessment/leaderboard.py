@@ -0,0 +1,226 @@
+"""
+Contest leaderboards.
+
+ContestViewSet.leaderboard is polled by every participant during a live
+contest, so boards are not rebuilt per request. A board is a sorted set in the
+store of core.sorted_sets (Redis when CACHE_URL is set), with the ranked
+entries and each user's member in two hashes next to it:
+
+- the score of a member is -marks and the member is "<submitted_at>|<user_id>",
+  so equal scores are ordered by submission time like Redis orders them, by
+  member. Placing a submission, a page of the board and a user's rank are
+  O(log n) ZADD, ZRANGE and ZRANK commands;
+- a submitted or re-graded ContestSubmission moves its member in one
+  transaction on the user's entry (see assessment/signals.py), so concurrent
+  submissions do not overwrite each other;
+- every change bumps the board's version, which makes up the ETag of the
+  leaderboard responses;
+- the board is rebuilt from the database, in one query, at most every
+  CONTEST_LEADERBOARD_REBUILD_SECONDS, which picks up changes made without the
+  signals (e.g. queryset updates) and any submission saved while the rebuild
+  was reading.
+"""
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.sorted_sets import get_client, text
+
+from .models import ContestSubmission
+
+KEY_PREFIX = "contest_leaderboard"
+
+RANKED_STATUSES = [
+    ContestSubmission.STATUS_SUBMITTED,
+    ContestSubmission.STATUS_COMPLETED,
+]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_NOT_SUBMITTED = "9" * 20
+
+
+class _Keys:
+    def __init__(self, contest_id):
+        prefix = f"{KEY_PREFIX}:{contest_id}"
+        self.ranks = f"{prefix}:ranks"
+        self.entries = f"{prefix}:entries"
+        self.members = f"{prefix}:members"
+        self.version = f"{prefix}:version"
+        self.built = f"{prefix}:built"
+
+    @property
+    def data(self):
+        return [self.ranks, self.entries, self.members, self.version]
+
+
+def _score(marks):
+    return -float(marks or 0)
+
+
+def _member(submitted_at, user_id):
+    if submitted_at is None:
+        stamp = _NOT_SUBMITTED
+    else:
+        stamp = f"{(submitted_at - _EPOCH).total_seconds():020.6f}"
+    return f"{stamp}|{user_id}"
+
+
+def _avatar(user):
+    return user.avatar.url if hasattr(user, "avatar") and user.avatar else None
+
+
+def _entry(user, marks, started_at, submitted_at):
+    """A board entry as stored, in the JSON the API renders"""
+    return json.dumps(
+        {
+            "user": f"{user.first_name} {user.last_name}".strip() or user.username,
+            "avatar": _avatar(user),
+            "score": float(marks) if marks is not None else None,
+            "time_taken": (
+                str(submitted_at - started_at) if submitted_at and started_at else None
+            ),
+            "submitted_at": submitted_at,
+        },
+        cls=JSONEncoder,
+    )
+
+
+class Board:
+    """One contest's board as of ``etag``; rank is position + 1"""
+
+    def __init__(self, contest_id, etag):
+        self.keys = _Keys(contest_id)
+        self.etag = etag
+
+    def __len__(self):
+        return get_client().zcard(self.keys.ranks)
+
+    def page(self, offset=0, limit=None):
+        if limit == 0:
+            return []
+        client = get_client()
+        end = -1 if limit is None else offset + limit - 1
+        user_ids = [
+            text(member).split("|")[1]
+            for member in client.zrange(self.keys.ranks, offset, end)
+        ]
+        if not user_ids:
+            return []
+        entries = client.hmget(self.keys.entries, user_ids)
+        return [
+            {"rank": offset + i + 1, **json.loads(text(entry))}
+            for i, entry in enumerate(entries)
+            # Dropped between the two reads
+            if entry is not None
+        ]
+
+    def rank_of(self, user_id):
+        """The user's ranked entry, or None if they have not submitted"""
+        client = get_client()
+        member = client.hget(self.keys.members, str(user_id))
+        if member is None:
+            return None
+        rank, entry = (
+            client.pipeline()
+            .zrank(self.keys.ranks, text(member))
+            .hget(self.keys.entries, str(user_id))
+            .execute()
+        )
+        if rank is None or entry is None:
+            return None
+        return {"rank": rank + 1, **json.loads(text(entry))}
+
+
+def build(contest_id):
+    """Rank every submitted entry of a contest from the database"""
+    submissions = ContestSubmission.objects.filter(
+        contest_id=contest_id, status__in=RANKED_STATUSES
+    ).select_related("user")
+    ranks, entries, members = {}, {}, {}
+    for submission in submissions:
+        user_id = str(submission.user_id)
+        member = _member(submission.submitted_at, user_id)
+        ranks[member] = _score(submission.marks)
+        members[user_id] = member
+        entries[user_id] = _entry(
+            submission.user,
+            submission.marks,
+            submission.started_at,
+            submission.submitted_at,
+        )
+
+    keys = _Keys(contest_id)
+    built = f"{time.time():.6f}"
+    rebuild_seconds = settings.CONTEST_LEADERBOARD_REBUILD_SECONDS
+    pipe = get_client().pipeline()
+    pipe.delete(*keys.data)
+    if ranks:
+        pipe.zadd(keys.ranks, ranks)
+        pipe.hset(keys.entries, mapping=entries)
+        pipe.hset(keys.members, mapping=members)
+    pipe.set(keys.version, 0)
+    # Boards nobody reads any more expire after the next rebuild is due
+    for key in keys.data:
+        pipe.expire(key, 2 * rebuild_seconds)
+    pipe.set(keys.built, built, ex=rebuild_seconds)
+    pipe.execute()
+    return built, 0
+
+
+def get_board(contest_id):
+    """The contest's current board, rebuilt first if it is due"""
+    keys = _Keys(contest_id)
+    built, version = get_client().pipeline().get(keys.built).get(keys.version).execute()
+    if (
+        built is None
+        or time.time() - float(text(built))
+        >= settings.CONTEST_LEADERBOARD_REBUILD_SECONDS
+    ):
+        built, version = build(contest_id)
+    return Board(contest_id, f'"{text(built)}-{text(version) or 0}"')
+
+
+def record_submission(submission):
+    """Place, move or drop a submission on its contest's board"""
+    keys = _Keys(submission.contest_id)
+    user_id = str(submission.user_id)
+    ranked = submission.status in RANKED_STATUSES
+    if ranked:
+        member = _member(submission.submitted_at, user_id)
+        entry = _entry(
+            submission.user,
+            submission.marks,
+            submission.started_at,
+            submission.submitted_at,
+        )
+
+    def update(pipe):
+        if pipe.get(keys.built) is None:
+            # Built from the database on the next read
+            return
+        previous = pipe.hget(keys.members, user_id)
+        if previous is None and not ranked:
+            return
+        pipe.multi()
+        if previous is not None:
+            pipe.zrem(keys.ranks, text(previous))
+        if ranked:
+            pipe.zadd(keys.ranks, {member: _score(submission.marks)})
+            pipe.hset(keys.entries, user_id, entry)
+            pipe.hset(keys.members, user_id, member)
+        else:
+            pipe.hdel(keys.entries, user_id)
+            pipe.hdel(keys.members, user_id)
+        pipe.incr(keys.version)
+
+    # Retried if another update of the board lands in between
+    get_client().transaction(update, keys.members, keys.built)
+
+
+def discard(contest_id):
+    """Drop the contest's board so the next read rebuilds it"""
+    keys = _Keys(contest_id)
+    get_client().delete(*keys.data, keys.built)
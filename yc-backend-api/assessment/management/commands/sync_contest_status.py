@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from assessment.models import Contest
+
+
+class Command(BaseCommand):
+    help = "Store the schedule-derived status of every contest (run periodically)"
+
+    def handle(self, *args, **options):
+        updated = Contest.sync_statuses()
+        self.stdout.write(self.style.SUCCESS(f"Updated status for {updated} contests."))
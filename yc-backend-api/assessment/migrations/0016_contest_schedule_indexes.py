@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assessment", "0015_certificationexam_end_datetime_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contest",
+            index=models.Index(
+                fields=["start_datetime", "end_datetime"],
+                name="assessment__start_d_2fd75b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contest",
+            index=models.Index(
+                fields=["end_datetime"], name="assessment__end_dat_be2819_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assessment", "0016_contest_schedule_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssessmentEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "submission_type",
+                    models.CharField(
+                        help_text="Submission model label, e.g. assessment.skilltestsubmission",
+                        max_length=100,
+                    ),
+                ),
+                ("submission_id", models.UUIDField()),
+                (
+                    "question_id",
+                    models.UUIDField(
+                        blank=True, help_text="Set for question-level events", null=True
+                    ),
+                ),
+                (
+                    "stream",
+                    models.CharField(
+                        choices=[
+                            ("general_events", "General Events"),
+                            ("proctoring_events", "Proctoring Events"),
+                            ("question_activities", "Question Activities"),
+                            ("navigation_activities", "Navigation Activities"),
+                            ("proctoring_activities", "Proctoring Activities"),
+                            ("camera_snapshots", "Camera Snapshots"),
+                            ("answer_history", "Answer History"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("data", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["submission_type", "submission_id", "id"],
+                        name="assessment__submiss_23f15b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,16 +1,125 @@
 import os
 import time
+import uuid
+from collections import Counter
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from .models import BaseQuestionActivity
+from . import event_log
 from rest_framework import permissions
 from rest_framework.decorators import action
-import requests
+from core.executor_client import get_executor_client
+from course.models import Question
+from course import plagiarism_index
 import json
 
+VIOLATION_TYPES = [
+    "copy_detected",
+    "paste_detected",
+    "right_click_detected",
+    "keyboard_shortcut",
+    "face_not_detected",
+    "multiple_faces_detected",
+    "face_recognition_failed",
+    "suspicious_movement",
+    "audio_anomaly",
+    "suspicious_activity",
+    "device_change",
+    "external_monitor",
+]
+
+
+class ActivityChanges:
+    """
+    What a run of events does to one question activity: counter increments and
+    field values to write with a single UPDATE, plus the events to log.
+    """
+
+    def __init__(self, record):
+        self.record = record
+        self.values = {}
+        self.increments = Counter()
+        self.raise_to_high = False
+        self.submitted = False
+        self.events = []
+
+    def add_event(self, activity_type, meta_data, answer, timestamp):
+        event = {
+            "timestamp": timestamp,
+            "activity_type": activity_type,
+            "meta_data": meta_data,
+        }
+
+        # --- Logic for Specific Activity Types ---
+
+        # 1. Answer Logic
+        if activity_type in ["answer_changed", "answer_started"]:
+            new_answer = answer or meta_data.get("answer")
+            if new_answer is not None:
+                self.values["answer_data"] = new_answer
+                self.increments["answer_attempt_count"] += 1
+                self.events.append(
+                    (
+                        "answer_history",
+                        {
+                            "timestamp": timestamp,
+                            "answer_data": new_answer,
+                            "is_auto_save": meta_data.get("is_auto_save", False),
+                        },
+                    )
+                )
+
+        elif activity_type == "answer_submitted":
+            self.values["is_final_answer"] = True
+            self.submitted = True
+
+        # 2. Violation Logic
+        if activity_type in VIOLATION_TYPES:
+            self.increments["violation_count"] += 1
+            self.values["has_violations"] = True
+
+        # 3. Alert Logic
+        if activity_type == "violation_critical":
+            self.values["alert_priority"] = "critical"
+        elif activity_type == "violation_warning":
+            self.raise_to_high = True
+
+        # --- Logging Logic ---
+        proctoring_types = dict(BaseQuestionActivity.PROCTORING_ACTIVITY_TYPES).keys()
+        navigation_types = dict(BaseQuestionActivity.NAVIGATION_ACTIVITY_TYPES).keys()
+        question_types = dict(BaseQuestionActivity.QUESTION_ACTIVITY_TYPES).keys()
+
+        if activity_type in proctoring_types:
+            self.events.append(("proctoring_activities", event))
+
+        elif activity_type in navigation_types:
+            self.events.append(("navigation_activities", event))
+
+        elif activity_type in question_types:
+            self.events.append(("question_activities", event))
+
+    def apply(self, activity_model):
+        """
+        Write the changes; counters are updated in the database so concurrent
+        events all count
+        """
+        records = activity_model.objects.filter(pk=self.record.pk)
+        updates = dict(self.values)
+        for field, amount in self.increments.items():
+            updates[field] = F(field) + amount
+        if updates:
+            records.update(updated_at=timezone.now(), **updates)
+        if self.raise_to_high and updates.get("alert_priority") != "critical":
+            records.exclude(alert_priority__in=["critical", "high"]).update(
+                alert_priority="high", updated_at=timezone.now()
+            )
+
 
 class ProctoringMixin:
     """
@@ -52,15 +161,7 @@ class ProctoringMixin:
             )
 
         # 2. Resolve Submission
-        # Look up submission where user=user and assessment=assessment_object
-        lookup_kwargs = {"user": user, self.submission_lookup_field: assessment_object}
-
-        # Order by created_at desc to get the latest (current) attempt
-        submission = (
-            self.submission_model.objects.filter(**lookup_kwargs)
-            .order_by("-created_at")
-            .first()
-        )
+        submission = self._current_submission(assessment_object, user)
 
         if not submission:
             return Response(
@@ -78,100 +179,190 @@ class ProctoringMixin:
             submission, request, activity_type, meta_data, timestamp
         )
 
-    def _handle_question_activity(
-        self, submission, request, activity_type, meta_data, question_id, timestamp
-    ):
-        submission_field_name = self._get_submission_field_name()
-
-        qa_lookup = {submission_field_name: submission, "question_id": question_id}
-
-        try:
-            qa_record, created = self.question_activity_model.objects.get_or_create(
-                defaults={"user": request.user}, **qa_lookup
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="log-activity/batch",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def log_activity_batch(self, request, pk=None):
+        """
+        Log an ordered list of events in one request:
+        {"events": [{"activity_type", "question_id"?, "meta_data"?, "answer"?,
+        "timestamp"?, "id"?}, ...]}. Each event is acknowledged in order with
+        its "id" (if sent) and a status of "logged" or "error". Snapshots are
+        only accepted by log-activity.
+        """
+        assessment_object = self.get_object()
+        events = request.data.get("events")
+        if not isinstance(events, list):
+            return Response(
+                {"error": "events must be a list"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events) > settings.ASSESSMENT_ACTIVITY_BATCH_LIMIT:
+            return Response(
+                {
+                    "error": (
+                        f"At most {settings.ASSESSMENT_ACTIVITY_BATCH_LIMIT} "
+                        "events per batch"
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        qa_record_updated = False
+        submission = self._current_submission(assessment_object, request.user)
+        if not submission:
+            return Response(
+                {"error": "Submission not found"}, status=status.HTTP_404_NOT_FOUND
+            )
 
-        event = {
-            "timestamp": timestamp,
-            "activity_type": activity_type,
-            "meta_data": meta_data,
+        results = []
+        accepted = []
+        for payload in events:
+            ack = {"id": payload.get("id")} if isinstance(payload, dict) else {}
+            results.append(ack)
+            if not isinstance(payload, dict) or not payload.get("activity_type"):
+                ack.update(status="error", error="activity_type is required")
+                continue
+            accepted.append((ack, payload))
+
+        # Question activities of every referenced question, created if missing
+        question_ids = {
+            self._as_uuid(payload["question_id"])
+            for _, payload in accepted
+            if payload.get("question_id")
         }
+        questions = dict(
+            Question.objects.filter(id__in=question_ids - {None}).values_list(
+                "id", "type"
+            )
+        )
+        records = self._question_activities(submission, request.user, questions)
+
+        changes = {}
+        submission_events = []
+        for ack, payload in accepted:
+            activity_type = payload["activity_type"]
+            meta_data = payload.get("meta_data") or {}
+            timestamp = payload.get("timestamp") or timezone.now().isoformat()
+            question_id = payload.get("question_id")
+
+            if not question_id:
+                stream = self._submission_stream(activity_type)
+                submission_events.append(
+                    event_log.event(
+                        submission,
+                        stream,
+                        {
+                            "timestamp": timestamp,
+                            "activity_type": activity_type,
+                            "meta_data": meta_data,
+                        },
+                    )
+                )
+                ack.update(status="logged", scope="submission")
+                continue
+
+            record = records.get(self._as_uuid(question_id))
+            if record is None:
+                ack.update(status="error", error="Question not found")
+                continue
+            question_changes = changes.setdefault(record.pk, ActivityChanges(record))
+            question_changes.add_event(
+                activity_type, meta_data, payload.get("answer"), timestamp
+            )
+            ack.update(status="logged", scope="question")
+
+        with transaction.atomic():
+            for question_changes in changes.values():
+                question_changes.apply(self.question_activity_model)
+            question_events = [
+                event_log.event(
+                    submission, stream, data, question_changes.record.question_id
+                )
+                for question_changes in changes.values()
+                for stream, data in question_changes.events
+            ]
+            event_log.append(submission_events + question_events)
 
-        # --- Logic for Specific Activity Types ---
+        for question_changes in changes.values():
+            record = question_changes.record
+            if question_changes.submitted and questions[record.question_id] == "coding":
+                record.refresh_from_db(fields=["answer_data"])
+                self._check_plagiarism(record, request)
 
-        # 1. Answer Logic
-        if activity_type in ["answer_changed", "answer_started"]:
-            new_answer = request.data.get("answer") or meta_data.get("answer")
-            if new_answer is not None:
-                qa_record.answer_data = new_answer
-                qa_record.answer_history.append(
-                    {
-                        "timestamp": timestamp,
-                        "answer_data": new_answer,
-                        "is_auto_save": meta_data.get("is_auto_save", False),
-                    }
-                )
-                qa_record.answer_attempt_count += 1
-                qa_record_updated = True
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
-        elif activity_type == "answer_submitted":
-            qa_record.is_final_answer = True
-            qa_record_updated = True
+    def _current_submission(self, assessment_object, user):
+        """The user's latest (current) attempt at the assessment"""
+        lookup_kwargs = {"user": user, self.submission_lookup_field: assessment_object}
+        return (
+            self.submission_model.objects.filter(**lookup_kwargs)
+            .order_by("-created_at")
+            .first()
+        )
 
-            # Trigger plagiarism check for coding questions
-            if qa_record.question.type == "coding":
-                self._check_plagiarism(qa_record, request)
+    @staticmethod
+    def _as_uuid(value):
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return None
 
-        # 2. Violation Logic
-        # Explicit violation types from requirements
-        violation_types = [
-            "copy_detected",
-            "paste_detected",
-            "right_click_detected",
-            "keyboard_shortcut",
-            "face_not_detected",
-            "multiple_faces_detected",
-            "face_recognition_failed",
-            "suspicious_movement",
-            "audio_anomaly",
-            "suspicious_activity",
-            "device_change",
-            "external_monitor",
+    def _question_activities(self, submission, user, question_ids):
+        """{question_id: activity} of the submission, creating missing ones"""
+        submission_field_name = self._get_submission_field_name()
+        records = {
+            record.question_id: record
+            for record in self.question_activity_model.objects.filter(
+                **{submission_field_name: submission},
+                question_id__in=list(question_ids),
+            )
+        }
+        missing = [
+            self.question_activity_model(
+                **{submission_field_name: submission},
+                question_id=question_id,
+                user=user,
+            )
+            for question_id in question_ids
+            if question_id not in records
         ]
+        if missing:
+            self.question_activity_model.objects.bulk_create(
+                missing, ignore_conflicts=True
+            )
+            records.update(
+                (record.question_id, record)
+                for record in self.question_activity_model.objects.filter(
+                    **{submission_field_name: submission},
+                    question_id__in=[record.question_id for record in missing],
+                )
+            )
+        return records
 
-        if activity_type in violation_types:
-            qa_record.violation_count += 1
-            qa_record.has_violations = True
-            qa_record_updated = True
-
-        # 3. Alert Logic
-        if activity_type == "violation_critical":
-            qa_record.alert_priority = "critical"
-            qa_record_updated = True
-        elif activity_type == "violation_warning":
-            if qa_record.alert_priority not in ["critical", "high"]:
-                qa_record.alert_priority = "high"
-                qa_record_updated = True
+    def _handle_question_activity(
+        self, submission, request, activity_type, meta_data, question_id, timestamp
+    ):
+        submission_field_name = self._get_submission_field_name()
 
-        # --- Logging Logic ---
-        proctoring_types = dict(BaseQuestionActivity.PROCTORING_ACTIVITY_TYPES).keys()
-        navigation_types = dict(BaseQuestionActivity.NAVIGATION_ACTIVITY_TYPES).keys()
-        question_types = dict(BaseQuestionActivity.QUESTION_ACTIVITY_TYPES).keys()
+        qa_lookup = {submission_field_name: submission, "question_id": question_id}
 
-        if activity_type in proctoring_types:
-            qa_record.proctoring_activities.append(event)
-            qa_record_updated = True
+        try:
+            qa_record, created = self.question_activity_model.objects.get_or_create(
+                defaults={"user": request.user}, **qa_lookup
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        elif activity_type in navigation_types:
-            qa_record.navigation_activities.append(event)
-            qa_record_updated = True
+        changes = ActivityChanges(qa_record)
+        changes.add_event(
+            activity_type, meta_data, request.data.get("answer"), timestamp
+        )
 
-        elif activity_type in question_types:
-            qa_record.question_activities.append(event)
-            qa_record_updated = True
+        # Trigger plagiarism check for coding questions
+        if changes.submitted and qa_record.question.type == "coding":
+            self._check_plagiarism(qa_record, request)
 
         # Handle Camera Snapshot
         image_file = request.FILES.get("snapshot")
@@ -185,11 +376,16 @@ class ProctoringMixin:
                     "image_path": image_path,
                     "meta_data": meta_data,
                 }
-                qa_record.camera_snapshots.append(snap_event)
-                qa_record_updated = True
-
-        if qa_record_updated:
-            qa_record.save()
+                changes.events.append(("camera_snapshots", snap_event))
+
+        with transaction.atomic():
+            changes.apply(self.question_activity_model)
+            event_log.append(
+                [
+                    event_log.event(submission, stream, data, qa_record.question_id)
+                    for stream, data in changes.events
+                ]
+            )
 
         return Response(
             {"status": "logged", "scope": "question"}, status=status.HTTP_200_OK
@@ -211,47 +407,36 @@ class ProctoringMixin:
             if not code or not language:
                 return
 
-            # 2. Fetch Reference Submissions
-            # Find all other finalized answers for this question
-            # Using the same model class (e.g. SkillTestQuestionActivity)
-            model_class = qa_record.__class__
-
-            # Limit to recent 100 or reasonable number to avoid huge payloads
-            # Exclude current user's submissions
-            refs = (
-                model_class.objects.filter(
-                    question=qa_record.question, is_final_answer=True
-                )
-                .exclude(user=request.user)
-                .values("id", "user__id", "answer_data")
-                .order_by("-updated_at")[:50]
+            # 2. Find Candidates in the Fingerprint Index
+            # Every earlier final answer of the same kind (e.g. contest answers)
+            # is indexed; only the closest few are scored by the executor
+            source = qa_record._meta.label_lower
+            candidates = plagiarism_index.find_candidates(
+                qa_record.question, source, code, language, exclude_user=request.user
+            )
+            plagiarism_index.index_submission(
+                question=qa_record.question,
+                user=qa_record.user,
+                source=source,
+                source_id=qa_record.id,
+                language=language,
+                code=code,
             )
 
-            reference_submissions = []
-            for ref in refs:
-                reference_submissions.append(
-                    {
-                        "submission_id": str(ref["id"]),
-                        "user_id": str(ref["user__id"]),
-                        "answer_data": ref["answer_data"],
-                    }
-                )
-
-            if not reference_submissions:
+            if not candidates:
                 return
 
             # 3. Call Plagiarism Service
-            service_url = os.environ.get(
-                "CODE_EXECUTOR_URL", "http://code-executor:8002"
-            )
             payload = {
                 "target_code": code,
                 "language": language,
-                "reference_submissions": reference_submissions,
+                "reference_submissions": plagiarism_index.reference_submissions(
+                    candidates
+                ),
             }
 
-            response = requests.post(
-                f"{service_url}/plagiarism-check", json=payload, timeout=5
+            response = get_executor_client().post(
+                "/plagiarism-check", json=payload, timeout=5, idempotent=True
             )
 
             if response.status_code == 200:
@@ -278,6 +463,15 @@ class ProctoringMixin:
             if image_path:
                 event["image_path"] = image_path
 
+        stream = self._submission_stream(activity_type, bool(image_file))
+        event_log.append([event_log.event(submission, stream, event)])
+        return Response(
+            {"status": "logged", "scope": "submission"}, status=status.HTTP_200_OK
+        )
+
+    @staticmethod
+    def _submission_stream(activity_type, has_snapshot=False):
+        """The submission event list an event belongs to"""
         # Define non-violation events that shouldn't be counted as proctoring violations
         proctoring_types = dict(BaseQuestionActivity.PROCTORING_ACTIVITY_TYPES).keys()
         non_violation_types = ["snapshot", "camera_enabled", "camera_disabled"]
@@ -285,20 +479,14 @@ class ProctoringMixin:
         is_proctoring = (
             activity_type in proctoring_types
             or activity_type == "snapshot"
-            or image_file
+            or has_snapshot
         )
         is_violation = is_proctoring and (activity_type not in non_violation_types)
 
         if is_violation:
-            submission.proctoring_events.append(event)
-        else:
-            # Snapshots and Camera Status are logged but kept in general events
-            submission.general_events.append(event)
-
-        submission.save()
-        return Response(
-            {"status": "logged", "scope": "submission"}, status=status.HTTP_200_OK
-        )
+            return "proctoring_events"
+        # Snapshots and Camera Status are logged but kept in general events
+        return "general_events"
 
     def _get_submission_field_name(self):
         """
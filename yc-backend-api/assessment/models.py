@@ -117,6 +117,10 @@ class Contest(BaseAssessmentModel):
 
     class Meta:
         ordering = ["-start_datetime"]
+        indexes = [
+            models.Index(fields=["start_datetime", "end_datetime"]),
+            models.Index(fields=["end_datetime"]),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.organizer})"
@@ -131,6 +135,44 @@ class Contest(BaseAssessmentModel):
             self.status = self.STATUS_PAST
         return self.status
 
+    @classmethod
+    def status_filter(cls, status, now=None):
+        """Q matching the contests whose schedule puts them in ``status`` at ``now``"""
+        now = now or timezone.now()
+        if status == cls.STATUS_ONGOING:
+            return models.Q(start_datetime__lte=now, end_datetime__gte=now)
+        if status == cls.STATUS_UPCOMING:
+            return models.Q(start_datetime__gt=now)
+        if status == cls.STATUS_PAST:
+            return models.Q(start_datetime__lte=now, end_datetime__lt=now)
+        return models.Q(pk__in=[])
+
+    @classmethod
+    def status_expression(cls, now=None):
+        """The status update_status() would give, computed by the database"""
+        return models.Case(
+            *(
+                models.When(cls.status_filter(status, now), then=models.Value(status))
+                for status in (cls.STATUS_UPCOMING, cls.STATUS_PAST)
+            ),
+            default=models.Value(cls.STATUS_ONGOING),
+            output_field=models.CharField(),
+        )
+
+    @classmethod
+    def sync_statuses(cls, queryset=None, now=None):
+        """Store the schedule-derived status of contests, one UPDATE per status"""
+        queryset = cls.objects.all() if queryset is None else queryset
+        now = now or timezone.now()
+        updated = 0
+        for status, _ in cls.STATUS_CHOICES:
+            updated += (
+                queryset.filter(cls.status_filter(status, now))
+                .exclude(status=status)
+                .update(status=status)
+            )
+        return updated
+
 
 class MockInterview(BaseModel):
     PUBLISH_STATUS_DRAFT = "draft"
@@ -692,3 +734,45 @@ class Certificate(BaseTimestampedModel):
             rand_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
             self.certificate_id = f"YUVRO-{year}-{rand_str}"
         super().save(*args, **kwargs)
+
+
+class AssessmentEvent(models.Model):
+    """
+    Append-only log of activity events sent by log-activity.
+
+    Events used to be appended to JSON lists on the submission or question
+    activity row; they are now inserted here and merged back into those lists
+    when read (see assessment/event_log.py). ``stream`` names the list an event
+    belongs to.
+    """
+
+    STREAM_CHOICES = [
+        ("general_events", "General Events"),
+        ("proctoring_events", "Proctoring Events"),
+        ("question_activities", "Question Activities"),
+        ("navigation_activities", "Navigation Activities"),
+        ("proctoring_activities", "Proctoring Activities"),
+        ("camera_snapshots", "Camera Snapshots"),
+        ("answer_history", "Answer History"),
+    ]
+
+    submission_type = models.CharField(
+        max_length=100,
+        help_text="Submission model label, e.g. assessment.skilltestsubmission",
+    )
+    submission_id = models.UUIDField()
+    question_id = models.UUIDField(
+        null=True, blank=True, help_text="Set for question-level events"
+    )
+    stream = models.CharField(max_length=30, choices=STREAM_CHOICES)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["submission_type", "submission_id", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.stream} - {self.submission_type} {self.submission_id}"
@@ -0,0 +1,165 @@
+"""
+Question selection for starting an assessment.
+
+SkillTest, Contest and CertificationExam ``start`` send the questions listed in
+``questions_config`` plus, for each type in ``questions_random_config``, a
+random sample of the matching questions in the bank. Rather than loading every
+candidate row to keep a handful, the candidate ids of each (scope, type) pool
+are cached, sampling happens over ids, and only the chosen questions are
+fetched, with one ``id__in`` query.
+
+Pools are cached in the "assessment_question_pool" namespace of the shared
+cache (core/cache.py), which assessment/signals.py invalidates whenever a
+Question is saved or deleted.
+
+With ASSESSMENT_PAPER_POOL_SIZE set, contests additionally keep that many
+pre-assembled papers (lists of question ids) per configuration, so a burst of
+participants starting together only has to pick one and fetch its questions.
+"""
+import hashlib
+import json
+import random
+
+from django.conf import settings
+from django.db.models import Q
+
+from core import cache as shared_cache
+from course.models import Question
+
+NAMESPACE = "assessment_question_pool"
+
+QUESTION_FIELDS = [
+    "id",
+    "title",
+    "content",
+    "type",
+    "mcq_options",
+    "marks",
+    "test_cases_basic",
+]
+
+
+def invalidate():
+    """Make every cached candidate pool and paper unreachable"""
+    shared_cache.invalidate(NAMESPACE)
+
+
+def skill_test_scope(skill_test):
+    if skill_test.topic_id:
+        # Questions of the topic's subtopics or of the topic itself
+        return f"topic:{skill_test.topic_id}"
+    if skill_test.course_id:
+        return f"course:{skill_test.course_id}"
+    return "all"
+
+
+def course_scope(course_id):
+    return f"course:{course_id}"
+
+
+def _scope_filter(scope):
+    if scope == "all":
+        return Q()
+    kind, scope_id = scope.split(":", 1)
+    if kind == "topic":
+        return Q(subtopic__topic_id=scope_id) | Q(topic_id=scope_id)
+    return Q(course_id=scope_id)
+
+
+def candidate_ids(scope, question_type):
+    """Ids (as strings) of the questions of a type within a scope"""
+
+    def compute():
+        return [
+            str(question_id)
+            for question_id in Question.objects.filter(
+                _scope_filter(scope), type=question_type
+            )
+            .order_by()
+            .values_list("id", flat=True)
+        ]
+
+    return shared_cache.get_or_set(
+        NAMESPACE,
+        compute,
+        "pool",
+        scope,
+        question_type,
+        timeout=settings.ASSESSMENT_QUESTION_POOL_TIMEOUT,
+    )
+
+
+def configured_ids(questions_config):
+    """Ids listed in a questions_config, e.g. {'mcq_single': [id1, id2]}"""
+    ids = []
+    for type_ids in (questions_config or {}).values():
+        if isinstance(type_ids, list):
+            ids.extend(str(question_id) for question_id in type_ids)
+    return ids
+
+
+def assemble_paper(scope, questions_config, questions_random_config):
+    """Ids of the configured questions plus a random sample for each type"""
+    fixed_ids = configured_ids(questions_config)
+    paper = list(fixed_ids)
+    excluded = set(fixed_ids)
+    for question_type, count in (questions_random_config or {}).items():
+        if count > 0:
+            candidates = [
+                question_id
+                for question_id in candidate_ids(scope, question_type)
+                if question_id not in excluded
+            ]
+            if len(candidates) >= count:
+                candidates = random.sample(candidates, count)
+            paper.extend(candidates)
+    return paper
+
+
+def _papers(assessment, scope):
+    """A pool of pre-assembled papers for the assessment's configuration"""
+    config = json.dumps(
+        [scope, assessment.questions_config, assessment.questions_random_config],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(config.encode()).hexdigest()[:16]
+
+    def compute():
+        return [
+            assemble_paper(
+                scope, assessment.questions_config, assessment.questions_random_config
+            )
+            for _ in range(settings.ASSESSMENT_PAPER_POOL_SIZE)
+        ]
+
+    return shared_cache.get_or_set(
+        NAMESPACE,
+        compute,
+        "papers",
+        assessment.pk,
+        digest,
+        timeout=settings.ASSESSMENT_QUESTION_POOL_TIMEOUT,
+    )
+
+
+def select_questions(assessment, scope, use_paper_pool=False):
+    """
+    The question dicts to send when a user starts ``assessment``, shuffled.
+
+    ``scope`` limits where random questions come from (see skill_test_scope
+    and course_scope). With ``use_paper_pool`` a cached pre-assembled paper
+    is used instead of sampling, when the paper pool is enabled.
+    """
+    if use_paper_pool and settings.ASSESSMENT_PAPER_POOL_SIZE > 0:
+        paper = random.choice(_papers(assessment, scope))
+    else:
+        paper = assemble_paper(
+            scope, assessment.questions_config, assessment.questions_random_config
+        )
+
+    questions = []
+    if paper:
+        questions = list(Question.objects.filter(id__in=paper).values(*QUESTION_FIELDS))
+    random.shuffle(questions)
+    return questions
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from . import event_log
 from .models import (
     Contest,
     MockInterview,
@@ -19,6 +20,21 @@ from .models import (
 User = get_user_model()
 
 
+class EventStreamField(serializers.Field):
+    """
+    An event list of a submission or question activity (e.g. proctoring_events),
+    including the events kept in the append-only event log.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        return event_log.stream(obj, self.field_name, cache=self.context)
+
+
 class CertificationExamSerializer(serializers.ModelSerializer):
     participants_count = serializers.SerializerMethodField()
     total_questions = serializers.SerializerMethodField()
@@ -85,6 +101,11 @@ class CertificationExamSerializer(serializers.ModelSerializer):
 
 
 class CertificationQuestionActivitySerializer(serializers.ModelSerializer):
+    question_activities = EventStreamField()
+    navigation_activities = EventStreamField()
+    proctoring_activities = EventStreamField()
+    camera_snapshots = EventStreamField()
+    answer_history = EventStreamField()
     question_title = serializers.CharField(source="question.title", read_only=True)
     question_type = serializers.CharField(source="question.type", read_only=True)
     question_content = serializers.CharField(source="question.content", read_only=True)
@@ -111,6 +132,7 @@ class CertificationQuestionActivitySerializer(serializers.ModelSerializer):
             "camera_snapshots",
             "alert_priority",
             "answer_data",
+            "answer_history",
             "is_final_answer",
             "marks_obtained",
             "is_correct",
@@ -140,6 +162,8 @@ class CertificateSerializer(serializers.ModelSerializer):
 
 
 class CertificationSubmissionSerializer(serializers.ModelSerializer):
+    proctoring_events = EventStreamField()
+    general_events = EventStreamField()
     exam_title = serializers.CharField(source="certification_exam.title", read_only=True)
     user_name = serializers.CharField(source="user.get_full_name", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
@@ -172,6 +196,7 @@ class CertificationSubmissionSerializer(serializers.ModelSerializer):
             "completed_at",
             "marks",
             "proctoring_events",
+            "general_events",
             "browser_info",
             "ip_address",
             "user_agent",
@@ -228,6 +253,12 @@ class ContestSerializer(serializers.ModelSerializer):
     def get_participants_count(self, obj):
         return obj.contest_submissions.count()
 
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        # The stored status may lag behind the schedule
+        data["status"] = getattr(obj, "live_status", None) or obj.update_status()
+        return data
+
     def get_is_registered(self, obj):
         user = self.context.get("request").user
         if user.is_authenticated:
@@ -378,6 +409,8 @@ class JobTestSerializer(serializers.ModelSerializer):
 
 
 class ContestSubmissionSerializer(serializers.ModelSerializer):
+    proctoring_events = EventStreamField()
+    general_events = EventStreamField()
     contest_title = serializers.CharField(source="contest.title", read_only=True)
     user_name = serializers.CharField(source="user.get_full_name", read_only=True)
 
@@ -395,6 +428,7 @@ class ContestSubmissionSerializer(serializers.ModelSerializer):
             "completed_at",
             "marks",
             "proctoring_events",
+            "general_events",
             "browser_info",
             "ip_address",
             "user_agent",
@@ -405,6 +439,11 @@ class ContestSubmissionSerializer(serializers.ModelSerializer):
 
 
 class SkillTestQuestionActivitySerializer(serializers.ModelSerializer):
+    question_activities = EventStreamField()
+    navigation_activities = EventStreamField()
+    proctoring_activities = EventStreamField()
+    camera_snapshots = EventStreamField()
+    answer_history = EventStreamField()
     question_title = serializers.CharField(source="question.title", read_only=True)
     question_type = serializers.CharField(source="question.type", read_only=True)
     question_content = serializers.CharField(source="question.content", read_only=True)
@@ -431,6 +470,7 @@ class SkillTestQuestionActivitySerializer(serializers.ModelSerializer):
             "camera_snapshots",
             "alert_priority",
             "answer_data",
+            "answer_history",
             "is_final_answer",
             "marks_obtained",
             "is_correct",
@@ -443,6 +483,8 @@ class SkillTestQuestionActivitySerializer(serializers.ModelSerializer):
 
 
 class SkillTestSubmissionSerializer(serializers.ModelSerializer):
+    proctoring_events = EventStreamField()
+    general_events = EventStreamField()
     skill_test_title = serializers.CharField(source="skill_test.title", read_only=True)
     user_name = serializers.CharField(source="user.get_full_name", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
@@ -465,6 +507,7 @@ class SkillTestSubmissionSerializer(serializers.ModelSerializer):
             "completed_at",
             "marks",
             "proctoring_events",
+            "general_events",
             "browser_info",
             "ip_address",
             "user_agent",
@@ -476,6 +519,8 @@ class SkillTestSubmissionSerializer(serializers.ModelSerializer):
 
 
 class MockInterviewSubmissionSerializer(serializers.ModelSerializer):
+    proctoring_events = EventStreamField()
+    general_events = EventStreamField()
     mock_interview_title = serializers.CharField(
         source="mock_interview.title", read_only=True
     )
@@ -496,6 +541,7 @@ class MockInterviewSubmissionSerializer(serializers.ModelSerializer):
             "completed_at",
             "marks",
             "proctoring_events",
+            "general_events",
             "browser_info",
             "ip_address",
             "user_agent",
@@ -506,6 +552,8 @@ class MockInterviewSubmissionSerializer(serializers.ModelSerializer):
 
 
 class JobTestSubmissionSerializer(serializers.ModelSerializer):
+    proctoring_events = EventStreamField()
+    general_events = EventStreamField()
     job_test_title = serializers.CharField(source="job_test.title", read_only=True)
     user_name = serializers.CharField(source="user.get_full_name", read_only=True)
 
@@ -523,6 +571,7 @@ class JobTestSubmissionSerializer(serializers.ModelSerializer):
             "completed_at",
             "marks",
             "proctoring_events",
+            "general_events",
             "browser_info",
             "ip_address",
             "user_agent",
@@ -1,6 +1,25 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from course.models import Course
-from .models import CertificationExam
+from course.models import Course, Question
+from .models import CertificationExam, ContestSubmission
+from . import leaderboard, question_pool
 
 # Auto-creation logic removed as per new requirements (Manual Creation only)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_pools(sender, instance, **kwargs):
+    """Cached candidate pools and papers may include or miss this question"""
+    question_pool.invalidate()
+
+
+@receiver(post_save, sender=ContestSubmission)
+def update_contest_leaderboard(sender, instance, **kwargs):
+    """Move the submission to its place on the cached contest leaderboard"""
+    leaderboard.record_submission(instance)
+
+
+@receiver(post_delete, sender=ContestSubmission)
+def discard_contest_leaderboard(sender, instance, **kwargs):
+    leaderboard.discard(instance.contest_id)
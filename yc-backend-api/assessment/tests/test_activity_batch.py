@@ -0,0 +1,187 @@
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from assessment import event_log
+from assessment.mixins import ProctoringMixin
+from assessment.models import (
+    AssessmentEvent,
+    SkillTest,
+    SkillTestQuestionActivity,
+    SkillTestSubmission,
+)
+from course.models import Course, Question
+
+User = get_user_model()
+
+
+class ActivityBatchTest(APITestCase):
+    """
+    Test cases for logging several activity events with one request.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        course = Course.objects.create(name="Python", category="fundamentals")
+        self.descriptive = self.add_question(course, "descriptive")
+        self.coding = self.add_question(
+            course, "coding", test_cases_basic=[{"input": "", "expected_output": "1"}]
+        )
+        skill_test = SkillTest.objects.create(
+            title="Basics", course=course, created_by=self.instructor
+        )
+        self.submission = SkillTestSubmission.objects.create(
+            skill_test=skill_test, user=self.student
+        )
+        self.url = f"/api/assessment/skill-tests/{skill_test.id}/log-activity/batch/"
+        self.client.force_authenticate(self.student)
+
+    def add_question(self, course, question_type, **fields):
+        return Question.objects.create(
+            type=question_type,
+            title=f"{question_type} question",
+            content="Question",
+            level="course",
+            course=course,
+            categories=["skill_test"],
+            created_by=self.instructor,
+            **fields,
+        )
+
+    def send(self, events):
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def activity(self, question):
+        return SkillTestQuestionActivity.objects.get(
+            skill_test_submission=self.submission, question=question
+        )
+
+    def test_mixed_scopes_and_acks(self):
+        """Test every event is acknowledged in order, errors do not stop the rest."""
+        question_id = str(self.descriptive.id)
+        results = self.send(
+            [
+                {"id": 1, "activity_type": "camera_enabled"},
+                {
+                    "id": 2,
+                    "activity_type": "question_viewed",
+                    "question_id": question_id,
+                },
+                {"id": 3, "meta_data": {"note": "no type"}},
+                "tab_switched",
+                {"id": 5, "activity_type": "tab_switched", "question_id": "nope"},
+                {
+                    "id": 6,
+                    "activity_type": "tab_switched",
+                    "question_id": str(uuid.uuid4()),
+                },
+                {"id": 7, "activity_type": "copy_detected"},
+            ]
+        )
+        self.assertEqual(
+            results,
+            [
+                {"id": 1, "status": "logged", "scope": "submission"},
+                {"id": 2, "status": "logged", "scope": "question"},
+                {"id": 3, "status": "error", "error": "activity_type is required"},
+                {"status": "error", "error": "activity_type is required"},
+                {"id": 5, "status": "error", "error": "Question not found"},
+                {"id": 6, "status": "error", "error": "Question not found"},
+                {"id": 7, "status": "logged", "scope": "submission"},
+            ],
+        )
+
+        self.assertEqual(AssessmentEvent.objects.count(), 3)
+        self.assertEqual(
+            event_log.stream(self.submission, "general_events")[0]["activity_type"],
+            "camera_enabled",
+        )
+        self.assertEqual(
+            event_log.stream(self.submission, "proctoring_events")[0]["activity_type"],
+            "copy_detected",
+        )
+        # The question activity is created on first use
+        activity = self.activity(self.descriptive)
+        self.assertEqual(
+            event_log.stream(activity, "question_activities")[0]["activity_type"],
+            "question_viewed",
+        )
+
+    def test_counters_add_up_within_a_batch(self):
+        """Test several events for one question are applied together."""
+        question_id = str(self.descriptive.id)
+        events = [
+            {"activity_type": "answer_changed", "question_id": question_id, "answer": a}
+            for a in ["A", "B", "C"]
+        ] + [
+            {"activity_type": "copy_detected", "question_id": question_id},
+            {"activity_type": "paste_detected", "question_id": question_id},
+            {"activity_type": "violation_warning", "question_id": question_id},
+        ]
+        self.send(events)
+        self.send(events[:1])
+
+        activity = self.activity(self.descriptive)
+        self.assertEqual(activity.answer_attempt_count, 4)
+        self.assertEqual(activity.answer_data, "A")
+        self.assertEqual(activity.violation_count, 2)
+        self.assertTrue(activity.has_violations)
+        self.assertEqual(activity.alert_priority, "high")
+        self.assertEqual(
+            [
+                entry["answer_data"]
+                for entry in event_log.stream(activity, "answer_history")
+            ],
+            ["A", "B", "C", "A"],
+        )
+
+    def test_final_coding_answer_is_checked_for_plagiarism(self):
+        """Test answer_submitted on a coding question runs the plagiarism check."""
+        answer = {"code": "print(1)", "language": "python"}
+        with patch.object(ProctoringMixin, "_check_plagiarism") as check:
+            self.send(
+                [
+                    {
+                        "activity_type": "answer_submitted",
+                        "question_id": str(self.descriptive.id),
+                    },
+                    {
+                        "activity_type": "answer_changed",
+                        "question_id": str(self.coding.id),
+                        "answer": answer,
+                    },
+                    {
+                        "activity_type": "answer_submitted",
+                        "question_id": str(self.coding.id),
+                    },
+                ]
+            )
+        check.assert_called_once()
+        record = check.call_args.args[0]
+        self.assertEqual(record.question_id, self.coding.id)
+        self.assertEqual(record.answer_data, answer)
+        self.assertTrue(self.activity(self.coding).is_final_answer)
+
+    @override_settings(ASSESSMENT_ACTIVITY_BATCH_LIMIT=2)
+    def test_rejected_batches(self):
+        """Test a batch that is not a list, or too long, is rejected whole."""
+        response = self.client.post(self.url, {"events": "x"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        events = [{"activity_type": "camera_enabled"}] * 3
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AssessmentEvent.objects.count(), 0)
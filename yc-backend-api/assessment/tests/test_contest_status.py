@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from assessment.models import Contest
+
+User = get_user_model()
+
+CONTESTS_URL = "/api/assessment/contests/"
+
+
+class ContestStatusTest(APITestCase):
+    """
+    Test cases for the schedule-derived status of contests at its boundaries.
+    """
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        second, hour = timedelta(seconds=1), timedelta(hours=1)
+        schedules = {
+            "upcoming": (self.now + second, self.now + hour),
+            "starts now": (self.now, self.now + hour),
+            "ends now": (self.now - hour, self.now),
+            "ended": (self.now - hour, self.now - second),
+        }
+        for title, (start, end) in schedules.items():
+            # A stale stored status, as left behind when nothing syncs it
+            stale = Contest.STATUS_UPCOMING if end < self.now else Contest.STATUS_PAST
+            Contest.objects.create(
+                title=title,
+                organizer="YC",
+                start_datetime=start,
+                end_datetime=end,
+                status=stale,
+                created_by=self.instructor,
+            )
+        self.client.force_authenticate(self.instructor)
+
+        freeze = patch("django.utils.timezone.now", return_value=self.now)
+        freeze.start()
+        self.addCleanup(freeze.stop)
+
+    def expected(self):
+        """Title to status, as update_status() computes it"""
+        return {
+            contest.title: contest.update_status() for contest in Contest.objects.all()
+        }
+
+    def test_boundaries_follow_update_status(self):
+        """Test contests are ongoing at exactly start and end, past right after."""
+        self.assertEqual(
+            self.expected(),
+            {
+                "upcoming": Contest.STATUS_UPCOMING,
+                "starts now": Contest.STATUS_ONGOING,
+                "ends now": Contest.STATUS_ONGOING,
+                "ended": Contest.STATUS_PAST,
+            },
+        )
+
+    def test_list_filter_and_serializer_agree(self):
+        """Test ?status= and the serialized status match update_status()."""
+        expected = self.expected()
+
+        response = self.client.get(CONTESTS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {contest["title"]: contest["status"] for contest in response.data},
+            expected,
+        )
+
+        for status, _ in Contest.STATUS_CHOICES:
+            response = self.client.get(CONTESTS_URL, {"status": status})
+            self.assertEqual(
+                {contest["title"] for contest in response.data},
+                {title for title, value in expected.items() if value == status},
+                status,
+            )
+            self.assertTrue(
+                all(contest["status"] == status for contest in response.data)
+            )
+
+    def test_sync_command_stores_update_status(self):
+        """Test sync_contest_status stores what update_status() computes."""
+        expected = self.expected()
+        out = StringIO()
+        call_command("sync_contest_status", stdout=out)
+        self.assertIn("Updated status for 4 contests.", out.getvalue())
+        self.assertEqual(dict(Contest.objects.values_list("title", "status")), expected)
+
+        out = StringIO()
+        call_command("sync_contest_status", stdout=out)
+        self.assertIn("Updated status for 0 contests.", out.getvalue())
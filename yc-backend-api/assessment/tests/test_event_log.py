@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from assessment.models import (
+    AssessmentEvent,
+    SkillTest,
+    SkillTestQuestionActivity,
+    SkillTestSubmission,
+)
+from assessment.serializers import SkillTestSubmissionSerializer
+from course.models import Course, Question
+
+User = get_user_model()
+
+
+class ActivityEventLogTest(APITestCase):
+    """
+    Test cases for events logged through log-activity and read back as lists.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        course = Course.objects.create(name="Python", category="fundamentals")
+        self.question = Question.objects.create(
+            type="descriptive",
+            title="Explain loops",
+            content="Question",
+            level="course",
+            course=course,
+            categories=["skill_test"],
+            created_by=self.instructor,
+        )
+        skill_test = SkillTest.objects.create(
+            title="Basics", course=course, created_by=self.instructor
+        )
+        # Events stored on the row before the event log existed
+        self.submission = SkillTestSubmission.objects.create(
+            skill_test=skill_test,
+            user=self.student,
+            proctoring_events=[{"activity_type": "legacy"}],
+        )
+        self.activity = SkillTestQuestionActivity.objects.create(
+            skill_test_submission=self.submission,
+            question=self.question,
+            user=self.student,
+            answer_history=[{"answer_data": "legacy"}],
+        )
+        self.url = f"/api/assessment/skill-tests/{skill_test.id}/log-activity/"
+        self.client.force_authenticate(self.student)
+
+    def log(self, activity_type, question=False, **data):
+        if question:
+            data["question_id"] = str(self.question.id)
+        response = self.client.post(
+            self.url,
+            {"activity_type": activity_type, "timestamp": activity_type, **data},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def log_session(self):
+        self.assertEqual(self.log("copy_detected")["scope"], "submission")
+        self.log("camera_enabled")
+        self.assertEqual(
+            self.log("answer_changed", question=True, answer="A")["scope"], "question"
+        )
+        self.log("paste_detected", question=True)
+        self.log("answer_changed", question=True, answer="B")
+        self.log("tab_switched", question=True)
+        self.log("violation_warning", question=True)
+
+    def activity_types(self, events):
+        return [event.get("activity_type") for event in events]
+
+    def test_events_are_appended_and_counted(self):
+        """Test events become log rows and counters are updated in place."""
+        self.log_session()
+        self.assertEqual(AssessmentEvent.objects.count(), 9)
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.answer_data, "B")
+        self.assertEqual(self.activity.answer_attempt_count, 2)
+        self.assertEqual(self.activity.violation_count, 1)
+        self.assertTrue(self.activity.has_violations)
+        self.assertEqual(self.activity.alert_priority, "high")
+        # The lists on the rows are left as they were
+        self.assertEqual(self.activity.answer_history, [{"answer_data": "legacy"}])
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.general_events, [])
+
+        self.log("violation_critical", question=True)
+        self.log("violation_warning", question=True)
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.alert_priority, "critical")
+
+    def test_serialized_lists_merge_stored_and_logged_events(self):
+        """Test serializers list stored events first, then logged ones in order."""
+        self.log_session()
+        self.submission.refresh_from_db()
+
+        with CaptureQueriesContext(connection) as queries:
+            data = SkillTestSubmissionSerializer(self.submission, context={}).data
+        # Every list of the submission and its activities comes from one read
+        event_reads = [
+            query
+            for query in queries.captured_queries
+            if AssessmentEvent._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(event_reads), 1)
+        self.assertEqual(
+            self.activity_types(data["proctoring_events"]), ["legacy", "copy_detected"]
+        )
+        self.assertEqual(
+            self.activity_types(data["general_events"]), ["camera_enabled"]
+        )
+
+        activity = data["question_activities"][0]
+        self.assertEqual(
+            [entry["answer_data"] for entry in activity["answer_history"]],
+            ["legacy", "A", "B"],
+        )
+        self.assertEqual(
+            self.activity_types(activity["question_activities"]),
+            ["answer_changed", "answer_changed"],
+        )
+        self.assertEqual(
+            self.activity_types(activity["proctoring_activities"]),
+            ["paste_detected", "violation_warning"],
+        )
+        self.assertEqual(
+            self.activity_types(activity["navigation_activities"]), ["tab_switched"]
+        )
+        self.assertEqual(activity["violation_count"], 1)
+
+    def test_admin_shows_merged_lists(self):
+        """Test the admin change pages render the logged events."""
+        self.log_session()
+        admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="testpass123"
+        )
+        self.client.force_login(admin)
+
+        response = self.client.get(
+            f"/admin/assessment/skilltestsubmission/{self.submission.id}/change/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "legacy")
+        self.assertContains(response, "copy_detected")
+        self.assertContains(response, "camera_enabled")
+
+        response = self.client.get(
+            f"/admin/assessment/skilltestquestionactivity/{self.activity.id}/change/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "paste_detected")
+        self.assertContains(response, "tab_switched")
+        self.assertContains(response, "&quot;B&quot;")
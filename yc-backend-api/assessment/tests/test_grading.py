@@ -0,0 +1,471 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from assessment.models import (
+    CertificationExam,
+    CertificationQuestionActivity,
+    CertificationSubmission,
+    Contest,
+    ContestSubmission,
+    SkillTest,
+    SkillTestQuestionActivity,
+    SkillTestSubmission,
+)
+from course.models import Course, Question
+
+User = get_user_model()
+
+
+class SubmitGradingTest(APITestCase):
+    """
+    Test cases for grading the SkillTest, Contest and Certification submits.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        self.course = Course.objects.create(name="Python", category="fundamentals")
+        self.single = self.add_question(
+            "mcq_single",
+            marks=2,
+            mcq_options=[
+                {"text": "4", "is_correct": True},
+                {"text": "5", "is_correct": False},
+            ],
+        )
+        self.multiple = self.add_question(
+            "mcq_multiple",
+            marks=3,
+            mcq_options=[
+                {"text": "A", "is_correct": True},
+                {"text": "B", "is_correct": False},
+                {"text": "C", "is_correct": True},
+            ],
+        )
+        self.wrong = self.add_question(
+            "mcq_single",
+            marks=4,
+            mcq_options=[
+                {"text": "yes", "is_correct": True},
+                {"text": "no", "is_correct": False},
+            ],
+        )
+        self.coding = self.add_question(
+            "coding",
+            marks=10,
+            test_cases_basic=[{"input": "", "expected_output": "1"}],
+        )
+        self.unanswered = self.add_question(
+            "mcq_single",
+            marks=1,
+            mcq_options=[
+                {"text": "x", "is_correct": True},
+                {"text": "y", "is_correct": False},
+            ],
+        )
+        self.answers = {
+            str(self.single.id): "4",
+            str(self.multiple.id): ["C", "A"],
+            str(self.wrong.id): "no",
+            str(self.coding.id): {"code": "print(1)", "language": "python"},
+            str(uuid.uuid4()): "4",
+        }
+        self.client.force_authenticate(self.student)
+
+    def add_question(self, question_type, **fields):
+        return Question.objects.create(
+            type=question_type,
+            title=f"{question_type} question",
+            content="Question",
+            level="course",
+            course=self.course,
+            categories=["skill_test"],
+            created_by=self.instructor,
+            **fields,
+        )
+
+    def assertActivity(self, activity, is_correct, marks, auto_graded):
+        self.assertTrue(activity.is_final_answer)
+        self.assertEqual(activity.is_correct, is_correct)
+        self.assertEqual(activity.marks_obtained, marks)
+        self.assertEqual(activity.auto_graded, auto_graded)
+
+    def test_skill_test_submit(self):
+        """Test a skill test grades MCQs, stores explanations and updates drafts."""
+        skill_test = SkillTest.objects.create(
+            title="Basics", course=self.course, created_by=self.instructor
+        )
+        submission = SkillTestSubmission.objects.create(
+            skill_test=skill_test, user=self.student
+        )
+        draft = SkillTestQuestionActivity.objects.create(
+            skill_test_submission=submission,
+            question=self.single,
+            user=self.student,
+            answer_data={"answer": "5"},
+        )
+        url = f"/api/assessment/skill-tests/{skill_test.id}/submit/"
+        data = {
+            "submission_id": str(submission.id),
+            "answers": self.answers,
+            "explanations": {str(self.coding.id): "Prints one"},
+            "all_question_ids": [str(self.unanswered.id)],
+        }
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"status": "submitted", "score": 5})
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, SkillTestSubmission.STATUS_COMPLETED)
+        self.assertEqual(submission.marks, 5)
+
+        activities = {
+            activity.question_id: activity
+            for activity in SkillTestQuestionActivity.objects.filter(
+                skill_test_submission=submission
+            )
+        }
+        self.assertEqual(len(activities), 5)
+        self.assertEqual(activities[self.single.id].id, draft.id)
+        self.assertActivity(activities[self.single.id], True, 2, True)
+        self.assertEqual(
+            activities[self.single.id].answer_data, {"answer": "4", "explanation": ""}
+        )
+        self.assertActivity(activities[self.multiple.id], True, 3, True)
+        self.assertActivity(activities[self.wrong.id], False, 0, True)
+        self.assertActivity(activities[self.coding.id], False, 0, False)
+        self.assertEqual(
+            activities[self.coding.id].answer_data,
+            {"answer": self.answers[str(self.coding.id)], "explanation": "Prints one"},
+        )
+        self.assertActivity(activities[self.unanswered.id], False, 0, True)
+        self.assertEqual(
+            activities[self.unanswered.id].answer_data,
+            {"answer": None, "explanation": ""},
+        )
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            SkillTestQuestionActivity.objects.filter(
+                skill_test_submission=submission
+            ).count(),
+            5,
+        )
+
+    def test_contest_submit(self):
+        """Test a contest scores MCQs and a resubmission replaces the score."""
+        now = timezone.now()
+        contest = Contest.objects.create(
+            title="Weekly",
+            organizer="YC",
+            start_datetime=now - timedelta(hours=1),
+            end_datetime=now + timedelta(hours=1),
+            created_by=self.instructor,
+        )
+        submission = ContestSubmission.objects.create(
+            contest=contest, user=self.student
+        )
+        url = f"/api/assessment/contests/{contest.id}/submit/"
+
+        response = self.client.post(
+            url,
+            {"submission_id": str(submission.id), "answers": self.answers},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"status": "Submitted", "score": 5})
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, ContestSubmission.STATUS_SUBMITTED)
+        self.assertEqual(submission.marks, 5)
+
+        answers = {**self.answers, str(self.wrong.id): "yes"}
+        response = self.client.post(
+            url,
+            {"submission_id": str(submission.id), "answers": answers},
+            format="json",
+        )
+        self.assertEqual(response.data["score"], 9)
+        submission.refresh_from_db()
+        self.assertEqual(submission.marks, 9)
+        self.assertEqual(ContestSubmission.objects.filter(contest=contest).count(), 1)
+
+    def test_certification_submit(self):
+        """Test a certification exam grades every answer and issues a certificate."""
+        exam = CertificationExam.objects.create(
+            title="Python Certification",
+            course=self.course,
+            passing_marks=5,
+            publish_status=CertificationExam.PUBLISH_STATUS_ACTIVE,
+            created_by=self.instructor,
+        )
+        submission = CertificationSubmission.objects.create(
+            certification_exam=exam, user=self.student
+        )
+        draft = CertificationQuestionActivity.objects.create(
+            certification_submission=submission,
+            question=self.multiple,
+            user=self.student,
+            answer_data={"answer": ["A"]},
+        )
+        url = f"/api/assessment/certification-exams/{exam.id}/submit/"
+        data = {"submission_id": str(submission.id), "answers": self.answers}
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "submitted")
+        self.assertEqual(response.data["score"], 5)
+        self.assertTrue(response.data["passed"])
+        self.assertTrue(response.data["certificate_id"])
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, CertificationSubmission.STATUS_COMPLETED)
+        self.assertEqual(submission.marks, 5)
+
+        activities = {
+            activity.question_id: activity
+            for activity in CertificationQuestionActivity.objects.filter(
+                certification_submission=submission
+            )
+        }
+        self.assertEqual(len(activities), 4)
+        self.assertEqual(activities[self.multiple.id].id, draft.id)
+        self.assertActivity(activities[self.multiple.id], True, 3, True)
+        self.assertEqual(
+            activities[self.multiple.id].answer_data, {"answer": ["C", "A"]}
+        )
+        self.assertActivity(activities[self.single.id], True, 2, True)
+        self.assertActivity(activities[self.wrong.id], False, 0, True)
+        self.assertActivity(activities[self.coding.id], False, 0, True)
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            CertificationQuestionActivity.objects.filter(
+                certification_submission=submission
+            ).count(),
+            4,
+        )
+
+
+def baseline_grade(question, answer, contest=False):
+    """(is_correct, marks) as the submit actions graded before grading.py"""
+    if question.type == "mcq_single":
+        correct_opt = next(
+            (opt for opt in question.mcq_options if opt.get("is_correct")), None
+        )
+        if correct_opt and answer == correct_opt["text"]:
+            return True, question.marks
+    elif question.type == "mcq_multiple":
+        correct_opts = {
+            opt["text"] for opt in question.mcq_options if opt.get("is_correct")
+        }
+        if isinstance(answer, list):
+            user_opts = set(answer)
+        elif contest or answer:
+            user_opts = {answer}
+        else:
+            user_opts = set()
+        # Contests did not require the question to have a correct option
+        if correct_opts == user_opts and (contest or correct_opts):
+            return True, question.marks
+    return False, 0
+
+
+class BaselineGradingTest(APITestCase):
+    """
+    Test cases pinning each submit path to the grading it had before grading.py.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        self.course = Course.objects.create(name="Python", category="fundamentals")
+        options = [
+            {"text": "A", "is_correct": True},
+            {"text": "B", "is_correct": False},
+            {"text": "C", "is_correct": True},
+        ]
+        # Rows written around Question.save(), as older data can be
+        self.two_correct = self.add_legacy("mcq_single", options)
+        self.none_correct = self.add_legacy(
+            "mcq_multiple", [{**option, "is_correct": False} for option in options]
+        )
+        self.multiple = self.add_question("mcq_multiple", mcq_options=options)
+        self.questions = [self.two_correct, self.none_correct, self.multiple]
+        self.client.force_authenticate(self.student)
+
+    def add_question(self, question_type, **fields):
+        return Question.objects.create(
+            type=question_type,
+            title=f"{question_type} question",
+            content="Question",
+            level="course",
+            course=self.course,
+            categories=["skill_test"],
+            marks=2,
+            created_by=self.instructor,
+            **fields,
+        )
+
+    def add_legacy(self, question_type, options):
+        question = self.add_question(
+            "mcq_multiple",
+            mcq_options=[
+                {"text": "A", "is_correct": True},
+                {"text": "B", "is_correct": True},
+            ],
+        )
+        Question.objects.filter(id=question.id).update(
+            type=question_type, mcq_options=options
+        )
+        question.refresh_from_db()
+        # Keys as the 0011 and 0012 migrations store them
+        question.mcq_answer_key = question.build_answer_key()
+        Question.objects.filter(id=question.id).update(
+            mcq_answer_key=question.mcq_answer_key
+        )
+        return question
+
+    # Each maps every question to one answer
+    ANSWER_SETS = [
+        {"two_correct": "C", "none_correct": [], "multiple": "A"},
+        {"two_correct": "A", "none_correct": "", "multiple": ["C", "A"]},
+        {"two_correct": ["A"], "none_correct": None, "multiple": []},
+    ]
+
+    def answer_sets(self):
+        for answers in self.ANSWER_SETS:
+            yield {
+                str(getattr(self, name).id): answer for name, answer in answers.items()
+            }
+
+    def expected(self, answers, contest=False):
+        graded = {
+            question.id: baseline_grade(
+                question, answers[str(question.id)], contest=contest
+            )
+            for question in self.questions
+        }
+        return graded, sum(marks for _, marks in graded.values())
+
+    def graded_activities(self, activities):
+        return {
+            activity.question_id: (activity.is_correct, activity.marks_obtained)
+            for activity in activities
+            if activity.is_final_answer and activity.auto_graded
+        }
+
+    def test_skill_test_submit_matches_baseline(self):
+        """Test skill test activities, score and payload match the old grading."""
+        skill_test = SkillTest.objects.create(
+            title="Basics", course=self.course, created_by=self.instructor
+        )
+        url = f"/api/assessment/skill-tests/{skill_test.id}/submit/"
+        for answers in self.answer_sets():
+            SkillTestSubmission.objects.filter(user=self.student).delete()
+            submission = SkillTestSubmission.objects.create(
+                skill_test=skill_test, user=self.student
+            )
+            graded, score = self.expected(answers)
+            with self.assertNumQueries(10):
+                response = self.client.post(
+                    url,
+                    {"submission_id": str(submission.id), "answers": answers},
+                    format="json",
+                )
+            self.assertEqual(response.data, {"status": "submitted", "score": score})
+            activities = SkillTestQuestionActivity.objects.filter(
+                skill_test_submission=submission
+            )
+            self.assertEqual(self.graded_activities(activities), graded)
+            submission.refresh_from_db()
+            self.assertEqual(submission.marks, score)
+
+    def test_contest_submit_matches_baseline(self):
+        """Test contest scores and payload match the old, non-strict grading."""
+        now = timezone.now()
+        contest = Contest.objects.create(
+            title="Weekly",
+            organizer="YC",
+            start_datetime=now - timedelta(hours=1),
+            end_datetime=now + timedelta(hours=1),
+            created_by=self.instructor,
+        )
+        submission = ContestSubmission.objects.create(
+            contest=contest, user=self.student
+        )
+        url = f"/api/assessment/contests/{contest.id}/submit/"
+        scores = []
+        for answers in self.answer_sets():
+            _, score = self.expected(answers, contest=True)
+            scores.append(score)
+            with self.assertNumQueries(5):
+                response = self.client.post(
+                    url,
+                    {"submission_id": str(submission.id), "answers": answers},
+                    format="json",
+                )
+            self.assertEqual(response.data, {"status": "Submitted", "score": score})
+            submission.refresh_from_db()
+            self.assertEqual(submission.marks, score)
+        # An empty choice on a question without correct options scored
+        self.assertEqual(scores, [2, 4, 0])
+
+    def test_certification_submit_matches_baseline(self):
+        """Test certification activities, score and payload match the old grading."""
+        exam = CertificationExam.objects.create(
+            title="Python Certification",
+            course=self.course,
+            # Out of reach, so no certificate is issued between the counts
+            passing_marks=100,
+            publish_status=CertificationExam.PUBLISH_STATUS_ACTIVE,
+            created_by=self.instructor,
+        )
+        url = f"/api/assessment/certification-exams/{exam.id}/submit/"
+        for answers in self.answer_sets():
+            CertificationSubmission.objects.filter(user=self.student).delete()
+            submission = CertificationSubmission.objects.create(
+                certification_exam=exam, user=self.student
+            )
+            graded, score = self.expected(answers)
+            with self.assertNumQueries(10):
+                response = self.client.post(
+                    url,
+                    {"submission_id": str(submission.id), "answers": answers},
+                    format="json",
+                )
+            self.assertEqual(
+                response.data,
+                {
+                    "status": "submitted",
+                    "score": score,
+                    "passed": False,
+                    "certificate_id": None,
+                },
+            )
+            activities = CertificationQuestionActivity.objects.filter(
+                certification_submission=submission
+            )
+            self.assertEqual(self.graded_activities(activities), graded)
+            submission.refresh_from_db()
+            self.assertEqual(submission.marks, score)
@@ -0,0 +1,214 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from assessment import leaderboard
+from assessment.models import Contest, ContestSubmission
+from core.sorted_sets import LocalSortedSets, get_client
+
+User = get_user_model()
+
+
+@override_settings(CONTEST_LEADERBOARD_REBUILD_SECONDS=300)
+class ContestLeaderboardTest(APITestCase):
+    """
+    Test cases for the contest leaderboard kept in a sorted set.
+    """
+
+    def setUp(self):
+        get_client().flushdb()
+        self.now = timezone.now()
+        self.organizer = User.objects.create_user(
+            email="organizer@test.com",
+            username="organizer",
+            password="testpass123",
+            role="instructor",
+        )
+        self.contest = self.add_contest()
+        self.url = f"/api/assessment/contests/{self.contest.id}/leaderboard/"
+        self.client.force_authenticate(self.organizer)
+
+    def add_contest(self):
+        return Contest.objects.create(
+            title="Weekly",
+            organizer="YC",
+            start_datetime=self.now - timedelta(hours=1),
+            end_datetime=self.now + timedelta(hours=1),
+            created_by=self.organizer,
+        )
+
+    def submit(self, username, marks, minutes, contest=None):
+        user = User.objects.create_user(
+            email=f"{username}@test.com",
+            username=username,
+            password="testpass123",
+            first_name=username.title(),
+        )
+        return ContestSubmission.objects.create(
+            contest=contest or self.contest,
+            user=user,
+            status=ContestSubmission.STATUS_SUBMITTED,
+            marks=marks,
+            submitted_at=self.now + timedelta(minutes=minutes),
+        )
+
+    def ranking(self, contest=None):
+        board = leaderboard.get_board((contest or self.contest).id)
+        return [entry["user"] for entry in board.page()]
+
+    def test_submissions_are_placed_and_moved(self):
+        """Test new and re-graded submissions move on the board without a rebuild."""
+        self.submit("ana", 50, 3)
+        bob = self.submit("bob", 80, 2)
+        self.submit("cy", 50, 1)
+        self.assertEqual(self.ranking(), ["Bob", "Cy", "Ana"])
+
+        with patch.object(leaderboard, "build") as build:
+            dan = self.submit("dan", 60, 0)
+            self.assertEqual(self.ranking(), ["Bob", "Dan", "Cy", "Ana"])
+
+            bob.marks = 10
+            bob.save()
+            self.assertEqual(self.ranking(), ["Dan", "Cy", "Ana", "Bob"])
+
+            dan.status = ContestSubmission.STATUS_STARTED
+            dan.save()
+            self.assertEqual(self.ranking(), ["Cy", "Ana", "Bob"])
+        build.assert_not_called()
+
+        board = leaderboard.get_board(self.contest.id)
+        self.assertEqual(board.rank_of(bob.user_id)["rank"], 3)
+        self.assertEqual(len(board), 3)
+        leaderboard.build(self.contest.id)
+        self.assertEqual(self.ranking(), ["Cy", "Ana", "Bob"])
+
+    def test_entries_match_the_rendered_fields(self):
+        """Test entries carry name, avatar, score, time taken and submission time."""
+        ana = self.submit("ana", 50, 3)
+        ana.started_at = ana.submitted_at - timedelta(minutes=30)
+        ana.save()
+        entry = leaderboard.get_board(self.contest.id).rank_of(ana.user_id)
+        self.assertEqual(entry["user"], "Ana")
+        self.assertEqual(entry["score"], 50.0)
+        self.assertEqual(entry["time_taken"], "0:30:00")
+        self.assertTrue(entry["submitted_at"].startswith(str(ana.submitted_at.year)))
+        self.assertIsNone(entry["avatar"])
+
+        # Users with an avatar have its URL on their entry
+        avatar = type("Avatar", (), {"url": "/media/ana.png"})()
+        with patch.object(User, "avatar", avatar, create=True):
+            self.assertEqual(leaderboard._avatar(ana.user), "/media/ana.png")
+
+    def test_ties_are_ordered_by_submission_time(self):
+        """Test equal scores rank the earlier submission first, unsubmitted last."""
+        self.submit("ana", 50, 3)
+        self.submit("bob", 50, 1)
+        cy = self.submit("cy", 50, 2)
+        ContestSubmission.objects.filter(id=cy.id).update(submitted_at=None)
+        leaderboard.discard(self.contest.id)
+        self.assertEqual(self.ranking(), ["Bob", "Ana", "Cy"])
+
+    def test_etag_and_pages(self):
+        """Test unchanged boards answer 304 and pages keep absolute ranks."""
+        for index in range(5):
+            self.submit(f"user{index}", 100 - index, index)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual([entry["rank"] for entry in response.data], [1, 2, 3, 4, 5])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, {"offset": 1, "limit": 2})
+        self.assertEqual(
+            [(entry["rank"], entry["user"]) for entry in response.data],
+            [(2, "User1"), (3, "User2")],
+        )
+        response = self.client.get(self.url, {"limit": "many"})
+        self.assertEqual(response.status_code, 400)
+
+        self.submit("late", 1000, 10)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data[0]["user"], "Late")
+
+    def test_my_rank(self):
+        """Test leaderboard/me returns the user's entry and the board size."""
+        self.submit("ana", 50, 1)
+        bob = self.submit("bob", 80, 2)
+        url = f"/api/assessment/contests/{self.contest.id}/leaderboard/me/"
+
+        self.client.force_authenticate(bob.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["entry"]["rank"], 1)
+        self.assertEqual(response.data["entry"]["score"], 80.0)
+        self.assertEqual(response.data["total"], 2)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.client.force_authenticate(self.organizer)
+        response = self.client.get(url)
+        self.assertIsNone(response.data["entry"])
+        self.assertEqual(response.data["total"], 2)
+
+    def test_rebuilt_after_rebuild_interval(self):
+        """Test changes that skip the signals show up once the board is rebuilt."""
+        ana = self.submit("ana", 50, 1)
+        self.submit("bob", 80, 2)
+        self.assertEqual(self.ranking(), ["Bob", "Ana"])
+
+        ContestSubmission.objects.filter(id=ana.id).update(marks=90)
+        started = leaderboard.time.time()
+        with patch.object(leaderboard.time, "time", return_value=started + 10):
+            self.assertEqual(self.ranking(), ["Bob", "Ana"])
+        with patch.object(leaderboard.time, "time", return_value=started + 301):
+            self.assertEqual(self.ranking(), ["Ana", "Bob"])
+
+
+class LocalSortedSetsTest(APITestCase):
+    """
+    Test cases for the in-process stand-in for Redis sorted sets.
+    """
+
+    def setUp(self):
+        self.store = LocalSortedSets()
+
+    def test_ranks_follow_score_then_member(self):
+        """Test members are ordered like ZRANGE orders them, and move on ZADD."""
+        self.store.zadd("board", {"b": 1, "a": 1, "c": 0})
+        self.assertEqual(self.store.zrange("board", 0, -1), ["c", "a", "b"])
+        self.assertEqual(self.store.zrank("board", "b"), 2)
+
+        self.store.zadd("board", {"b": -1})
+        self.assertEqual(self.store.zrange("board", 0, 1), ["b", "c"])
+        self.assertEqual(self.store.zrem("board", "c", "missing"), 1)
+        self.assertIsNone(self.store.zrank("board", "c"))
+        self.assertEqual(self.store.zcard("board"), 2)
+
+    def test_transaction_and_expiry(self):
+        """Test queued commands run on execute and keys expire."""
+
+        def update(pipe):
+            self.assertIsNone(pipe.get("version"))
+            pipe.multi()
+            pipe.incr("version")
+            pipe.hset("entries", "a", "1")
+            self.assertIsNone(self.store.hget("entries", "a"))
+
+        self.assertEqual(self.store.transaction(update, "entries"), [1, None])
+        self.assertEqual(self.store.hmget("entries", ["a", "b"]), ["1", None])
+
+        started = time.time()
+        self.store.set("built", "1", ex=10)
+        with patch("core.sorted_sets.time.time", return_value=started + 11):
+            self.assertIsNone(self.store.get("built"))
@@ -0,0 +1,209 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from assessment import question_pool
+from assessment.models import Contest, SkillTest
+from course.models import Course, Question, Subtopic, Topic
+
+User = get_user_model()
+
+
+class QuestionPoolTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(name="Python", category="fundamentals")
+        self.other_course = Course.objects.create(name="Java", category="fundamentals")
+        self.topic = Topic.objects.create(
+            course=self.course, name="Loops", order_index=0
+        )
+        self.other_topic = Topic.objects.create(
+            course=self.course, name="Functions", order_index=1
+        )
+        self.subtopic = Subtopic.objects.create(
+            topic=self.topic, name="For loops", order_index=0
+        )
+
+    def add_question(self, question_type="descriptive", **fields):
+        fields.setdefault("level", "course")
+        fields.setdefault("course", self.course)
+        return Question.objects.create(
+            type=question_type,
+            title=f"{question_type} question",
+            content="Question",
+            categories=["skill_test"],
+            created_by=self.instructor,
+            **fields,
+        )
+
+    def ids(self, questions):
+        return {str(question.id) for question in questions}
+
+
+class QuestionPoolTest(QuestionPoolTestMixin, TestCase):
+    """
+    Test cases for sampling assessment questions from cached pools.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.in_subtopic = self.add_question(
+            level="subtopic", course=None, subtopic=self.subtopic
+        )
+        self.in_topic = self.add_question(level="topic", course=None, topic=self.topic)
+        self.in_other_topic = self.add_question(
+            level="topic", course=None, topic=self.other_topic
+        )
+        self.in_course = [self.add_question() for _ in range(3)]
+        self.in_other_course = self.add_question(course=self.other_course)
+
+    def test_candidates_per_scope(self):
+        """Test topic scopes include subtopics, course and all scopes."""
+        self.assertEqual(
+            set(question_pool.candidate_ids(f"topic:{self.topic.id}", "descriptive")),
+            self.ids([self.in_subtopic, self.in_topic]),
+        )
+        self.assertEqual(
+            set(question_pool.candidate_ids(f"course:{self.course.id}", "descriptive")),
+            self.ids(self.in_course),
+        )
+        self.assertEqual(
+            set(question_pool.candidate_ids("all", "descriptive")),
+            set(map(str, Question.objects.values_list("id", flat=True))),
+        )
+        self.assertEqual(question_pool.candidate_ids("all", "coding"), [])
+
+    def test_scope_of_assessments(self):
+        """Test skill tests use their topic, else their course, else everything."""
+        skill_test = SkillTest(course=self.course, topic=self.topic)
+        self.assertEqual(
+            question_pool.skill_test_scope(skill_test), f"topic:{self.topic.id}"
+        )
+        skill_test.topic = None
+        self.assertEqual(
+            question_pool.skill_test_scope(skill_test), f"course:{self.course.id}"
+        )
+        skill_test.course = None
+        self.assertEqual(question_pool.skill_test_scope(skill_test), "all")
+        self.assertEqual(
+            question_pool.course_scope(self.course.id), f"course:{self.course.id}"
+        )
+
+    def test_configured_plus_random_questions(self):
+        """Test configured questions are sent once, plus a sample of the rest."""
+        configured = self.in_course[0]
+        assessment = SkillTest(
+            questions_config={"descriptive": [str(configured.id)]},
+            questions_random_config={"descriptive": 2},
+        )
+        for _ in range(10):
+            questions = question_pool.select_questions(
+                assessment, question_pool.course_scope(self.course.id)
+            )
+            ids = [str(question["id"]) for question in questions]
+            self.assertEqual(len(ids), 3)
+            self.assertEqual(len(set(ids)), 3)
+            self.assertIn(str(configured.id), ids)
+            self.assertLessEqual(set(ids), self.ids(self.in_course))
+
+        topic_test = SkillTest(questions_random_config={"descriptive": 5})
+        questions = question_pool.select_questions(topic_test, f"topic:{self.topic.id}")
+        self.assertEqual(
+            {str(question["id"]) for question in questions},
+            self.ids([self.in_subtopic, self.in_topic]),
+        )
+        self.assertEqual(
+            set(questions[0]), set(question_pool.QUESTION_FIELDS), questions[0]
+        )
+
+    def test_pools_follow_question_changes(self):
+        """Test saving or deleting a question invalidates the cached pools."""
+        scope = question_pool.course_scope(self.course.id)
+        question_pool.candidate_ids(scope, "descriptive")
+        with self.assertNumQueries(0):
+            question_pool.candidate_ids(scope, "descriptive")
+
+        added = self.add_question()
+        self.assertIn(str(added.id), question_pool.candidate_ids(scope, "descriptive"))
+
+        added.course = self.other_course
+        added.save()
+        self.assertNotIn(
+            str(added.id), question_pool.candidate_ids(scope, "descriptive")
+        )
+
+        removed = self.in_course[0]
+        removed.delete()
+        self.assertEqual(
+            set(question_pool.candidate_ids(scope, "descriptive")),
+            self.ids(self.in_course[1:]),
+        )
+
+    @override_settings(ASSESSMENT_PAPER_POOL_SIZE=3)
+    def test_paper_pool(self):
+        """Test contests hand out cached papers until a question changes."""
+        contest = Contest(questions_random_config={"descriptive": 2})
+        contest.pk = 1
+        papers = question_pool._papers(contest, "all")
+        self.assertEqual(len(papers), 3)
+        for paper in papers:
+            self.assertEqual(len(paper), 2)
+
+        with self.assertNumQueries(1):
+            questions = question_pool.select_questions(
+                contest, "all", use_paper_pool=True
+            )
+        self.assertIn(
+            sorted(str(question["id"]) for question in questions),
+            [sorted(paper) for paper in papers],
+        )
+
+        # A different configuration has its own papers
+        contest.questions_random_config = {"descriptive": 1}
+        self.assertEqual(len(question_pool._papers(contest, "all")[0]), 1)
+
+        contest.questions_random_config = {"descriptive": 2}
+        self.add_question()
+        with self.assertNumQueries(2):
+            # Candidate pool, then the chosen questions
+            question_pool.select_questions(contest, "all", use_paper_pool=True)
+
+
+class StartQuestionsTest(QuestionPoolTestMixin, APITestCase):
+    """
+    Test cases for the questions sent when an assessment starts.
+    """
+
+    def test_skill_test_start_samples_its_topic(self):
+        """Test starting a topic skill test sends questions of that topic only."""
+        in_subtopic = self.add_question(
+            level="subtopic", course=None, subtopic=self.subtopic
+        )
+        self.add_question(level="topic", course=None, topic=self.other_topic)
+        skill_test = SkillTest.objects.create(
+            title="Loops",
+            course=self.course,
+            topic=self.topic,
+            questions_random_config={"descriptive": 5},
+            created_by=self.instructor,
+        )
+        student = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        self.client.force_authenticate(student)
+
+        response = self.client.post(
+            f"/api/assessment/skill-tests/{skill_test.id}/start/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [str(question["id"]) for question in response.data["questions"]],
+            [str(in_subtopic.id)],
+        )
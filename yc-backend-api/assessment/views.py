@@ -3,9 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db.models import Q, F
-from django.db import models
+from django.db import models, transaction
 from django.shortcuts import get_object_or_404
-import random
 import os
 import requests
 import json
@@ -26,6 +25,7 @@ from .models import (
     CertificationExam, CertificationSubmission, CertificationQuestionActivity, Certificate
 )
 from .mixins import ProctoringMixin
+from . import grading, leaderboard, question_pool
 from .serializers import (
     ContestSerializer, SkillTestSerializer, MockInterviewSerializer,
     SkillTestSubmissionSerializer, CertificationExamSerializer, CertificationSubmissionSerializer
@@ -94,37 +94,9 @@ class CertificationExamViewSet(ProctoringMixin, viewsets.ModelViewSet):
                 status=CertificationSubmission.STATUS_STARTED
             )
             
-        questions_to_send = []
-        # Reuse logic from SkillTest for questions... or simpler if only fixed config
-        # Assuming Certification also uses questions_config / random_config
-        
-        if exam.questions_config:
-            all_ids = []
-            for q_type, ids in exam.questions_config.items():
-                if isinstance(ids, list):
-                    all_ids.extend(ids)
-            if all_ids:
-                 questions_to_send = list(Question.objects.filter(id__in=all_ids).values(
-                    'id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'
-                ))
-        
-        # Random config logic
-        if exam.questions_random_config:
-            existing_ids = [q['id'] for q in questions_to_send]
-            for q_type, count in exam.questions_random_config.items():
-                if count > 0:
-                   candidates = list(Question.objects.filter(
-                       type=q_type,
-                       course=exam.course
-                   ).exclude(id__in=existing_ids).values('id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'))
-                   
-                   if len(candidates) >= count:
-                       selected = random.sample(candidates, count)
-                   else:
-                       selected = candidates
-                   questions_to_send.extend(selected)
-
-        random.shuffle(questions_to_send)
+        questions_to_send = question_pool.select_questions(
+            exam, question_pool.course_scope(exam.course_id)
+        )
         
         return Response({
             'submission_id': submission.id,
@@ -154,48 +126,18 @@ class CertificationExamViewSet(ProctoringMixin, viewsets.ModelViewSet):
         submission.completed_at = timezone.now()
         submission.answer_data = answers
         
-        total_score = 0
-        
-        # Calculate score (reusing simplified logic for now)
-        question_ids = answers.keys()
-        db_questions = Question.objects.filter(id__in=question_ids)
-        q_map = {str(q.id): q for q in db_questions}
-
-        for q_id, user_ans in answers.items():
-            if q_id not in q_map: continue
-            question = q_map[q_id]
-            
-            is_correct = False
-            marks_obtained = 0
-            
-            if question.type == 'mcq_single':
-                correct_opt = next((opt for opt in question.mcq_options if opt.get('is_correct')), None)
-                if correct_opt and user_ans == correct_opt['text']:
-                    marks_obtained = question.marks
-                    is_correct = True
-            elif question.type == 'mcq_multiple':
-                 correct_opts = set(opt['text'] for opt in question.mcq_options if opt.get('is_correct'))
-                 user_opts = set(user_ans) if isinstance(user_ans, list) else set([user_ans]) if user_ans else set()
-                 if correct_opts == user_opts and correct_opts:
-                     marks_obtained = question.marks
-                     is_correct = True
-            
-            CertificationQuestionActivity.objects.update_or_create(
-                certification_submission=submission,
-                question=question,
-                user=request.user,
-                defaults={
-                    'answer_data': {'answer': user_ans},
-                    'is_final_answer': True,
-                    'is_correct': is_correct,
-                    'marks_obtained': marks_obtained,
-                    'auto_graded': True
-                }
-            )
-            total_score += marks_obtained
-            
+        graded = grading.grade_answers(answers)
+        total_score = grading.total_marks(graded)
         submission.marks = total_score
-        submission.save()
+
+        with transaction.atomic():
+            grading.save_activities(
+                CertificationQuestionActivity, 'certification_submission',
+                submission, request.user, graded,
+                answer_data=lambda result: {'answer': result.answer},
+                auto_graded=lambda result: True,
+            )
+            submission.save()
         
         # Check for passing and issue certificate
         passed = False
@@ -252,7 +194,6 @@ class CertificationSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(certification_exam_id=exam_id)
         return qs
 
-from course.models import Question
 from authentication.permissions import IsOwnerOrInstructorOrAdmin
 from .mixins import ProctoringMixin
 from django.core.mail import send_mail
@@ -287,9 +228,13 @@ class ContestViewSet(ProctoringMixin, viewsets.ModelViewSet):
         date_from = self.request.query_params.get('date_from')
         date_to = self.request.query_params.get('date_to')
         
+        # Status follows the schedule, so it is derived from the datetimes
+        now = timezone.now()
+        qs = qs.annotate(live_status=Contest.status_expression(now))
+
         q = Q()
         if status_param:
-            q &= Q(status=status_param)
+            q &= Contest.status_filter(status_param, now)
             
         if type_param:
             q &= Q(type=type_param)
@@ -303,8 +248,6 @@ class ContestViewSet(ProctoringMixin, viewsets.ModelViewSet):
         if q:
             qs = qs.filter(q)
             
-        for obj in qs:
-            obj.update_status()
         return qs
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -360,34 +303,9 @@ class ContestViewSet(ProctoringMixin, viewsets.ModelViewSet):
         if contest.status != Contest.STATUS_ONGOING:
             return Response({'error': 'Contest is not live'}, status=status.HTTP_400_BAD_REQUEST)
 
-        questions_to_send = []
-
-        if contest.questions_config:
-            all_ids = []
-            for q_type, ids in contest.questions_config.items():
-                if isinstance(ids, list):
-                    all_ids.extend(ids)
-
-            if all_ids:
-                questions_to_send = list(Question.objects.filter(id__in=all_ids).values('id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'))
-
-        if contest.questions_random_config:
-            existing_ids = [q['id'] for q in questions_to_send]
-            
-            for q_type, count in contest.questions_random_config.items():
-                if count > 0:
-                    candidates = list(Question.objects.filter(
-                        type=q_type
-                    ).exclude(id__in=existing_ids).values('id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'))
-                    
-                    if len(candidates) >= count:
-                        selected = random.sample(candidates, count)
-                    else:
-                        selected = candidates
-                    
-                    questions_to_send.extend(selected)
-
-        random.shuffle(questions_to_send)
+        questions_to_send = question_pool.select_questions(
+            contest, 'all', use_paper_pool=True
+        )
 
         return Response({ 'submission_id': submission.id, 'duration': contest.duration, 'questions': questions_to_send})
 
@@ -406,27 +324,8 @@ class ContestViewSet(ProctoringMixin, viewsets.ModelViewSet):
         submission.status = ContestSubmission.STATUS_SUBMITTED
         submission.submitted_at = timezone.now()
         
-        total_score = 0
-        question_ids = answers.keys()
-        db_questions = Question.objects.filter(id__in=question_ids)
-        q_map = {str(q.id): q for q in db_questions}
-        
-        for q_id, user_ans in answers.items():
-            if q_id not in q_map:
-                continue
-            question = q_map[q_id]
-            
-            if question.type == 'mcq_single':
-                correct_opt = next((opt for opt in question.mcq_options if opt.get('is_correct')), None)
-                if correct_opt and user_ans == correct_opt['text']:
-                    total_score += question.marks
-            
-            elif question.type == 'mcq_multiple':
-                correct_opts = set(opt['text'] for opt in question.mcq_options if opt.get('is_correct'))
-                user_opts = set(user_ans) if isinstance(user_ans, list) else set([user_ans])
-                if correct_opts == user_opts:
-                    total_score += question.marks
-                    
+        # Contests have always graded multiple-choice answers non-strictly
+        total_score = grading.total_marks(grading.grade_answers(answers, strict=False))
         submission.marks = total_score
         submission.save()
         
@@ -450,30 +349,52 @@ class ContestViewSet(ProctoringMixin, viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def leaderboard(self, request, pk=None):
+        """
+        Ranked submitted entries, best first. ?offset=&limit= return one page;
+        unchanged boards answer If-None-Match with 304.
+        """
         contest = self.get_object()
-        
-        # 1. Fetch Submissions (Only submitted/completed ones)
-        submissions = ContestSubmission.objects.filter(
-            contest=contest,
-            status__in=[ContestSubmission.STATUS_SUBMITTED, ContestSubmission.STATUS_COMPLETED]
-        ).select_related('user').order_by('-marks', 'submitted_at')
-        
-        # 2. Build Leaderboard Data
-        leaderboard_data = []
-        rank = 1
-        
-        for sub in submissions:
-            leaderboard_data.append({
-                'rank': rank,
-                'user': f"{sub.user.first_name} {sub.user.last_name}".strip() or sub.user.username,
-                'avatar': sub.user.avatar.url if hasattr(sub.user, 'avatar') and sub.user.avatar else None,
-                'score': sub.marks,
-                'time_taken': str(sub.submitted_at - sub.started_at) if sub.submitted_at and sub.started_at else None,
-                'submitted_at': sub.submitted_at
-            })
-            rank += 1
-            
-        return Response(leaderboard_data, status=status.HTTP_200_OK)
+        board = leaderboard.get_board(contest.id)
+        if request.headers.get('If-None-Match') == board.etag:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': board.etag}
+            )
+
+        try:
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+            limit = request.query_params.get('limit')
+            limit = max(int(limit), 0) if limit is not None else None
+        except ValueError:
+            return Response(
+                {'error': 'offset and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            board.page(offset, limit),
+            status=status.HTTP_200_OK,
+            headers={'ETag': board.etag},
+        )
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='leaderboard/me',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def my_rank(self, request, pk=None):
+        contest = self.get_object()
+        board = leaderboard.get_board(contest.id)
+        if request.headers.get('If-None-Match') == board.etag:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': board.etag}
+            )
+
+        return Response(
+            {'entry': board.rank_of(request.user.id), 'total': len(board)},
+            status=status.HTTP_200_OK,
+            headers={'ETag': board.etag}
+        )
 
 
 class SkillTestViewSet(ProctoringMixin, viewsets.ModelViewSet):
@@ -548,53 +469,10 @@ class SkillTestViewSet(ProctoringMixin, viewsets.ModelViewSet):
                 status=SkillTestSubmission.STATUS_STARTED
             )
         
-        # 1. Resolve Questions
-        questions_to_send = []
-        
-        # Option A: Fixed Configuration
-        if skill_test.questions_config:
-            # Expected format: {'mcq_single': [id1, id2], ...}
-            all_ids = []
-            for q_type, ids in skill_test.questions_config.items():
-                if isinstance(ids, list):
-                    all_ids.extend(ids)
-            
-            if all_ids:
-                questions_to_send = list(Question.objects.filter(id__in=all_ids).values(
-                    'id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'
-                ))
-        
-        # Option B: Random Configuration (Additive)
-        if skill_test.questions_random_config:
-            # Expected format: {'mcq_single': 10, 'coding': 2}
-            
-            # Get IDs already selected to avoid duplicates
-            existing_ids = [q['id'] for q in questions_to_send]
-            
-            for q_type, count in skill_test.questions_random_config.items():
-                if count > 0:
-                    q_filter = Q(type=q_type)
-                    
-                    if skill_test.topic:
-                        # Include questions linked to subtopics of this topic OR directly to the topic
-                        q_filter &= (Q(subtopic__topic=skill_test.topic) | Q(topic=skill_test.topic))
-                    elif skill_test.course:
-                        q_filter &= Q(course=skill_test.course)
-                        
-                    # Fetch candidate questions excluding already selected ones
-                    candidates = list(Question.objects.filter(
-                        q_filter
-                    ).exclude(id__in=existing_ids).values('id', 'title', 'content', 'type', 'mcq_options', 'marks', 'test_cases_basic'))
-                    
-                    if len(candidates) >= count:
-                        selected = random.sample(candidates, count)
-                    else:
-                        selected = candidates # Take all if not enough
-                    
-                    questions_to_send.extend(selected)
-                    
-        # Shuffle final list
-        random.shuffle(questions_to_send)
+        # 1. Resolve Questions: configured ones plus a random sample per type
+        questions_to_send = question_pool.select_questions(
+            skill_test, question_pool.skill_test_scope(skill_test)
+        )
         
         # 2. Return Response
         return Response({
@@ -630,61 +508,23 @@ class SkillTestViewSet(ProctoringMixin, viewsets.ModelViewSet):
         submission.completed_at = timezone.now()
         submission.answer_data = answers
         
-        total_score = 0
-        
-        # Process each answer and create activities
-        for q_id in question_ids:
-            user_ans = answers.get(q_id)
-            try:
-                question = Question.objects.get(id=q_id)
-            except Question.DoesNotExist:
-                continue
-
-            marks_obtained = 0
-            is_correct = False
-            
-            # Grading Logic
-            if question.type == 'mcq_single':
-                correct_opt = next((opt for opt in question.mcq_options if opt.get('is_correct')), None)
-                if correct_opt and user_ans == correct_opt['text']:
-                    marks_obtained = question.marks
-                    is_correct = True
-            elif question.type == 'mcq_multiple':
-                 correct_opts = set(opt['text'] for opt in question.mcq_options if opt.get('is_correct'))
-                 user_opts = set(user_ans) if isinstance(user_ans, list) else set([user_ans]) if user_ans else set()
-                 if correct_opts == user_opts and correct_opts:
-                     marks_obtained = question.marks
-                     is_correct = True
-            elif question.type == 'coding':
-                # For coding, we'll mark as incorrect by default unless manually or auto-graded elsewhere
-                # But for now, if there's code, we give 0 or partial? 
-                # Let's keep it 0 as it's not auto-graded yet
-                marks_obtained = 0
-                is_correct = False
-            elif question.type == 'descriptive':
-                marks_obtained = 0
-                is_correct = False
-
-            # Create or update activity
-            SkillTestQuestionActivity.objects.update_or_create(
-                skill_test_submission=submission,
-                question=question,
-                user=request.user,
-                defaults={
-                    'answer_data': {
-                        'answer': user_ans,
-                        'explanation': explanations.get(q_id, '')
-                    },
-                    'is_final_answer': True,
-                    'is_correct': is_correct,
-                    'marks_obtained': marks_obtained,
-                    'auto_graded': True if question.type in ['mcq_single', 'mcq_multiple'] else False
-                }
-            )
-            total_score += marks_obtained
-        
+        graded = grading.grade_answers(answers, question_ids)
+        total_score = grading.total_marks(graded)
         submission.marks = total_score
-        submission.save()
+
+        with transaction.atomic():
+            grading.save_activities(
+                SkillTestQuestionActivity, 'skill_test_submission',
+                submission, request.user, graded,
+                answer_data=lambda result: {
+                    'answer': result.answer,
+                    'explanation': explanations.get(result.question_id, '')
+                },
+                auto_graded=lambda result: (
+                    result.question.type in grading.MCQ_TYPES
+                ),
+            )
+            submission.save()
         
         return Response({
             'status': 'submitted',
@@ -14,6 +14,9 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
+    # Partial saves such as update_last_login only write user columns
+    if update_fields is not None:
+        return
     if hasattr(instance, "profile"):
         instance.profile.save()
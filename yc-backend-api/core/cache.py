@@ -0,0 +1,135 @@
+"""
+Namespaced, versioned keys over the shared Django cache.
+
+With CACHE_URL set, settings.CACHES points every worker at the same Redis, so
+an invalidation made by one process is seen by all of them; otherwise (tests,
+local runs) each process has its own memory cache.
+
+- A key belongs to a namespace (usually a model) and optionally an entity
+  (usually a row id). The namespace and the entity each have a version token
+  stored in the cache, and the tokens are part of the key, so
+  invalidate(namespace) drops every key of the namespace and
+  invalidate(namespace, entity) the keys of one entity, without deleting or
+  listing them. The token is replaced once more when the transaction commits.
+- This is the one invalidation path for cached data: course_structure
+  (course/structure_cache.py), assessment_question_pool
+  (assessment/question_pool.py) and job_applications (job/serializers.py) all
+  keep their entries here and are invalidated from signals through
+  invalidate().
+- get_or_set() recomputes a missing value once: the caller that takes a short
+  lock computes it while the others wait up to CACHE_SINGLE_FLIGHT_WAIT
+  seconds for the result instead of all hitting the database.
+- Hits, misses, waits, lookup latency and recompute time are exported through
+  the Prometheus metrics in observability.py, labelled by namespace.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+from observability import CACHE_OPERATION_DURATION, CACHE_REQUESTS
+
+VERSION_PREFIX = "cache_version"
+LOCK_PREFIX = "cache_lock"
+WAIT_INTERVAL = 0.05
+
+_missing = object()
+
+
+def _version_key(namespace, entity=None):
+    if entity is None:
+        return f"{VERSION_PREFIX}:{namespace}"
+    return f"{VERSION_PREFIX}:{namespace}:{entity}"
+
+
+def _versions(namespace, entity=None):
+    """Version tokens of the namespace and entity, created if missing"""
+    keys = [_version_key(namespace)]
+    if entity is not None:
+        keys.append(_version_key(namespace, entity))
+    stored = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = stored.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def make_key(namespace, *parts, entity=None):
+    """The current cache key for ``parts`` within a namespace (and entity)"""
+    versions = _versions(namespace, entity)
+    segments = [namespace, versions[0]]
+    if entity is not None:
+        segments += [str(entity), versions[1]]
+    segments += [str(part) for part in parts]
+    return ":".join(segments)
+
+
+def invalidate(namespace, entity=None):
+    """Make the keys of a namespace, or of one of its entities, unreachable"""
+    key = _version_key(namespace, entity)
+
+    def bump():
+        cache.set(key, uuid.uuid4().hex, None)
+
+    bump()
+    # Again once committed, in case another request cached uncommitted rows
+    transaction.on_commit(bump)
+
+
+def _compute(namespace, key, compute, timeout):
+    started = time.perf_counter()
+    value = compute()
+    CACHE_OPERATION_DURATION.labels(namespace=namespace, operation="compute").observe(
+        time.perf_counter() - started
+    )
+    cache.set(key, value, timeout)
+    return value
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + settings.CACHE_SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(key, _missing)
+        if value is not _missing:
+            return value
+    return _missing
+
+
+def get_or_set(namespace, compute, *parts, entity=None, timeout=DEFAULT_TIMEOUT):
+    """
+    The cached value of ``parts`` in a namespace, computed by ``compute()`` on
+    a miss. Concurrent misses of the same key compute it once; a caller that
+    waited longer than CACHE_SINGLE_FLIGHT_WAIT computes it itself.
+    """
+    key = make_key(namespace, *parts, entity=entity)
+    started = time.perf_counter()
+    value = cache.get(key, _missing)
+    CACHE_OPERATION_DURATION.labels(namespace=namespace, operation="get").observe(
+        time.perf_counter() - started
+    )
+    if value is not _missing:
+        CACHE_REQUESTS.labels(namespace=namespace, result="hit").inc()
+        return value
+    CACHE_REQUESTS.labels(namespace=namespace, result="miss").inc()
+
+    lock_key = f"{LOCK_PREFIX}:{key}"
+    if cache.add(lock_key, 1, settings.CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT):
+        try:
+            return _compute(namespace, key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+
+    value = _wait_for(key)
+    if value is not _missing:
+        CACHE_REQUESTS.labels(namespace=namespace, result="wait").inc()
+        return value
+    return _compute(namespace, key, compute, timeout)
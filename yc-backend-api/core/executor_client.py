@@ -0,0 +1,199 @@
+"""
+Shared HTTP client for backend -> code executor calls.
+
+All calls go through one pooled requests.Session, so connections to the
+executor are kept alive and reused instead of opened per request. Idempotent
+calls are retried with exponential backoff on connection errors and
+502/503/504 responses. A circuit breaker fails calls fast while the executor is
+unreachable or saturated. Latency, outcomes, retries and the breaker state are
+exported through the Prometheus metrics in observability.py.
+"""
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from observability import (
+    EXECUTOR_CIRCUIT_OPEN,
+    EXECUTOR_REQUEST_DURATION,
+    EXECUTOR_REQUESTS,
+    EXECUTOR_RETRIES,
+)
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class ExecutorUnavailable(requests.exceptions.ConnectionError):
+    """Raised without calling the executor while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets a single trial call through, closing
+    again on success and reopening on failure
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+        EXECUTOR_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is None and self._failures < self.failure_threshold:
+                return
+            self._opened_at = time.monotonic()
+        EXECUTOR_CIRCUIT_OPEN.set(1)
+
+
+class ExecutorClient:
+    """Pooled, retrying client for the code executor service"""
+
+    def __init__(
+        self,
+        base_url,
+        pool_size=20,
+        keep_alive=True,
+        retries=2,
+        backoff=0.2,
+        breaker=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def post(self, path, json=None, timeout=15, idempotent=False, stream=False):
+        """
+        POST to the executor.
+
+        Args:
+            path (str): Endpoint path, e.g. "/execute-with-tests"
+            json (dict, optional): Request body
+            timeout (float): Seconds to wait for the connection and each read
+            idempotent (bool): Whether the call may be retried safely
+            stream (bool): Leave the response body unread (see requests)
+
+        Returns:
+            requests.Response: Responses of any status are returned as-is
+
+        Raises:
+            ExecutorUnavailable: The circuit breaker is open
+            requests.exceptions.RequestException: The call failed after retries
+        """
+        attempts = self.retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                EXECUTOR_REQUESTS.labels(endpoint=path, outcome="circuit_open").inc()
+                raise ExecutorUnavailable(
+                    "Code executor is unavailable, try again shortly"
+                )
+
+            last_attempt = attempt == attempts - 1
+            start = time.perf_counter()
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}", json=json, timeout=timeout, stream=stream
+                )
+            except requests.exceptions.RequestException as e:
+                EXECUTOR_REQUEST_DURATION.labels(endpoint=path).observe(
+                    time.perf_counter() - start
+                )
+                outcome = (
+                    "timeout"
+                    if isinstance(e, requests.exceptions.Timeout)
+                    else "connection_error"
+                )
+                EXECUTOR_REQUESTS.labels(endpoint=path, outcome=outcome).inc()
+                self.breaker.record_failure()
+                # A read timeout means the executor may still be running the
+                # code; sending it again would only add load
+                if last_attempt or isinstance(e, requests.exceptions.ReadTimeout):
+                    raise
+                self._wait_before_retry(path, attempt)
+                continue
+
+            EXECUTOR_REQUEST_DURATION.labels(endpoint=path).observe(
+                time.perf_counter() - start
+            )
+            if response.status_code in RETRY_STATUS_CODES:
+                EXECUTOR_REQUESTS.labels(endpoint=path, outcome="http_error").inc()
+                self.breaker.record_failure()
+                if not last_attempt:
+                    response.close()
+                    self._wait_before_retry(path, attempt)
+                    continue
+                return response
+
+            outcome = "success" if response.status_code < 500 else "http_error"
+            EXECUTOR_REQUESTS.labels(endpoint=path, outcome=outcome).inc()
+            # Other errors are about this request, not an overloaded executor
+            self.breaker.record_success()
+            return response
+
+    def _wait_before_retry(self, path, attempt):
+        EXECUTOR_RETRIES.labels(endpoint=path).inc()
+        delay = self.backoff * (2**attempt)
+        time.sleep(delay + random.uniform(0, delay))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_executor_client():
+    """Process-wide executor client, configured from settings"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ExecutorClient(
+                    settings.CODE_EXECUTOR_SERVICE_URL,
+                    pool_size=settings.CODE_EXECUTOR_POOL_SIZE,
+                    keep_alive=settings.CODE_EXECUTOR_KEEP_ALIVE,
+                    retries=settings.CODE_EXECUTOR_RETRIES,
+                    backoff=settings.CODE_EXECUTOR_RETRY_BACKOFF,
+                    breaker=CircuitBreaker(
+                        failure_threshold=settings.CODE_EXECUTOR_CIRCUIT_THRESHOLD,
+                        reset_timeout=settings.CODE_EXECUTOR_CIRCUIT_RESET,
+                    ),
+                )
+    return _client
@@ -0,0 +1,217 @@
+"""
+Sorted sets and hashes shared by every worker.
+
+With CACHE_URL set, get_client() returns a client of the Redis behind the
+Django cache, so ZADD, ZRANK and ZRANGE are O(log n) server-side commands and
+client.transaction() is a WATCH/MULTI/EXEC transaction. Without it (tests,
+local runs) LocalSortedSets stands in for it within the process: it implements
+the subset of the redis-py API the callers use, and holds one lock for each
+command and for the whole of a transaction.
+
+Values read back are bytes from Redis and str from LocalSortedSets; decode
+them with text().
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class _SortedSet:
+    def __init__(self):
+        self.entries = []  # [(score, member)], sorted
+        self.scores = {}
+
+    def position(self, member):
+        return bisect.bisect_left(self.entries, (self.scores[member], member))
+
+
+class LocalSortedSets:
+    """In-process stand-in for the Redis commands used on sorted sets"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = {}
+        self._expires = {}
+
+    def _get(self, key, default=None):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and time.time() >= expires_at:
+            self._data.pop(key, None)
+            del self._expires[key]
+        return self._data.get(key, default)
+
+    def _zset(self, key):
+        zset = self._get(key)
+        if zset is None:
+            zset = self._data[key] = _SortedSet()
+        return zset
+
+    def _hash(self, key):
+        fields = self._get(key)
+        if fields is None:
+            fields = self._data[key] = {}
+        return fields
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            zset = self._zset(key)
+            added = 0
+            for member, score in mapping.items():
+                if member in zset.scores:
+                    del zset.entries[zset.position(member)]
+                else:
+                    added += 1
+                zset.scores[member] = float(score)
+                bisect.insort(zset.entries, (float(score), member))
+            return added
+
+    def zrem(self, key, *members):
+        with self._lock:
+            zset = self._zset(key)
+            removed = 0
+            for member in members:
+                if member in zset.scores:
+                    del zset.entries[zset.position(member)]
+                    del zset.scores[member]
+                    removed += 1
+            return removed
+
+    def zrank(self, key, member):
+        with self._lock:
+            zset = self._zset(key)
+            return zset.position(member) if member in zset.scores else None
+
+    def zrange(self, key, start, end):
+        """Members ranked ``start`` to ``end`` inclusive; -1 is the last one"""
+        with self._lock:
+            entries = self._zset(key).entries
+            stop = len(entries) if end == -1 else end + 1
+            return [member for _, member in entries[start:stop]]
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._zset(key).entries)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        with self._lock:
+            fields = self._hash(key)
+            if field is not None:
+                fields[field] = value
+            fields.update(mapping or {})
+
+    def hget(self, key, field):
+        with self._lock:
+            return self._get(key, {}).get(field)
+
+    def hmget(self, key, fields):
+        with self._lock:
+            stored = self._get(key, {})
+            return [stored.get(field) for field in fields]
+
+    def hdel(self, key, *fields):
+        with self._lock:
+            stored = self._get(key, {})
+            return sum(stored.pop(field, None) is not None for field in fields)
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = str(value)
+            self._expires.pop(key, None)
+            if ex:
+                self._expires[key] = time.time() + ex
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._get(key) or 0) + 1
+            self._data[key] = str(value)
+            return value
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if self._get(key) is None:
+                return False
+            self._expires[key] = time.time() + seconds
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def pipeline(self, transaction=True):
+        return _LocalPipeline(self, buffered=True)
+
+    def transaction(self, func, *watches):
+        """Run ``func(pipe)`` and its queued commands as one step, like Redis"""
+        with self._lock:
+            pipe = _LocalPipeline(self, buffered=False)
+            func(pipe)
+            return pipe.execute()
+
+
+class _LocalPipeline:
+    """
+    Commands run at once until multi(), then are queued until execute(), which
+    runs them under the store's lock. pipeline() starts in queued mode.
+    """
+
+    def __init__(self, store, buffered):
+        self._store = store
+        self._buffered = buffered
+        self._commands = []
+
+    def multi(self):
+        self._buffered = True
+
+    def __getattr__(self, name):
+        command = getattr(self._store, name)
+        if not self._buffered:
+            return command
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        with self._store._lock:
+            results = [
+                command(*args, **kwargs) for command, args, kwargs in self._commands
+            ]
+        self._commands = []
+        return results
+
+
+def get_client():
+    """The Redis client for CACHE_URL, or this process's LocalSortedSets"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.CACHE_URL:
+                    import redis
+
+                    _client = redis.Redis.from_url(settings.CACHE_URL)
+                else:
+                    _client = LocalSortedSets()
+    return _client
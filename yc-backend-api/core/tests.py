@@ -0,0 +1,212 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from prometheus_client import REGISTRY
+
+from assessment import question_pool
+from course import structure_cache
+from course.models import Course, Question, Subtopic, Topic
+
+from . import cache as shared_cache
+from .executor_client import CircuitBreaker, ExecutorClient, ExecutorUnavailable
+
+User = get_user_model()
+
+
+@patch("core.executor_client.time.sleep")
+class ExecutorClientTest(SimpleTestCase):
+    """
+    Test cases for the shared code executor client.
+    """
+
+    def setUp(self):
+        self.client = ExecutorClient(
+            "http://executor",
+            retries=2,
+            backoff=0.01,
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30),
+        )
+        self.ok = MagicMock(status_code=200)
+
+    def test_idempotent_call_is_retried(self, _):
+        """Test connection errors and 503s are retried for idempotent calls."""
+        unavailable = MagicMock(status_code=503)
+        with patch.object(
+            self.client.session,
+            "post",
+            side_effect=[requests.exceptions.ConnectionError(), unavailable, self.ok],
+        ) as post:
+            response = self.client.post("/plagiarism-check", json={}, idempotent=True)
+        self.assertIs(response, self.ok)
+        self.assertEqual(post.call_count, 3)
+
+    def test_other_calls_are_not_retried(self, _):
+        """Test non-idempotent calls and read timeouts fail on the first error."""
+        with patch.object(
+            self.client.session,
+            "post",
+            side_effect=requests.exceptions.ConnectionError(),
+        ) as post:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.client.post("/execute", json={})
+        self.assertEqual(post.call_count, 1)
+
+        with patch.object(
+            self.client.session, "post", side_effect=requests.exceptions.ReadTimeout()
+        ) as post:
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                self.client.post("/execute-with-tests", json={}, idempotent=True)
+        self.assertEqual(post.call_count, 1)
+
+    def test_open_circuit_fails_fast(self, _):
+        """Test the breaker opens after repeated failures and recovers."""
+        with patch.object(
+            self.client.session,
+            "post",
+            side_effect=requests.exceptions.ConnectionError(),
+        ) as post:
+            for _attempt in range(3):
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    self.client.post("/execute", json={})
+            self.assertTrue(self.client.breaker.is_open)
+
+            with self.assertRaises(ExecutorUnavailable):
+                self.client.post("/execute", json={})
+            self.assertEqual(post.call_count, 3)
+
+        self.client.breaker.reset_timeout = 0
+        with patch.object(self.client.session, "post", return_value=self.ok):
+            self.assertIs(self.client.post("/execute", json={}), self.ok)
+        self.assertFalse(self.client.breaker.is_open)
+
+
+class SharedCacheTest(TestCase):
+    """
+    Test cases for the namespaced, versioned cache helpers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_values_are_computed_once(self):
+        """Test a cached value is reused until its key is invalidated."""
+        for _ in range(3):
+            value = shared_cache.get_or_set("jobs", self.compute, "count", entity=1)
+        self.assertEqual(value, 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidation_by_entity_and_namespace(self):
+        """Test invalidating an entity keeps its siblings, a namespace drops all."""
+        first = shared_cache.make_key("jobs", "count", entity=1)
+        second = shared_cache.make_key("jobs", "count", entity=2)
+        other = shared_cache.make_key("companies", "count")
+
+        shared_cache.invalidate("jobs", entity=1)
+        self.assertNotEqual(shared_cache.make_key("jobs", "count", entity=1), first)
+        self.assertEqual(shared_cache.make_key("jobs", "count", entity=2), second)
+
+        shared_cache.invalidate("jobs")
+        self.assertNotEqual(shared_cache.make_key("jobs", "count", entity=2), second)
+        self.assertEqual(shared_cache.make_key("companies", "count"), other)
+
+    @patch("core.cache.time.sleep")
+    def test_concurrent_miss_waits_for_the_computing_caller(self, sleep):
+        """Test a caller that finds the key locked waits for its value."""
+        key = shared_cache.make_key("jobs", "count", entity=1)
+        cache.add(f"{shared_cache.LOCK_PREFIX}:{key}", 1)
+        sleep.side_effect = lambda _: cache.set(key, 42)
+
+        value = shared_cache.get_or_set("jobs", self.compute, "count", entity=1)
+        self.assertEqual(value, 42)
+        self.assertEqual(self.calls, 0)
+
+
+class CacheNamespacesTest(TestCase):
+    """
+    Test cases for the caches built on the shared cache helpers.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@test.com",
+            username="instructor",
+            password="testpass123",
+            role="instructor",
+        )
+        self.course = Course.objects.create(name="Python", category="fundamentals")
+        topic = Topic.objects.create(course=self.course, name="Loops", order_index=0)
+        self.subtopic = Subtopic.objects.create(
+            topic=topic, name="For loops", order_index=0
+        )
+        # Start from empty caches, whatever the signals above cached
+        cache.clear()
+        structure_cache._local.clear()
+
+    def requests(self, namespace, result):
+        value = REGISTRY.get_sample_value(
+            "cache_requests_total", {"namespace": namespace, "result": result}
+        )
+        return value or 0
+
+    def add_question(self, **fields):
+        return Question.objects.create(
+            type="descriptive",
+            title="Explain loops",
+            content="Question",
+            categories=["skill_test"],
+            created_by=self.instructor,
+            **fields,
+        )
+
+    def test_course_structure(self):
+        """Test course structures are counted and invalidated by the helpers."""
+        namespace = structure_cache.NAMESPACE
+        misses = self.requests(namespace, "miss")
+        hits = self.requests(namespace, "hit")
+
+        self.assertEqual(structure_cache.subtopic_count(self.course.id), 1)
+        structure_cache._local.clear()
+        structure_cache.subtopic_count(self.course.id)
+        self.assertEqual(self.requests(namespace, "miss"), misses + 1)
+        self.assertEqual(self.requests(namespace, "hit"), hits + 1)
+
+        key = shared_cache.make_key(namespace, entity=self.course.id)
+        self.add_question(level="subtopic", subtopic=self.subtopic)
+        self.assertNotEqual(
+            shared_cache.make_key(namespace, entity=self.course.id), key
+        )
+        structure = structure_cache.get_structure(self.course.id)
+        self.assertEqual(
+            structure["question_types"], {str(self.subtopic.id): {"descriptive": 1}}
+        )
+        self.assertEqual(self.requests(namespace, "miss"), misses + 2)
+
+    def test_question_pool(self):
+        """Test question pools are counted and invalidated by the helpers."""
+        namespace = question_pool.NAMESPACE
+        scope = question_pool.course_scope(self.course.id)
+        misses = self.requests(namespace, "miss")
+        hits = self.requests(namespace, "hit")
+
+        self.assertEqual(question_pool.candidate_ids(scope, "descriptive"), [])
+        question_pool.candidate_ids(scope, "descriptive")
+        self.assertEqual(self.requests(namespace, "miss"), misses + 1)
+        self.assertEqual(self.requests(namespace, "hit"), hits + 1)
+
+        key = shared_cache.make_key(namespace, "pool", scope, "descriptive")
+        question = self.add_question(level="course", course=self.course)
+        self.assertNotEqual(
+            shared_cache.make_key(namespace, "pool", scope, "descriptive"), key
+        )
+        self.assertEqual(
+            question_pool.candidate_ids(scope, "descriptive"), [str(question.id)]
+        )
+        self.assertEqual(self.requests(namespace, "miss"), misses + 2)
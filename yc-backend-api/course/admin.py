@@ -10,6 +10,7 @@ from .models import (
     StudentCodePractice,
     UserCourseProgress,
 )
+from . import progress_rollup
 
 
 class TopicInline(admin.TabularInline):
@@ -369,6 +370,7 @@ class UserCourseProgressAdmin(admin.ModelAdmin):
         updated_count = queryset.update(
             is_completed=True, progress_percent=100.0, completed_at=timezone.now()
         )
+        progress_rollup.refresh_rollups(queryset)
 
         self.message_user(
             request, f"Successfully marked {updated_count} records as completed."
@@ -0,0 +1,65 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from assessment.models import BaseQuestionActivity
+from course import plagiarism_index
+from course.models import CodeFingerprint, StudentCodePractice
+
+
+class Command(BaseCommand):
+    help = "Index existing coding submissions for plagiarism detection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help=(
+                "Drop the existing index first "
+                "(needed after changing k-gram settings)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            self.stdout.write("Clearing existing fingerprint index...")
+            CodeFingerprint.objects.all().delete()
+
+        practices = StudentCodePractice.objects.select_related("question", "user")
+        count = 0
+        for practice in practices.iterator():
+            answer = practice.answer_latest or {}
+            if answer.get("code"):
+                self._index(practice, answer)
+                count += 1
+        self.stdout.write(f"Indexed {count} practice submissions")
+
+        for model in apps.get_models():
+            if not issubclass(model, BaseQuestionActivity):
+                continue
+            activities = model.objects.filter(
+                is_final_answer=True, question__type="coding"
+            ).select_related("question", "user")
+            count = 0
+            for activity in activities.iterator():
+                answer = activity.answer_data
+                if isinstance(answer, dict):
+                    answer = {
+                        "code": answer.get("code") or answer.get("source_code"),
+                        "language": answer.get("language"),
+                    }
+                    if answer["code"] and answer["language"]:
+                        self._index(activity, answer)
+                        count += 1
+            self.stdout.write(f"Indexed {count} {model._meta.verbose_name} answers")
+
+        self.stdout.write(self.style.SUCCESS("Plagiarism index is up to date."))
+
+    def _index(self, record, answer):
+        plagiarism_index.index_submission(
+            question=record.question,
+            user=record.user,
+            source=record._meta.label_lower,
+            source_id=record.id,
+            language=answer.get("language", ""),
+            code=answer["code"],
+        )
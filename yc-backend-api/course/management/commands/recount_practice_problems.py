@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from course import practice_stats
+from course.models import Course
+
+
+class Command(BaseCommand):
+    help = "Recount the practice problems of every course and topic"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", help="Recount only the course with this id")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options["course"]:
+            courses = courses.filter(id=options["course"])
+        count = 0
+        for course_id in courses.values_list("id", flat=True).iterator():
+            practice_stats.refresh_problem_counts(course_id)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted practice problems for {count} courses.")
+        )
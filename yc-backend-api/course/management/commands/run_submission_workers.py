@@ -0,0 +1,43 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from course.submission_queue import SubmissionWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Evaluate queued code submissions against the code executor"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.CODE_SUBMISSION_WORKERS,
+            help="Number of submissions evaluated at the same time",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.CODE_SUBMISSION_POLL_INTERVAL,
+            help="Seconds an idle worker waits before checking the queue again",
+        )
+
+    def handle(self, *args, **options):
+        pool = SubmissionWorkerPool(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+        )
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping submission workers...")
+            pool.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Running {options['concurrency']} submission workers")
+        )
+        pool.run_forever()
+        self.stdout.write(self.style.SUCCESS("Submission workers stopped."))
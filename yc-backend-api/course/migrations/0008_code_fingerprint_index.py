@@ -0,0 +1,106 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("course", "0007_codesubmissionjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CodeFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "source",
+                    models.CharField(
+                        help_text="Model label of the submission record, e.g. 'course.studentcodepractice'",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "source_id",
+                    models.UUIDField(help_text="Primary key of the submission record"),
+                ),
+                ("language", models.CharField(max_length=20)),
+                ("code", models.TextField()),
+                ("fingerprint_count", models.PositiveIntegerField(default=0)),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="code_fingerprints",
+                        to="course.question",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="code_fingerprints",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "unique_together": {("source", "source_id")},
+            },
+        ),
+        migrations.CreateModel(
+            name="CodeFingerprintHash",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=100)),
+                ("hash", models.BigIntegerField()),
+                (
+                    "fingerprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hashes",
+                        to="course.codefingerprint",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="course.question",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["question", "source", "hash"],
+                        name="course_code_questio_3f0948_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def build_rollups(apps, schema_editor):
+    Subtopic = apps.get_model("course", "Subtopic")
+    UserCourseProgress = apps.get_model("course", "UserCourseProgress")
+    UserCourseRollup = apps.get_model("course", "UserCourseRollup")
+
+    subtopic_counts = dict(
+        Subtopic.objects.order_by()
+        .values_list("topic__course_id")
+        .annotate(total=models.Count("id"))
+    )
+    rollups = {}
+    progress_records = UserCourseProgress.objects.order_by(
+        "last_accessed", "updated_at"
+    )
+    for p in progress_records.iterator():
+        rollup = rollups.get((p.user_id, p.course_id))
+        if rollup is None:
+            rollup = rollups[(p.user_id, p.course_id)] = UserCourseRollup(
+                user_id=p.user_id,
+                course_id=p.course_id,
+                subtopics_total=subtopic_counts.get(p.course_id, 0),
+            )
+        rollup.started_count += 1
+        rollup.completed_count += int(p.is_completed)
+        rollup.progress_sum += p.progress_percent
+        rollup.minutes_estimate += (
+            5
+            + 15 * p.is_videos_watched
+            + 10 * p.is_quiz_completed
+            + 25 * p.is_coding_completed
+        )
+        # Records come oldest first, so the last one seen is the latest
+        rollup.last_accessed_subtopic_id = p.subtopic_id
+        rollup.last_accessed = p.last_accessed
+    UserCourseRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("course", "0008_code_fingerprint_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserCourseRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "subtopics_total",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of subtopics in the course"
+                    ),
+                ),
+                (
+                    "started_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Subtopics with a progress record"
+                    ),
+                ),
+                ("completed_count", models.PositiveIntegerField(default=0)),
+                (
+                    "progress_sum",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="Sum of progress_percent over the progress records",
+                    ),
+                ),
+                (
+                    "minutes_estimate",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Estimated minutes spent on the course"
+                    ),
+                ),
+                ("last_accessed", models.DateTimeField(blank=True, null=True)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_rollups",
+                        to="course.course",
+                    ),
+                ),
+                (
+                    "last_accessed_subtopic",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="course.subtopic",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="course_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-last_accessed"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-last_accessed"],
+                        name="course_user_user_id_4c7ac0_idx",
+                    )
+                ],
+                "unique_together": {("user", "course")},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
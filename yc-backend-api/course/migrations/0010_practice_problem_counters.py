@@ -0,0 +1,147 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+from collections import Counter
+
+
+def is_practice_problem(question_type, categories):
+    return question_type == "coding" and "practice" in (categories or [])
+
+
+def build_counters(apps, schema_editor):
+    Course = apps.get_model("course", "Course")
+    Topic = apps.get_model("course", "Topic")
+    Question = apps.get_model("course", "Question")
+    StudentCodePractice = apps.get_model("course", "StudentCodePractice")
+    UserCoursePracticeStats = apps.get_model("course", "UserCoursePracticeStats")
+
+    course_totals = Counter()
+    topic_totals = Counter()
+    questions = Question.objects.filter(type="coding").values_list(
+        "categories",
+        "course_id",
+        "topic_id",
+        "topic__course_id",
+        "subtopic__topic_id",
+        "subtopic__topic__course_id",
+    )
+    for (
+        categories,
+        course_id,
+        topic_id,
+        topic_course_id,
+        sub_topic_id,
+        sub_course_id,
+    ) in questions.iterator():
+        if not is_practice_problem("coding", categories):
+            continue
+        for course in (course_id, topic_course_id, sub_course_id):
+            if course:
+                course_totals[course] += 1
+        for topic in (topic_id, sub_topic_id):
+            if topic:
+                topic_totals[topic] += 1
+    for course_id, total in course_totals.items():
+        Course.objects.filter(id=course_id).update(total_practice_problems=total)
+    for topic_id, total in topic_totals.items():
+        Topic.objects.filter(id=topic_id).update(total_practice_problems=total)
+
+    stats = {}
+    submissions = StudentCodePractice.objects.filter(
+        course__isnull=False, question__type="coding"
+    ).values_list(
+        "user_id",
+        "course_id",
+        "question__categories",
+        "status",
+        "marks_obtained",
+        "ai_help_count",
+    )
+    for (
+        user_id,
+        course_id,
+        categories,
+        status,
+        marks,
+        ai_help,
+    ) in submissions.iterator():
+        row = stats.get((user_id, course_id))
+        if row is None:
+            row = stats[(user_id, course_id)] = UserCoursePracticeStats(
+                user_id=user_id, course_id=course_id
+            )
+        if not is_practice_problem("coding", categories):
+            continue
+        row.solved_problems += int(status in ("completed", "evaluated"))
+        row.total_score += marks or 0.0
+        row.ai_help_used += ai_help or 0
+    UserCoursePracticeStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("course", "0009_usercourserollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="total_practice_problems",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Practice coding questions of the course, its topics and subtopics (maintained by course/practice_stats.py)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="total_practice_problems",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Practice coding questions of the topic and its subtopics (maintained by course/practice_stats.py)",
+            ),
+        ),
+        migrations.CreateModel(
+            name="UserCoursePracticeStats",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("solved_problems", models.PositiveIntegerField(default=0)),
+                ("total_score", models.FloatField(default=0.0)),
+                ("ai_help_used", models.PositiveIntegerField(default=0)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_practice_stats",
+                        to="course.course",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="course_practice_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "unique_together": {("user", "course")},
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
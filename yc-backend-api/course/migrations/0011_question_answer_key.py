@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+def build_answer_keys(apps, schema_editor):
+    Question = apps.get_model("course", "Question")
+    questions = Question.objects.filter(type__in=["mcq_single", "mcq_multiple"])
+    updated = []
+    for question in questions.only("id", "mcq_options").iterator():
+        question.mcq_answer_key = sorted(
+            {
+                option["text"]
+                for option in question.mcq_options or []
+                if isinstance(option, dict) and option.get("is_correct")
+            }
+        )
+        updated.append(question)
+    Question.objects.bulk_update(updated, ["mcq_answer_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0010_practice_problem_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="mcq_answer_key",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Sorted texts of the correct MCQ options, derived from mcq_options on save",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(build_answer_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:16
+
+from django.db import migrations, models
+
+
+def keep_first_correct_option(apps, schema_editor):
+    Question = apps.get_model("course", "Question")
+    updated = []
+    for question in (
+        Question.objects.filter(type="mcq_single").only("id", "mcq_options").iterator()
+    ):
+        first = next(
+            (
+                option
+                for option in question.mcq_options or []
+                if isinstance(option, dict) and option.get("is_correct")
+            ),
+            None,
+        )
+        question.mcq_answer_key = [first["text"]] if first else []
+        updated.append(question)
+    Question.objects.bulk_update(updated, ["mcq_answer_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0011_question_answer_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="question",
+            name="mcq_answer_key",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Sorted texts of the correct MCQ options (the first one only for mcq_single), derived from mcq_options on save",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(keep_first_correct_option, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ import uuid
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from core.models import BaseTimestampedModel
@@ -29,6 +30,13 @@ class Course(models.Model):
     instructors = models.ManyToManyField(
         User, through="CourseInstructor", related_name="courses_taught"
     )
+    total_practice_problems = models.PositiveIntegerField(
+        default=0,
+        help_text=(
+            "Practice coding questions of the course, its topics and subtopics "
+            "(maintained by course/practice_stats.py)"
+        ),
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -47,6 +55,13 @@ class Topic(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="topics")
     name = models.CharField(max_length=255)
     order_index = models.PositiveIntegerField(validators=[MinValueValidator(0)])
+    total_practice_problems = models.PositiveIntegerField(
+        default=0,
+        help_text=(
+            "Practice coding questions of the topic and its subtopics "
+            "(maintained by course/practice_stats.py)"
+        ),
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -274,11 +289,12 @@ class UserCourseProgress(BaseTimestampedModel):
         return f"{self.user.username} - {self.subtopic.name} ({self.progress_percent:.1f}%)"
 
     def calculate_progress(self):
-        # Use .all() to leverage prefetch_related if available
-        questions = self.subtopic.questions.all()
+        from .structure_cache import question_type_counts
 
-        has_quiz = any(q.type in ["mcq_single", "mcq_multiple"] for q in questions)
-        has_coding = any(q.type == "coding" for q in questions)
+        question_types = question_type_counts(self.course_id, self.subtopic_id)
+
+        has_quiz = any(question_types.get(t) for t in ["mcq_single", "mcq_multiple"])
+        has_coding = bool(question_types.get("coding"))
 
         w_video = 20.0
         w_quiz = 30.0 if has_quiz else 0.0
@@ -307,6 +323,56 @@ class UserCourseProgress(BaseTimestampedModel):
         return self.progress_percent
 
 
+class UserCourseRollup(BaseTimestampedModel):
+    """
+    Per-(user, course) totals of UserCourseProgress, kept up to date by
+    course/progress_rollup.py so the dashboard reads one row per course
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="course_rollups",
+    )
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="user_rollups"
+    )
+
+    subtopics_total = models.PositiveIntegerField(
+        default=0, help_text="Number of subtopics in the course"
+    )
+    started_count = models.PositiveIntegerField(
+        default=0, help_text="Subtopics with a progress record"
+    )
+    completed_count = models.PositiveIntegerField(default=0)
+    progress_sum = models.FloatField(
+        default=0.0, help_text="Sum of progress_percent over the progress records"
+    )
+    minutes_estimate = models.PositiveIntegerField(
+        default=0, help_text="Estimated minutes spent on the course"
+    )
+
+    last_accessed_subtopic = models.ForeignKey(
+        Subtopic, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_accessed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("user", "course")
+        ordering = ["-last_accessed"]
+        indexes = [models.Index(fields=["user", "-last_accessed"])]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.course.name} ({self.percent:.1f}%)"
+
+    @property
+    def percent(self):
+        """Average progress over all subtopics of the course, capped at 100"""
+        if not self.subtopics_total:
+            return 0.0
+        return min(self.progress_sum / self.subtopics_total, 100.0)
+
+
 class Question(models.Model):
     """
     Unified Question Bank model for storing questions at different levels (course, topic, subtopic)
@@ -383,6 +449,15 @@ class Question(models.Model):
         blank=True,
         help_text="Options for MCQ questions with answer info. Format: [{'text': 'Option 1', 'is_correct': True}, {'text': 'Option 2', 'is_correct': False}]",
     )
+    mcq_answer_key = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=(
+            "Sorted texts of the correct MCQ options (the first one only for "
+            "mcq_single), derived from mcq_options on save"
+        ),
+    )
 
     # Coding specific fields
     test_cases_basic = models.JSONField(
@@ -482,8 +557,37 @@ class Question(models.Model):
                     "Coding questions must have at least 1 basic test case"
                 )
 
+    def build_answer_key(self):
+        """
+        Sorted texts of the correct options, or None for non-MCQ questions.
+        A single-choice question is answered by its first correct option only.
+        """
+        if self.type not in ["mcq_single", "mcq_multiple"]:
+            return None
+        if self.type == "mcq_single":
+            first = next(
+                (
+                    option
+                    for option in self.mcq_options or []
+                    if option.get("is_correct")
+                ),
+                None,
+            )
+            return [first["text"]] if first else []
+        return sorted(
+            {
+                option["text"]
+                for option in self.mcq_options or []
+                if option.get("is_correct")
+            }
+        )
+
     def save(self, *args, **kwargs):
         self.full_clean()
+        self.mcq_answer_key = self.build_answer_key()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"type", "mcq_options"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "mcq_answer_key"}
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -558,10 +662,14 @@ class StudentCodePractice(BaseTimestampedModel):
         blank=True,
         help_text="Complete submission history: [{'timestamp': '2024-12-14T10:05:00Z', 'answer_data': {...}, 'is_auto_save': false, 'execution_results': {...}}]",
     )
-    
-    answer_attempt_count = models.IntegerField(default=0, help_text="Number of times answer was modified")
-    ai_help_count = models.IntegerField(default=0, help_text="Number of times AI help was used")
-    
+
+    answer_attempt_count = models.IntegerField(
+        default=0, help_text="Number of times answer was modified"
+    )
+    ai_help_count = models.IntegerField(
+        default=0, help_text="Number of times AI help was used"
+    )
+
     execution_output = models.TextField(blank=True, help_text="Code execution output")
 
     plagiarism_data = models.JSONField(
@@ -592,3 +700,145 @@ class StudentCodePractice(BaseTimestampedModel):
             if total_tests > 0:
                 success_rate = (total_passed / total_tests) * 100
         return f"{self.user.username} - {self.question.title[:30]} - {language} ({success_rate:.1f}%)"
+
+
+class UserCoursePracticeStats(BaseTimestampedModel):
+    """
+    A user's totals over their practice coding submissions in a course, kept
+    up to date by course/practice_stats.py for the course catalogue
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="course_practice_stats"
+    )
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="user_practice_stats"
+    )
+    solved_problems = models.PositiveIntegerField(default=0)
+    total_score = models.FloatField(default=0.0)
+    ai_help_used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created_at"]
+        unique_together = ("user", "course")
+
+    def __str__(self):
+        return (
+            f"{self.user.username} - {self.course.name} "
+            f"({self.solved_problems} solved)"
+        )
+
+
+class CodeSubmissionJob(BaseTimestampedModel):
+    """
+    A code submission waiting for (or done with) evaluation by the submission
+    workers (`manage.py run_submission_workers`), so web workers never wait on
+    the code executor
+    """
+
+    KIND_PRACTICE_SUBMIT = "practice_submit"
+    KIND_COURSE_CODING = "course_coding"
+    KIND_CHOICES = [
+        (KIND_PRACTICE_SUBMIT, "Code Practice Submission"),
+        (KIND_COURSE_CODING, "Course Coding Submission"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+    FINISHED_STATUSES = [STATUS_COMPLETED, STATUS_FAILED]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="code_submission_jobs"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+
+    request_data = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text="Request body of the submit endpoint",
+    )
+    test_results = models.JSONField(
+        default=list,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text=(
+            "Per-test-case results as they complete: "
+            "[{'category': 'basic', 'index': 0, 'result': {...}}]"
+        ),
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text="Response body the submit endpoint would have returned",
+    )
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} ({self.status})"
+
+
+class CodeFingerprint(BaseTimestampedModel):
+    """
+    Winnowed k-gram fingerprint of a coding submission (see
+    course/plagiarism_index.py), one per submission record
+    """
+
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="code_fingerprints"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="code_fingerprints"
+    )
+    source = models.CharField(
+        max_length=100,
+        help_text=(
+            "Model label of the submission record, e.g. 'course.studentcodepractice'"
+        ),
+    )
+    source_id = models.UUIDField(help_text="Primary key of the submission record")
+    language = models.CharField(max_length=20)
+    code = models.TextField()
+    fingerprint_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created_at"]
+        unique_together = ["source", "source_id"]
+
+    def __str__(self):
+        return f"{self.source}:{self.source_id} ({self.fingerprint_count} hashes)"
+
+
+class CodeFingerprintHash(models.Model):
+    """Inverted index entry: one selected k-gram hash of a CodeFingerprint"""
+
+    fingerprint = models.ForeignKey(
+        CodeFingerprint, on_delete=models.CASCADE, related_name="hashes"
+    )
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="+")
+    source = models.CharField(max_length=100)
+    hash = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["question", "source", "hash"])]
@@ -0,0 +1,182 @@
+"""
+Per-question fingerprint index for plagiarism detection.
+
+Every coding submission is reduced to a set of fingerprints: the code is
+tokenized with identifiers, numbers and string literals collapsed (so renaming
+variables does not hide a copy), hashed in overlapping k-grams of tokens and
+thinned out by winnowing. The selected hashes are stored in an inverted index
+(CodeFingerprintHash) keyed by question and submission source.
+
+A new submission looks up the submissions sharing the most fingerprints with
+it through that index, which stays fast however many submissions a question
+has; only those top candidates are sent to the code executor for exact
+scoring. Submissions are indexed as they arrive, and
+`manage.py build_plagiarism_index` backfills existing ones.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import CodeFingerprint, CodeFingerprintHash
+
+# Kept verbatim by the tokenizer; every other identifier becomes "V"
+KEYWORDS = set(
+    """
+    and as assert async await break class continue def del elif else except
+    finally for from global if import in is lambda None nonlocal not or pass
+    raise return True False try while with yield
+    auto bool boolean case catch char const default delete do double enum
+    extends final float function implements include int interface let long new
+    null private protected public short signed sizeof static struct switch
+    template this throw typedef typename unsigned using var void namespace true
+    false
+    """.split()
+)
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`[^`]*`)
+    | (?P<number>\d[\w.]*)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<symbol>\S)
+    """,
+    re.VERBOSE,
+)
+
+
+def strip_comments(code, language):
+    if language == "python":
+        return re.sub(r"#.*$", "", code, flags=re.MULTILINE)
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
+    return re.sub(r"//.*$", "", code, flags=re.MULTILINE)
+
+
+def tokenize(code, language):
+    """Token stream with identifiers, numbers and strings collapsed"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(strip_comments(code or "", language)):
+        kind = match.lastgroup
+        if kind == "string":
+            tokens.append("S")
+        elif kind == "number":
+            tokens.append("N")
+        elif kind == "name":
+            value = match.group()
+            tokens.append(value if value in KEYWORDS else "V")
+        else:
+            tokens.append(match.group())
+    return tokens
+
+
+def kgram_hashes(tokens, k):
+    """63-bit hashes of every run of k consecutive tokens"""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                "\x1f".join(tokens[i : i + k]).encode(), digest_size=8
+            ).digest(),
+            "big",
+        )
+        >> 1
+        for i in range(len(tokens) - k + 1)
+    ]
+
+
+def winnow(hashes, window):
+    """
+    Winnowing: keep the minimum hash of every window of `window` consecutive
+    hashes. Any shared run of window + k - 1 tokens is guaranteed to share a
+    fingerprint, while only a fraction of all hashes is stored.
+    """
+    if len(hashes) <= window:
+        return {min(hashes)} if hashes else set()
+    return {
+        min(hashes[start : start + window]) for start in range(len(hashes) - window + 1)
+    }
+
+
+def fingerprint(code, language):
+    tokens = tokenize(code, language)
+    if not tokens:
+        return set()
+    # Code shorter than one k-gram is hashed as a whole
+    k = min(settings.PLAGIARISM_KGRAM_SIZE, len(tokens))
+    hashes = kgram_hashes(tokens, k)
+    return winnow(hashes, settings.PLAGIARISM_WINNOW_WINDOW)
+
+
+@transaction.atomic
+def index_submission(question, user, source, source_id, language, code):
+    """Add or refresh one submission's fingerprints in the index"""
+    hashes = fingerprint(code, language)
+    record, _ = CodeFingerprint.objects.update_or_create(
+        source=source,
+        source_id=source_id,
+        defaults={
+            "question": question,
+            "user": user,
+            "language": language,
+            "code": code,
+            "fingerprint_count": len(hashes),
+        },
+    )
+    record.hashes.all().delete()
+    CodeFingerprintHash.objects.bulk_create(
+        CodeFingerprintHash(
+            fingerprint=record, question=question, source=source, hash=value
+        )
+        for value in hashes
+    )
+    return record
+
+
+def find_candidates(question, source, code, language, exclude_user=None, limit=None):
+    """
+    Indexed submissions most likely copied from or into `code`, best first.
+
+    Returns:
+        list: CodeFingerprint objects, each with `shared` (fingerprints in
+        common) and `containment` (shared / size of the smaller fingerprint)
+    """
+    limit = limit or settings.PLAGIARISM_MAX_CANDIDATES
+    hashes = fingerprint(code, language)
+    if not hashes:
+        return []
+
+    postings = CodeFingerprintHash.objects.filter(
+        question=question, source=source, hash__in=hashes
+    )
+    if exclude_user is not None:
+        postings = postings.exclude(fingerprint__user=exclude_user)
+    # Rank a few more than needed by raw overlap, then by containment so short
+    # copies are not crowded out by long unrelated submissions
+    shared_counts = dict(
+        postings.values("fingerprint_id")
+        .annotate(shared=Count("id"))
+        .order_by("-shared")
+        .values_list("fingerprint_id", "shared")[: limit * 3]
+    )
+
+    candidates = list(CodeFingerprint.objects.filter(id__in=shared_counts))
+    for candidate in candidates:
+        candidate.shared = shared_counts[candidate.id]
+        candidate.containment = candidate.shared / max(
+            1, min(len(hashes), candidate.fingerprint_count)
+        )
+    candidates.sort(key=lambda c: (c.containment, c.shared), reverse=True)
+    return candidates[:limit]
+
+
+def reference_submissions(candidates):
+    """Candidates in the payload format of the executor's /plagiarism-check"""
+    return [
+        {
+            "submission_id": str(candidate.source_id),
+            "user_id": str(candidate.user_id),
+            "answer_data": {"code": candidate.code, "language": candidate.language},
+        }
+        for candidate in candidates
+    ]
@@ -0,0 +1,218 @@
+"""
+Denormalized practice-problem counters for the course catalogue.
+
+CourseViewSet lists every course with its number of practice problems and the
+user's solved count, score and AI help usage. Rather than joining the question
+bank and the user's submissions on every listing, these are stored:
+
+- Course.total_practice_problems and Topic.total_practice_problems, moved by
+  +1/-1 for each counter a saved, moved or deleted question is counted under
+  (deleting a topic or subtopic subtracts every question it takes with it).
+  `manage.py recount_practice_problems` recounts them from scratch;
+- UserCoursePracticeStats per (user, course), recomputed whenever one of the
+  user's StudentCodePractice records in the course is saved or deleted.
+
+The signal handlers in course/signals.py keep both current.
+"""
+import uuid
+from collections import Counter
+
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .models import (
+    Course,
+    Question,
+    StudentCodePractice,
+    Subtopic,
+    Topic,
+    UserCoursePracticeStats,
+)
+
+PRACTICE_CATEGORY = "practice"
+SOLVED_STATUSES = ["completed", "evaluated"]
+
+
+def is_practice_problem(question_type, categories):
+    return question_type == "coding" and PRACTICE_CATEGORY in (categories or [])
+
+
+# Question fields slots are read from, direct attachment first
+_SLOT_FIELDS = (
+    "type",
+    "categories",
+    "course_id",
+    "topic_id",
+    "topic__course_id",
+    "subtopic__topic_id",
+    "subtopic__topic__course_id",
+)
+
+
+def _slots(rows):
+    """(course_id, topic_id or None) of every counter the rows are counted under"""
+    slots = []
+    for (
+        question_type,
+        categories,
+        course_id,
+        topic_id,
+        topic_course_id,
+        subtopic_topic_id,
+        subtopic_course_id,
+    ) in rows:
+        if not is_practice_problem(question_type, categories):
+            continue
+        # A question is counted once for each way it is attached to a course
+        if course_id:
+            slots.append((course_id, None))
+        if topic_id:
+            slots.append((topic_course_id, topic_id))
+        if subtopic_topic_id:
+            slots.append((subtopic_course_id, subtopic_topic_id))
+    return slots
+
+
+def question_slots(question):
+    """Counters a question is counted under, as attached on this instance"""
+    if not is_practice_problem(question.type, question.categories):
+        return []
+    topic_course_id = subtopic_topic_id = subtopic_course_id = None
+    if question.topic_id:
+        topic_course_id = (
+            Topic.objects.filter(id=question.topic_id)
+            .values_list("course_id", flat=True)
+            .first()
+        )
+    if question.subtopic_id:
+        subtopic_topic_id, subtopic_course_id = Subtopic.objects.filter(
+            id=question.subtopic_id
+        ).values_list("topic_id", "topic__course_id").first() or (None, None)
+    return _slots(
+        [
+            (
+                question.type,
+                question.categories,
+                question.course_id,
+                question.topic_id,
+                topic_course_id,
+                subtopic_topic_id,
+                subtopic_course_id,
+            )
+        ]
+    )
+
+
+def container_slots(container):
+    """Counters of every question under a stored Topic or Subtopic"""
+    if isinstance(container, Topic):
+        questions = Question.objects.filter(
+            Q(topic_id=container.id) | Q(subtopic__topic_id=container.id)
+        )
+    else:
+        questions = Question.objects.filter(subtopic_id=container.id)
+    return _slots(questions.filter(type="coding").values_list(*_SLOT_FIELDS))
+
+
+def apply_problem_deltas(added=(), removed=()):
+    """Add 1 to the counters in ``added`` and take 1 from those in ``removed``"""
+    course_deltas = Counter()
+    topic_deltas = Counter()
+    for sign, slots in ((1, added), (-1, removed)):
+        for course_id, topic_id in slots:
+            course_deltas[course_id] += sign
+            if topic_id:
+                topic_deltas[topic_id] += sign
+
+    for model, deltas in ((Course, course_deltas), (Topic, topic_deltas)):
+        for pk, delta in deltas.items():
+            if pk and delta:
+                model.objects.filter(id=pk).update(
+                    total_practice_problems=Greatest(
+                        F("total_practice_problems") + delta, 0
+                    )
+                )
+
+
+def refresh_problem_counts(course_id):
+    """
+    Recount the practice problems of a course and each of its topics, to repair
+    counters that drifted (see the recount_practice_problems command)
+    """
+    course_id = uuid.UUID(str(course_id))
+    questions = (
+        Question.objects.filter(type="coding")
+        .filter(
+            Q(course_id=course_id)
+            | Q(topic__course_id=course_id)
+            | Q(subtopic__topic__course_id=course_id)
+        )
+        .values_list(*_SLOT_FIELDS)
+    )
+
+    course_total = 0
+    topic_totals = Counter()
+    for slot_course_id, topic_id in _slots(questions):
+        if slot_course_id != course_id:
+            continue
+        course_total += 1
+        if topic_id:
+            topic_totals[topic_id] += 1
+
+    Course.objects.filter(id=course_id).update(total_practice_problems=course_total)
+    Topic.objects.filter(course_id=course_id).exclude(id__in=topic_totals).update(
+        total_practice_problems=0
+    )
+    for topic_id, total in topic_totals.items():
+        Topic.objects.filter(id=topic_id).update(total_practice_problems=total)
+
+
+def refresh_user_stats(user_id, course_id):
+    """Recompute a user's practice totals for one course"""
+    if not course_id:
+        return
+    submissions = list(
+        StudentCodePractice.objects.filter(
+            user_id=user_id, course_id=course_id, question__type="coding"
+        ).values_list(
+            "question__categories", "status", "marks_obtained", "ai_help_count"
+        )
+    )
+    if not submissions:
+        UserCoursePracticeStats.objects.filter(
+            user_id=user_id, course_id=course_id
+        ).delete()
+        return
+
+    solved = 0
+    score = 0.0
+    ai_help = 0
+    for categories, status, marks, ai_help_count in submissions:
+        if not is_practice_problem("coding", categories):
+            continue
+        if status in SOLVED_STATUSES:
+            solved += 1
+        score += marks or 0.0
+        ai_help += ai_help_count or 0
+
+    UserCoursePracticeStats.objects.update_or_create(
+        user_id=user_id,
+        course_id=course_id,
+        defaults={
+            "solved_problems": solved,
+            "total_score": score,
+            "ai_help_used": ai_help,
+        },
+    )
+
+
+def refresh_question_submitters(question_id):
+    """Recompute the totals of every user with a submission to this question"""
+    pairs = (
+        StudentCodePractice.objects.filter(question_id=question_id)
+        .order_by()
+        .values_list("user_id", "course_id")
+        .distinct()
+    )
+    for user_id, course_id in list(pairs):
+        refresh_user_stats(user_id, course_id)
@@ -0,0 +1,97 @@
+"""
+Per-(user, course) progress rollups.
+
+The dashboard endpoints (StudentCourseProgressViewSet.stats, progress and
+continue_learning) read UserCourseRollup rows instead of every
+UserCourseProgress row plus a subtopic count per course. A rollup is refreshed
+from its own user's progress records whenever one of them is saved or deleted
+(see course/signals.py), and subtopic counts (from course/structure_cache.py)
+are refreshed for every rollup of a course when a subtopic is added or removed.
+Code that changes progress records with queryset.update() or bulk_update()
+must call refresh_rollups() itself.
+"""
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+
+from . import structure_cache
+from .models import UserCourseProgress, UserCourseRollup
+
+# Estimated minutes per subtopic: a base amount plus one per finished activity
+MINUTES_BASE = 5
+MINUTES_VIDEOS = 15
+MINUTES_QUIZ = 10
+MINUTES_CODING = 25
+
+
+def minutes_expression():
+    return Value(MINUTES_BASE) + sum(
+        (
+            Case(When(**{field: True}, then=Value(minutes)), default=Value(0))
+            for field, minutes in (
+                ("is_videos_watched", MINUTES_VIDEOS),
+                ("is_quiz_completed", MINUTES_QUIZ),
+                ("is_coding_completed", MINUTES_CODING),
+            )
+        ),
+        Value(0),
+    )
+
+
+def refresh_rollup(user_id, course_id):
+    """Recompute one user's rollup for a course; returns it, or None if unstarted"""
+    progress = UserCourseProgress.objects.filter(user_id=user_id, course_id=course_id)
+    totals = progress.aggregate(
+        started=Count("id"),
+        completed=Count("id", filter=Q(is_completed=True)),
+        progress_sum=Sum("progress_percent"),
+        minutes=Sum(minutes_expression(), output_field=IntegerField()),
+    )
+    if not totals["started"]:
+        UserCourseRollup.objects.filter(user_id=user_id, course_id=course_id).delete()
+        return None
+
+    latest = (
+        progress.order_by("-last_accessed", "-updated_at")
+        .values("subtopic_id", "last_accessed")
+        .first()
+    )
+    rollup, _ = UserCourseRollup.objects.update_or_create(
+        user_id=user_id,
+        course_id=course_id,
+        defaults={
+            "subtopics_total": structure_cache.subtopic_count(course_id),
+            "started_count": totals["started"],
+            "completed_count": totals["completed"],
+            "progress_sum": totals["progress_sum"] or 0.0,
+            "minutes_estimate": totals["minutes"] or 0,
+            "last_accessed_subtopic_id": latest["subtopic_id"],
+            "last_accessed": latest["last_accessed"],
+        },
+    )
+    return rollup
+
+
+def refresh_rollups(progress_queryset):
+    """Refresh the rollups touched by a set of UserCourseProgress records"""
+    pairs = progress_queryset.order_by().values_list("user_id", "course_id").distinct()
+    for user_id, course_id in list(pairs):
+        refresh_rollup(user_id, course_id)
+
+
+def refresh_subtopic_counts(course_id):
+    """Store the course's current subtopic count on all of its rollups"""
+    UserCourseRollup.objects.filter(course_id=course_id).update(
+        subtopics_total=structure_cache.subtopic_count(course_id)
+    )
+
+
+def rebuild_all():
+    """Recompute every rollup from scratch; returns the number of rollups"""
+    UserCourseRollup.objects.all().delete()
+    pairs = list(
+        UserCourseProgress.objects.order_by()
+        .values_list("user_id", "course_id")
+        .distinct()
+    )
+    for user_id, course_id in pairs:
+        refresh_rollup(user_id, course_id)
+    return len(pairs)
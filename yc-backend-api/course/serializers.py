@@ -10,6 +10,7 @@ from .models import (
     Question,
     UserCourseProgress,
     StudentCodePractice,
+    CodeSubmissionJob,
 )
 from authentication.serializers import UserSerializer
 from django.contrib.auth import get_user_model
@@ -442,3 +443,21 @@ class StudentCodePracticeSerializer(serializers.ModelSerializer):
                 f"Status must be one of: {', '.join(valid_statuses)}"
             )
         return value
+
+
+class CodeSubmissionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CodeSubmissionJob
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "test_results",
+            "result",
+            "response_status",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,137 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import practice_stats, progress_rollup, structure_cache
+from .models import (
+    Question,
+    StudentCodePractice,
+    Subtopic,
+    Topic,
+    UserCourseProgress,
+)
+
+
+def _topic_course_id(topic_id):
+    return Topic.objects.filter(id=topic_id).values_list("course_id", flat=True).first()
+
+
+def course_id_of(instance):
+    """Course a Topic, Subtopic or Question belongs to"""
+    if isinstance(instance, Topic):
+        return instance.course_id
+    if isinstance(instance, Subtopic):
+        return _topic_course_id(instance.topic_id)
+    # Questions hang off a subtopic, a topic or the course itself
+    if instance.subtopic_id:
+        return (
+            Subtopic.objects.filter(id=instance.subtopic_id)
+            .values_list("topic__course_id", flat=True)
+            .first()
+        )
+    if instance.topic_id:
+        return _topic_course_id(instance.topic_id)
+    return instance.course_id
+
+
+def structure_changed(sender, course_id):
+    if not course_id:
+        return
+    structure_cache.invalidate(course_id)
+    if sender is not Question:
+        progress_rollup.refresh_subtopic_counts(course_id)
+
+
+def _cascaded(sender, origin):
+    """Deleted along with a parent row, whose own handlers cover this one"""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not sender
+
+
+def _problem_slots(sender, instance):
+    if sender is Question:
+        return practice_stats.question_slots(instance)
+    return practice_stats.container_slots(instance)
+
+
+@receiver(post_save, sender=UserCourseProgress)
+@receiver(post_delete, sender=UserCourseProgress)
+def refresh_rollup_on_progress_change(sender, instance, **kwargs):
+    """Keep the user's course rollup in step with their progress records"""
+    progress_rollup.refresh_rollup(instance.user_id, instance.course_id)
+
+
+@receiver(pre_save, sender=Topic)
+@receiver(pre_save, sender=Subtopic)
+@receiver(pre_save, sender=Question)
+def structure_changed_before_move(sender, instance, **kwargs):
+    """Moving content to another course changes the old course too"""
+    stored = sender.objects.filter(pk=instance.pk).first()
+    if stored is None:
+        if sender is Question:
+            instance._problem_slots = []
+        return
+    old_course_id = course_id_of(stored)
+    if old_course_id != course_id_of(instance):
+        structure_changed(sender, old_course_id)
+    if sender is Question:
+        instance._problem_slots = practice_stats.question_slots(stored)
+        # Submitters' practice totals depend on whether this is a practice problem
+        instance._practice_changed = practice_stats.is_practice_problem(
+            stored.type, stored.categories
+        ) != practice_stats.is_practice_problem(instance.type, instance.categories)
+    elif (
+        stored.course_id != instance.course_id
+        if sender is Topic
+        else stored.topic_id != instance.topic_id
+    ):
+        # Its questions move to other practice counters with it
+        instance._problem_slots = practice_stats.container_slots(stored)
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=Subtopic)
+@receiver(post_save, sender=Question)
+def structure_changed_on_save(sender, instance, **kwargs):
+    """Drop cached structure counts and update rollup and practice totals"""
+    structure_changed(sender, course_id_of(instance))
+    before = instance.__dict__.pop("_problem_slots", None)
+    if before is not None:
+        practice_stats.apply_problem_deltas(
+            added=_problem_slots(sender, instance), removed=before
+        )
+    if getattr(instance, "_practice_changed", False):
+        practice_stats.refresh_question_submitters(instance.id)
+        instance._practice_changed = False
+
+
+@receiver(pre_delete, sender=Topic)
+@receiver(pre_delete, sender=Subtopic)
+def count_problems_before_delete(sender, instance, origin=None, **kwargs):
+    """Note the practice counters of the questions deleted with this row"""
+    if not _cascaded(sender, origin):
+        instance._problem_slots = practice_stats.container_slots(instance)
+
+
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Subtopic)
+@receiver(post_delete, sender=Question)
+def structure_changed_on_delete(sender, instance, origin=None, **kwargs):
+    """Like structure_changed_on_save, once for the row the delete started at"""
+    if _cascaded(sender, origin):
+        return
+    structure_changed(sender, course_id_of(instance))
+    if sender is Question:
+        removed = practice_stats.question_slots(instance)
+    else:
+        removed = instance.__dict__.pop("_problem_slots", [])
+    practice_stats.apply_problem_deltas(removed=removed)
+
+
+@receiver(post_save, sender=StudentCodePractice)
+@receiver(post_delete, sender=StudentCodePractice)
+def refresh_practice_stats(sender, instance, **kwargs):
+    """Keep the user's practice totals for the course current"""
+    practice_stats.refresh_user_stats(instance.user_id, instance.course_id)
@@ -0,0 +1,83 @@
+"""
+Cached course structure counts.
+
+How many subtopics a course has and which question types each subtopic holds
+only change when instructors edit content, yet progress calculations need them
+on every submission. They are computed with one aggregate query per course and
+cached in two layers: a small in-process LRU in front of the shared cache
+(core/cache.py).
+
+Entries live in the "course_structure" namespace with the course as entity.
+course/signals.py invalidates the course whenever a Topic, Subtopic or
+Question of it is saved or deleted, which replaces its version token, so stale
+entries of every process become unreachable at once. Version tokens are random
+rather than counters, so a flushed cache can never make old in-process entries
+current again.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count
+
+from core import cache as shared_cache
+
+from .models import Question, Subtopic
+
+NAMESPACE = "course_structure"
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def invalidate(course_id):
+    """Make every cached structure entry of the course unreachable"""
+    shared_cache.invalidate(NAMESPACE, entity=course_id)
+
+
+def _compute(course_id):
+    question_types = {}
+    rows = (
+        Question.objects.filter(subtopic__topic__course_id=course_id)
+        .order_by()
+        .values_list("subtopic_id", "type")
+        .annotate(total=Count("id"))
+    )
+    for subtopic_id, question_type, total in rows:
+        question_types.setdefault(str(subtopic_id), {})[question_type] = total
+    return {
+        "subtopics": Subtopic.objects.filter(topic__course_id=course_id).count(),
+        "question_types": question_types,
+    }
+
+
+def get_structure(course_id):
+    """{'subtopics': int, 'question_types': {subtopic_id: {type: count}}}"""
+    key = shared_cache.make_key(NAMESPACE, entity=course_id)
+    with _local_lock:
+        structure = _local.get(key)
+        if structure is not None:
+            _local.move_to_end(key)
+            return structure
+
+    structure = shared_cache.get_or_set(
+        NAMESPACE,
+        lambda: _compute(course_id),
+        entity=course_id,
+        timeout=settings.COURSE_STRUCTURE_CACHE_TIMEOUT,
+    )
+
+    with _local_lock:
+        _local[key] = structure
+        while len(_local) > settings.COURSE_STRUCTURE_LOCAL_CACHE_SIZE:
+            _local.popitem(last=False)
+    return structure
+
+
+def subtopic_count(course_id):
+    return get_structure(course_id)["subtopics"]
+
+
+def question_type_counts(course_id, subtopic_id):
+    """Number of questions of each type in a subtopic, e.g. {'coding': 2}"""
+    return get_structure(course_id)["question_types"].get(str(subtopic_id), {})
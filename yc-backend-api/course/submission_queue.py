@@ -0,0 +1,200 @@
+"""
+Database-backed queue for code submissions.
+
+The submit endpoints enqueue a CodeSubmissionJob and return its id right away;
+`manage.py run_submission_workers` runs a pool of threads that claim queued
+jobs, evaluate them against the code executor and publish each test case
+result on the job as soon as the executor reports it.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CodeSubmissionJob
+from .utils import CodeExecutionUtil
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(user, kind, request_data):
+    return CodeSubmissionJob.objects.create(
+        user=user, kind=kind, request_data=request_data
+    )
+
+
+def get_handler(kind):
+    """Evaluation function for a job kind; returns a DRF Response"""
+    # The views enqueue jobs through this module, so import them lazily
+    from .views import StudentCodePracticeViewSet, StudentCourseProgressViewSet
+
+    handlers = {
+        CodeSubmissionJob.KIND_PRACTICE_SUBMIT: (
+            StudentCodePracticeViewSet.evaluate_submission
+        ),
+        CodeSubmissionJob.KIND_COURSE_CODING: (
+            StudentCourseProgressViewSet.evaluate_coding_submission
+        ),
+    }
+    return handlers[kind]
+
+
+def claim_next_job():
+    """Move the oldest queued job to running; None when the queue is empty"""
+    while True:
+        job = (
+            CodeSubmissionJob.objects.filter(status=CodeSubmissionJob.STATUS_QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = CodeSubmissionJob.objects.filter(
+            id=job.id, status=CodeSubmissionJob.STATUS_QUEUED
+        ).update(
+            status=CodeSubmissionJob.STATUS_RUNNING,
+            started_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker claimed it first; try the next one
+
+
+def run_job(job):
+    """Evaluate a claimed job and store the endpoint's response on it"""
+    published = []
+
+    def publish(category, index, result):
+        if category == "advanced":
+            result = CodeExecutionUtil.mask_advanced_result(result)
+        published.append({"category": category, "index": index, "result": result})
+        CodeSubmissionJob.objects.filter(id=job.id).update(
+            test_results=published, updated_at=timezone.now()
+        )
+
+    try:
+        handler = get_handler(job.kind)
+        response = handler(job.user, job.request_data, on_test_result=publish)
+        job.result = response.data
+        job.response_status = response.status_code
+        if response.status_code < 400:
+            job.status = CodeSubmissionJob.STATUS_COMPLETED
+        else:
+            job.status = CodeSubmissionJob.STATUS_FAILED
+            job.error = str(
+                response.data.get("error") or response.data.get("error_message", "")
+            )
+    except Exception as e:
+        logger.exception("Code submission job %s failed", job.id)
+        job.status = CodeSubmissionJob.STATUS_FAILED
+        job.response_status = 500
+        job.error = str(e)
+
+    job.test_results = published
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "test_results",
+            "result",
+            "response_status",
+            "error",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+    return job
+
+
+def process_next_job():
+    """Claim and run one job; returns it, or None when the queue is empty"""
+    job = claim_next_job()
+    if job is not None:
+        run_job(job)
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs whose worker died mid-run, failing those that already used
+    CODE_SUBMISSION_MAX_ATTEMPTS attempts
+    """
+    now = timezone.now()
+    stale = CodeSubmissionJob.objects.filter(
+        status=CodeSubmissionJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.CODE_SUBMISSION_JOB_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=settings.CODE_SUBMISSION_MAX_ATTEMPTS).update(
+        status=CodeSubmissionJob.STATUS_FAILED,
+        error="Submission could not be evaluated",
+        finished_at=now,
+        updated_at=now,
+    )
+    requeued = stale.update(
+        status=CodeSubmissionJob.STATUS_QUEUED, test_results=[], updated_at=now
+    )
+    return requeued, failed
+
+
+class SubmissionWorkerPool:
+    """Threads that claim and evaluate queued jobs until stopped"""
+
+    def __init__(self, concurrency, poll_interval):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _work(self):
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                try:
+                    job = process_next_job()
+                except Exception:
+                    logger.exception("Submission worker error")
+                    job = None
+                if job is None:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+    def start(self):
+        for number in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._work, name=f"submission-worker-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def run_forever(self):
+        """Start the workers and requeue stale jobs until stop() is called"""
+        self.start()
+        interval = max(self.poll_interval, settings.CODE_SUBMISSION_JOB_TIMEOUT / 2)
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                requeued, failed = requeue_stale_jobs()
+                if requeued or failed:
+                    logger.warning(
+                        "Requeued %s and failed %s stale submission jobs",
+                        requeued,
+                        failed,
+                    )
+            except Exception:
+                logger.exception("Could not requeue stale submission jobs")
+            self._stop.wait(interval)
+        for thread in self._threads:
+            thread.join()
+
+    def stop(self):
+        self._stop.set()
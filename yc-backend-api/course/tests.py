@@ -1,12 +1,32 @@
+import json
 import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Course, Topic, Subtopic
+from .models import (
+    Course,
+    Topic,
+    Subtopic,
+    Question,
+    CodeSubmissionJob,
+    StudentCodePractice,
+    UserCourseProgress,
+    UserCourseRollup,
+    UserCoursePracticeStats,
+)
 from .serializers import CourseSerializer, TopicSerializer, SubtopicSerializer
+from .utils import CodeExecutionUtil
+from . import plagiarism_index, practice_stats, structure_cache, submission_queue
 
 User = get_user_model()
 
@@ -421,3 +441,713 @@ class SubtopicAPITest(APITestCase):
         response = self.client.get(f"{self.subtopics_url}?topic={self.topic.id}")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+
+
+class CodeExecutionResultCacheTest(APITestCase):
+    """
+    Test cases for the executor result cache in CodeExecutionUtil.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_user(
+            email="admin@test.com",
+            username="admin",
+            password="testpass123",
+            role="admin",
+        )
+        self.course = Course.objects.create(name="Test Course", category="fundamentals")
+        self.question = Question.objects.create(
+            type="coding",
+            title="Double",
+            content="Double the number",
+            level="course",
+            course=self.course,
+            categories=["practice"],
+            test_cases_basic=[{"input": "2", "expected_output": "4"}],
+            created_by=self.admin_user,
+        )
+        self.executor_response = MagicMock(status_code=200)
+        self.executor_response.json.return_value = {
+            "execution_result": {"success": True, "output": "4"},
+            "test_results": [{"passed": True, "error": ""}],
+            "total_passed": 1,
+            "total_tests": 1,
+            "basic_passed": 1,
+        }
+
+    def execute(self, code):
+        return CodeExecutionUtil.execute_code(
+            code=code, language="python", question_id=self.question.id
+        )
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_identical_code_is_served_from_cache(self, mock_post):
+        """Test re-evaluating the same (normalized) code does not call the executor."""
+        mock_post.return_value = self.executor_response
+        first = self.execute("print(int(input()) * 2)\n")
+        second = self.execute("print(int(input()) * 2)   \n\n")
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(first["test_results"], second["test_results"])
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_whitespace_inside_code_is_kept(self, mock_post):
+        """Test whitespace inside a multi-line string misses the cache."""
+        mock_post.return_value = self.executor_response
+        self.execute('print("""a\nb""")')
+        self.execute('print("""a  \nb""")')
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_different_code_is_executed(self, mock_post):
+        """Test a code change misses the cache."""
+        mock_post.return_value = self.executor_response
+        self.execute("print(int(input()) * 2)")
+        self.execute("print(2 * int(input()))")
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_timeouts_are_not_cached(self, mock_post):
+        """Test results containing a timeout are evaluated again."""
+        self.executor_response.json.return_value["test_results"] = [
+            {"passed": False, "error": "Timeout"}
+        ]
+        mock_post.return_value = self.executor_response
+        self.execute("while True: pass")
+        self.execute("while True: pass")
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_question_update_invalidates_cached_results(self, mock_post):
+        """Test editing test cases through the API drops cached results."""
+        mock_post.return_value = self.executor_response
+        self.execute("print(int(input()) * 2)")
+
+        refresh = RefreshToken.for_user(self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        response = self.client.patch(
+            reverse("question-detail", kwargs={"pk": self.question.pk}),
+            {"test_cases_basic": [{"input": "3", "expected_output": "6"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.execute("print(int(input()) * 2)")
+        self.assertEqual(mock_post.call_count, 2)
+
+
+class CodeSubmissionQueueTest(APITestCase):
+    """
+    Test cases for queued (async) code submissions.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            username="student",
+            password="testpass123",
+            role="student",
+        )
+        self.course = Course.objects.create(name="Test Course", category="fundamentals")
+        self.question = Question.objects.create(
+            type="coding",
+            title="Double",
+            content="Double the number",
+            level="course",
+            course=self.course,
+            categories=["practice"],
+            test_cases_basic=[{"input": "2", "expected_output": "4"}],
+            test_cases_advanced=[{"input": "12345", "expected_output": "24690"}],
+            created_by=self.student,
+        )
+        self.authenticate(self.student)
+
+    def authenticate(self, user):
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def submit(self):
+        return self.client.post(
+            reverse("studentcodepractice-submit-code"),
+            {
+                "code": "print(int(input()) * 2)",
+                "language": "python",
+                "question_id": str(self.question.id),
+                "async": True,
+            },
+            format="json",
+        )
+
+    def stream_response(self):
+        basic = {"passed": True, "input": "2", "expected_output": "4", "error": ""}
+        advanced = {
+            "passed": False,
+            "input": "12345",
+            "expected_output": "24690",
+            "actual_output": "0",
+            "error": "Wrong answer",
+        }
+        events = [
+            {"event": "result", "category": "basic", "index": 0, "result": basic},
+            {"event": "result", "category": "advanced", "index": 0, "result": advanced},
+            {
+                "event": "complete",
+                "response": {
+                    "execution_result": {"success": False, "output": "4"},
+                    "test_results": [basic, advanced],
+                    "basic_results": [basic],
+                    "advanced_results": [advanced],
+                    "total_passed": 1,
+                    "total_tests": 2,
+                    "basic_passed": 1,
+                },
+            },
+        ]
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = [json.dumps(e).encode() for e in events]
+        return response
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_async_submit_returns_job_without_executing(self, mock_post):
+        """Test the submit endpoint only queues the job."""
+        response = self.submit()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], CodeSubmissionJob.STATUS_QUEUED)
+        job = CodeSubmissionJob.objects.get(id=response.data["job_id"])
+        self.assertNotIn("async", job.request_data)
+        mock_post.assert_not_called()
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_worker_publishes_results_and_response(self, mock_post):
+        """Test a worker runs the job, streaming per-test results onto it."""
+        mock_post.return_value = self.stream_response()
+        job_id = self.submit().data["job_id"]
+
+        job = submission_queue.process_next_job()
+        self.assertEqual(job.id, job_id)
+        self.assertIsNone(submission_queue.process_next_job())
+
+        response = self.client.get(reverse("codesubmissionjob-detail", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], CodeSubmissionJob.STATUS_COMPLETED)
+        self.assertEqual(response.data["response_status"], status.HTTP_201_CREATED)
+        self.assertEqual(response.data["result"]["test_cases_passed"], 1)
+        self.assertEqual(
+            [entry["category"] for entry in response.data["test_results"]],
+            ["basic", "advanced"],
+        )
+        hidden = response.data["test_results"][1]["result"]
+        self.assertTrue(hidden["is_hidden"])
+        self.assertNotEqual(hidden["expected_output"], "24690")
+
+    def test_jobs_are_only_visible_to_their_owner(self):
+        """Test another user cannot read someone else's job."""
+        job_id = self.submit().data["job_id"]
+        other = User.objects.create_user(
+            email="other@test.com", username="other", password="testpass123"
+        )
+        self.authenticate(other)
+        response = self.client.get(reverse("codesubmissionjob-detail", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_running_jobs_are_requeued(self):
+        """Test jobs abandoned by a dead worker go back to the queue."""
+        job = CodeSubmissionJob.objects.get(id=self.submit().data["job_id"])
+        submission_queue.claim_next_job()
+        CodeSubmissionJob.objects.filter(id=job.id).update(
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(submission_queue.requeue_stale_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, CodeSubmissionJob.STATUS_QUEUED)
+
+
+class PlagiarismIndexTest(TestCase):
+    """
+    Test cases for the plagiarism fingerprint index.
+    """
+
+    ORIGINAL = """
+def count_pairs(numbers, target):
+    seen = {}
+    pairs = 0
+    for value in numbers:
+        pairs += seen.get(target - value, 0)
+        seen[value] = seen.get(value, 0) + 1
+    return pairs
+
+print(count_pairs(list(map(int, input().split())), int(input())))
+"""
+    # Same program with every identifier renamed and comments added
+    RENAMED = """
+def solve(arr, k):
+    # count complementary pairs
+    memo = {}
+    total = 0
+    for x in arr:
+        total += memo.get(k - x, 0)
+        memo[x] = memo.get(x, 0) + 1
+    return total
+
+print(solve(list(map(int, input().split())), int(input())))
+"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="author@test.com", username="author", password="testpass123"
+        )
+        self.course = Course.objects.create(name="Test Course", category="fundamentals")
+        self.question = Question.objects.create(
+            type="coding",
+            title="Pairs",
+            content="Count pairs",
+            level="course",
+            course=self.course,
+            categories=["practice"],
+            test_cases_basic=[{"input": "1 2\n3", "expected_output": "1"}],
+            created_by=self.author,
+        )
+        self.source = StudentCodePractice._meta.label_lower
+
+    def submit(self, username, code):
+        user = User.objects.create_user(
+            email=f"{username}@test.com", username=username, password="testpass123"
+        )
+        practice = StudentCodePractice.objects.create(
+            user=user,
+            question=self.question,
+            answer_latest={"code": code, "language": "python"},
+        )
+        CodeExecutionUtil.index_practice_record(practice)
+        return user, practice
+
+    def test_renaming_identifiers_keeps_fingerprints(self):
+        """Test a copy with renamed variables has the same fingerprints."""
+        self.assertEqual(
+            plagiarism_index.fingerprint(self.ORIGINAL, "python"),
+            plagiarism_index.fingerprint(self.RENAMED, "python"),
+        )
+
+    def test_code_shorter_than_a_kgram_is_fingerprinted(self):
+        """Test code with fewer tokens than a k-gram is still indexed and found."""
+        short = "print(1)"
+        self.assertLess(
+            len(plagiarism_index.tokenize(short, "python")),
+            settings.PLAGIARISM_KGRAM_SIZE,
+        )
+        self.assertEqual(len(plagiarism_index.fingerprint(short, "python")), 1)
+        self.assertEqual(plagiarism_index.fingerprint("", "python"), set())
+
+        _, original = self.submit("original", short)
+        copier = User.objects.create_user(
+            email="copier@test.com", username="copier", password="testpass123"
+        )
+        candidates = plagiarism_index.find_candidates(
+            self.question, self.source, short, "python", exclude_user=copier
+        )
+        self.assertEqual([c.source_id for c in candidates], [original.id])
+
+    def test_old_copy_is_found_among_many_submissions(self):
+        """Test the copied submission ranks first however old it is."""
+        _, original = self.submit("original", self.ORIGINAL)
+        for i in range(12):
+            self.submit(
+                f"other{i}",
+                f"n = int(input())\nprint(sum(range(n)) * {i})\n" * (i % 3 + 1),
+            )
+        copier = User.objects.create_user(
+            email="copier@test.com", username="copier", password="testpass123"
+        )
+
+        candidates = plagiarism_index.find_candidates(
+            self.question, self.source, self.RENAMED, "python", exclude_user=copier
+        )
+        self.assertEqual(candidates[0].source_id, original.id)
+        self.assertEqual(candidates[0].containment, 1.0)
+
+        own = plagiarism_index.find_candidates(
+            self.question,
+            self.source,
+            self.ORIGINAL,
+            "python",
+            exclude_user=original.user,
+        )
+        self.assertNotIn(original.id, [c.source_id for c in own])
+
+    @patch("core.executor_client.ExecutorClient.post")
+    def test_check_plagiarism_scores_only_candidates(self, mock_post):
+        """Test the executor only receives the index's top candidates."""
+        _, original = self.submit("original", self.ORIGINAL)
+        self.submit("unrelated", "print('hello world')\n")
+        mock_post.return_value = MagicMock(status_code=200)
+        mock_post.return_value.json.return_value = {"max_similarity": 0.95}
+
+        copier = User.objects.create_user(
+            email="copier@test.com", username="copier", password="testpass123"
+        )
+        score, _ = CodeExecutionUtil.check_plagiarism(
+            self.RENAMED, "python", self.question, copier
+        )
+
+        self.assertEqual(score, 0.95)
+        references = mock_post.call_args.kwargs["json"]["reference_submissions"]
+        self.assertEqual(
+            [ref["submission_id"] for ref in references], [str(original.id)]
+        )
+
+
+class ProgressRollupTest(APITestCase):
+    """
+    Test cases for the per-course progress rollups behind the dashboard.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="student@test.com", username="student", password="testpass123"
+        )
+        self.course = Course.objects.create(
+            name="Rollup Course", short_code="RC101", category="fundamentals"
+        )
+        topic = Topic.objects.create(course=self.course, name="Basics", order_index=0)
+        self.subtopics = [
+            Subtopic.objects.create(topic=topic, name=f"Lesson {i}", order_index=i)
+            for i in range(4)
+        ]
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def post(self, action, subtopic):
+        return self.client.post(
+            reverse(f"usercourseprogress-{action}"), {"subtopic_id": subtopic.id}
+        )
+
+    def test_dashboard_reads_rollup(self):
+        """Test progress changes reach stats, progress and continue_learning."""
+        self.post("mark-complete", self.subtopics[0])
+        self.post("mark-video-watched", self.subtopics[1])
+
+        rollup = UserCourseRollup.objects.get(user=self.user, course=self.course)
+        self.assertEqual(rollup.subtopics_total, 4)
+        self.assertEqual(rollup.started_count, 2)
+        # Without questions, watching the videos completes a subtopic
+        self.assertEqual(rollup.completed_count, 2)
+        self.assertEqual(rollup.progress_sum, 200.0)
+        self.assertEqual(rollup.last_accessed_subtopic, self.subtopics[1])
+
+        response = self.client.get(reverse("usercourseprogress-stats"))
+        self.assertEqual(
+            response.data,
+            {"lessons_completed": 2, "time_spent": "25m", "avg_progress": 50},
+        )
+
+        response = self.client.get(reverse("usercourseprogress-progress"))
+        self.assertEqual(
+            response.data, [{"course_id": str(self.course.id), "percent": 50.0}]
+        )
+
+        response = self.client.get(reverse("usercourseprogress-continue-learning"))
+        self.assertEqual(response.data["subtopic_id"], self.subtopics[1].id)
+        self.assertEqual(response.data["total_lessons"], 4)
+        self.assertEqual(response.data["percent"], 50)
+        self.assertEqual(response.data["lesson"], 2)
+
+    def test_subtopic_changes_update_totals(self):
+        """Test adding and removing subtopics and progress keeps rollups current."""
+        self.post("mark-complete", self.subtopics[0])
+
+        Subtopic.objects.create(
+            topic=self.subtopics[0].topic, name="Lesson 4", order_index=4
+        )
+        rollup = UserCourseRollup.objects.get(user=self.user, course=self.course)
+        self.assertEqual(rollup.subtopics_total, 5)
+
+        self.subtopics[3].delete()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.subtopics_total, 4)
+
+        UserCourseProgress.objects.get(user=self.user).delete()
+        self.assertFalse(UserCourseRollup.objects.filter(user=self.user).exists())
+        response = self.client.get(reverse("usercourseprogress-stats"))
+        self.assertEqual(response.data["avg_progress"], 0)
+
+
+class CourseStructureCacheTest(TestCase):
+    """
+    Test cases for the cached course structure counts.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="instructor@test.com", username="instructor", password="testpass123"
+        )
+        self.course = Course.objects.create(
+            name="Structure Course", short_code="SC101", category="fundamentals"
+        )
+        self.topic = Topic.objects.create(
+            course=self.course, name="Basics", order_index=0
+        )
+        self.subtopic = Subtopic.objects.create(
+            topic=self.topic, name="Loops", order_index=0
+        )
+
+    def add_question(self, question_type):
+        return Question.objects.create(
+            type=question_type,
+            title=f"{question_type} question",
+            content="Question",
+            level="subtopic",
+            subtopic=self.subtopic,
+            categories=["learn"],
+            mcq_options=[
+                {"text": "Yes", "is_correct": True},
+                {"text": "No", "is_correct": False},
+            ],
+            test_cases_basic=[{"input": "", "expected_output": "ok"}],
+            created_by=self.user,
+        )
+
+    def test_counts_follow_content_changes(self):
+        """Test edits to subtopics and questions invalidate the cached counts."""
+        self.assertEqual(structure_cache.subtopic_count(self.course.id), 1)
+        self.assertEqual(
+            structure_cache.question_type_counts(self.course.id, self.subtopic.id), {}
+        )
+
+        question = self.add_question("coding")
+        self.add_question("mcq_single")
+        Subtopic.objects.create(topic=self.topic, name="Functions", order_index=1)
+        self.assertEqual(structure_cache.subtopic_count(self.course.id), 2)
+        self.assertEqual(
+            structure_cache.question_type_counts(self.course.id, self.subtopic.id),
+            {"coding": 1, "mcq_single": 1},
+        )
+
+        question.delete()
+        self.assertEqual(
+            structure_cache.question_type_counts(self.course.id, self.subtopic.id),
+            {"mcq_single": 1},
+        )
+        # Served from the in-process cache until the course changes again
+        with self.assertNumQueries(0):
+            structure_cache.question_type_counts(self.course.id, self.subtopic.id)
+
+    def test_moving_a_question_updates_both_courses(self):
+        """Test a question moved to another course leaves the old course's counts."""
+        other_course = Course.objects.create(
+            name="Other Course", short_code="OC101", category="fundamentals"
+        )
+        other_topic = Topic.objects.create(
+            course=other_course, name="Basics", order_index=0
+        )
+        other_subtopic = Subtopic.objects.create(
+            topic=other_topic, name="Loops", order_index=0
+        )
+        question = self.add_question("coding")
+        structure_cache.get_structure(self.course.id)
+
+        question.subtopic = other_subtopic
+        question.save()
+        self.assertEqual(
+            structure_cache.question_type_counts(self.course.id, self.subtopic.id), {}
+        )
+        self.assertEqual(
+            structure_cache.question_type_counts(other_course.id, other_subtopic.id),
+            {"coding": 1},
+        )
+
+
+class PracticeStatsTest(APITestCase):
+    """
+    Test cases for the denormalized practice counters of the course catalogue.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="learner@test.com", username="learner", password="testpass123"
+        )
+        self.course = Course.objects.create(
+            name="Practice Course", short_code="PC101", category="fundamentals"
+        )
+        self.topic = Topic.objects.create(
+            course=self.course, name="Arrays", order_index=0
+        )
+        self.subtopic = Subtopic.objects.create(
+            topic=self.topic, name="Two pointers", order_index=0
+        )
+        self.course_question = self.add_question(level="course", course=self.course)
+        self.topic_question = self.add_question(level="topic", topic=self.topic)
+        self.add_question(level="subtopic", subtopic=self.subtopic)
+        self.add_question(
+            level="subtopic", subtopic=self.subtopic, categories=["learn"]
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def add_question(self, categories=None, **association):
+        return Question.objects.create(
+            type="coding",
+            title="Problem",
+            content="Solve it",
+            categories=categories or ["practice"],
+            test_cases_basic=[{"input": "1", "expected_output": "1"}],
+            created_by=self.user,
+            **association,
+        )
+
+    def test_problem_counters_follow_questions(self):
+        """Test course and topic counters are kept current on question writes."""
+        self.course.refresh_from_db()
+        self.topic.refresh_from_db()
+        self.assertEqual(self.course.total_practice_problems, 3)
+        self.assertEqual(self.topic.total_practice_problems, 2)
+
+        self.topic_question.categories = ["learn"]
+        self.topic_question.save()
+        self.subtopic.delete()
+        self.course.refresh_from_db()
+        self.topic.refresh_from_db()
+        self.assertEqual(self.course.total_practice_problems, 1)
+        self.assertEqual(self.topic.total_practice_problems, 0)
+
+    def counters(self, *rows):
+        for row in rows:
+            row.refresh_from_db()
+        return [row.total_practice_problems for row in rows]
+
+    def test_moves_shift_counters_without_recounting(self):
+        """Test moved questions, subtopics and topics move their problems by one."""
+        other_course = Course.objects.create(
+            name="Other", short_code="OT101", category="fundamentals"
+        )
+        other_topic = Topic.objects.create(
+            course=self.course, name="Strings", order_index=1
+        )
+        with patch.object(practice_stats, "refresh_problem_counts") as recount:
+            self.topic_question.topic = other_topic
+            self.topic_question.save()
+            self.assertEqual(
+                self.counters(self.course, self.topic, other_topic), [3, 1, 1]
+            )
+
+            self.subtopic.topic = other_topic
+            self.subtopic.save()
+            self.assertEqual(
+                self.counters(self.course, self.topic, other_topic), [3, 0, 2]
+            )
+
+            other_topic.course = other_course
+            other_topic.save()
+            self.assertEqual(self.counters(self.course, other_course), [1, 2])
+
+            self.course_question.categories = ["learn"]
+            self.course_question.save()
+            self.add_question(level="topic", topic=self.topic)
+            self.assertEqual(self.counters(self.course, self.topic), [1, 1])
+        recount.assert_not_called()
+
+        # The repair command agrees with the counters kept by the signals
+        Course.objects.update(total_practice_problems=0)
+        Topic.objects.update(total_practice_problems=9)
+        out = StringIO()
+        call_command("recount_practice_problems", stdout=out)
+        self.assertIn("Recounted practice problems for 2 courses.", out.getvalue())
+        self.assertEqual(
+            self.counters(self.course, self.topic, other_course, other_topic),
+            [1, 1, 2, 2],
+        )
+
+    def test_cascades_are_counted_once(self):
+        """Test deleting a topic subtracts its questions without per-row work."""
+        self.add_question(level="subtopic", subtopic=self.subtopic)
+        self.assertEqual(self.counters(self.course, self.topic), [4, 3])
+
+        with patch.object(
+            practice_stats, "question_slots", wraps=practice_stats.question_slots
+        ) as question_slots, patch.object(structure_cache, "invalidate") as invalidate:
+            self.topic.delete()
+        question_slots.assert_not_called()
+        invalidate.assert_called_once_with(self.course.id)
+        self.assertEqual(self.counters(self.course), [1])
+
+        self.course_question.delete()
+        self.assertEqual(self.counters(self.course), [0])
+
+    def test_listing_reads_user_stats(self):
+        """Test the catalogue reports the user's solved count, score and AI help."""
+        StudentCodePractice.objects.create(
+            user=self.user,
+            question=self.course_question,
+            course=self.course,
+            status="evaluated",
+            marks_obtained=8.0,
+            ai_help_count=2,
+        )
+        StudentCodePractice.objects.create(
+            user=self.user,
+            question=self.topic_question,
+            course=self.course,
+            marks_obtained=3.0,
+        )
+        stats = UserCoursePracticeStats.objects.get(user=self.user, course=self.course)
+        self.assertEqual(
+            (stats.solved_problems, stats.total_score, stats.ai_help_used),
+            (1, 11.0, 2),
+        )
+
+        # No longer a practice problem, so its submission stops counting
+        self.topic_question.categories = ["learn"]
+        self.topic_question.save()
+
+        response = self.client.get(reverse("course-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        course = response.data[0]
+        self.assertEqual(course["total_problems"], 2)
+        self.assertEqual(course["solved_problems"], 1)
+        self.assertEqual(course["total_score"], 8.0)
+        self.assertEqual(course["ai_help_used"], 2)
+        self.assertEqual(course["progress_percentage"], 50.0)
+
+
+class QuestionAnswerKeyTest(TestCase):
+    """
+    Test cases for the MCQ answer key stored on questions.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="instructor@test.com", username="instructor", password="testpass123"
+        )
+        self.course = Course.objects.create(
+            name="Quiz Course", short_code="QZ101", category="fundamentals"
+        )
+
+    def test_answer_key_follows_options(self):
+        """Test saving a question recompiles its answer key."""
+        question = Question.objects.create(
+            type="mcq_multiple",
+            title="Pick the primes",
+            content="Which are prime?",
+            level="course",
+            course=self.course,
+            categories=["contest"],
+            mcq_options=[
+                {"text": "7", "is_correct": True},
+                {"text": "4", "is_correct": False},
+                {"text": "2", "is_correct": True},
+            ],
+            created_by=self.user,
+        )
+        self.assertEqual(question.mcq_answer_key, ["2", "7"])
+
+        question.mcq_options[1]["is_correct"] = True
+        question.save(update_fields=["mcq_options"])
+        question.refresh_from_db()
+        self.assertEqual(question.mcq_answer_key, ["2", "4", "7"])
+
+        question.type = "coding"
+        question.test_cases_basic = [{"input": "", "expected_output": "ok"}]
+        question.save()
+        self.assertIsNone(question.mcq_answer_key)
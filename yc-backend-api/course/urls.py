@@ -9,6 +9,7 @@ from .views import (
     QuestionViewSet,
     StudentCourseProgressViewSet,
     StudentCodePracticeViewSet,
+    CodeSubmissionJobViewSet,
 )
 
 router = DefaultRouter()
@@ -20,6 +21,7 @@ router.register(r"notes", NoteViewSet)
 router.register(r"questions", QuestionViewSet)
 router.register(r"student-course-progress", StudentCourseProgressViewSet)
 router.register(r"student-code-practices", StudentCodePracticeViewSet)
+router.register(r"submission-jobs", CodeSubmissionJobViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
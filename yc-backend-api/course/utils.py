@@ -1,15 +1,85 @@
-import os
+import hashlib
+import json
 import requests
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from core.executor_client import get_executor_client
+from . import plagiarism_index
 from .models import Question, StudentCodePractice
 
 
+EXECUTION_RESULT_CACHE_PREFIX = "code_execution_result"
+TEST_SET_VERSION_PREFIX = "question_test_set_version"
+
+
 class CodeExecutionUtil:
     """
     Utility class for executing code and handling results consistently
     across different ViewSets (StudentCourseProgressViewSet and StudentCodePracticeViewSet)
     """
 
+    @staticmethod
+    def normalize_code(code):
+        """
+        Normalize code for result caching without changing its meaning: only
+        whitespace after the last line is dropped, since whitespace inside the
+        code may be part of a multi-line string literal.
+        """
+        return (code or "").rstrip()
+
+    @staticmethod
+    def get_test_set_version(question_id):
+        """Version of a question's test cases, bumped whenever they are edited"""
+        if not question_id:
+            return 0
+        return cache.get(f"{TEST_SET_VERSION_PREFIX}_{question_id}", 0)
+
+    @staticmethod
+    def invalidate_question_results(question_id):
+        """Make every cached execution result for this question unreachable"""
+        key = f"{TEST_SET_VERSION_PREFIX}_{question_id}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    @staticmethod
+    def get_result_cache_key(question_id, payload):
+        """
+        Cache key for an executor response: question, test-set version and a
+        hash of the normalized code, language and every test case sent.
+        """
+        fingerprint = json.dumps(
+            {
+                "code": CodeExecutionUtil.normalize_code(payload["code"]),
+                "language": payload["language"],
+                "test_cases_basic": payload["test_cases_basic"],
+                "test_cases_advanced": payload["test_cases_advanced"],
+                "test_cases_custom": payload["test_cases_custom"],
+                "timeout": payload["timeout"],
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(fingerprint.encode()).hexdigest()
+        version = CodeExecutionUtil.get_test_set_version(question_id)
+        question_key = question_id or "adhoc"
+        return f"{EXECUTION_RESULT_CACHE_PREFIX}_{question_key}_{version}_{digest}"
+
+    @staticmethod
+    def is_cacheable_result(response_data):
+        """Only deterministic executor answers are reused; timeouts may pass on retry"""
+        if (
+            not isinstance(response_data, dict)
+            or "execution_result" not in response_data
+        ):
+            return False
+        return not any(
+            result.get("error") == "Timeout"
+            for result in response_data.get("test_results", [])
+        )
+
     @staticmethod
     def execute_code(
         code,
@@ -18,6 +88,7 @@ class CodeExecutionUtil:
         test_cases_basic=None,
         test_cases_advanced=None,
         test_cases_custom=None,
+        on_test_result=None,
     ):
         """
         Execute code using the code executor service
@@ -29,6 +100,13 @@ class CodeExecutionUtil:
             test_cases_basic (list, optional): Basic test cases
             test_cases_advanced (list, optional): Advanced test cases
             test_cases_custom (list, optional): Custom test cases
+            on_test_result (callable, optional): Called as
+                on_test_result(category, index, result) for every test case as
+                soon as it completes; results are then streamed from the executor
+
+        Identical re-evaluations (same normalized code, language and test
+        cases) are answered from the result cache for
+        CODE_EXECUTION_CACHE_TIMEOUT seconds.
 
         Returns:
             dict: Execution results containing test results, output, etc.
@@ -54,8 +132,6 @@ class CodeExecutionUtil:
         if not test_cases_custom:
             test_cases_custom = []
 
-        service_url = os.environ.get("CODE_EXECUTOR_URL", "http://code-executor:8002")
-
         payload = {
             "code": code,
             "language": language,
@@ -65,10 +141,33 @@ class CodeExecutionUtil:
             "timeout": 10,
         }
 
-        executor_response = requests.post(
-            f"{service_url}/execute-with-tests", json=payload, timeout=15
-        )
-        response_data = executor_response.json()
+        cache_key = CodeExecutionUtil.get_result_cache_key(question_id, payload)
+        response_data = cache.get(cache_key)
+        if response_data is None:
+            if on_test_result is None:
+                executor_response = get_executor_client().post(
+                    "/execute-with-tests", json=payload, timeout=15, idempotent=True
+                )
+                status_code = executor_response.status_code
+                response_data = executor_response.json()
+            else:
+                status_code, response_data = CodeExecutionUtil.stream_execution(
+                    payload, on_test_result
+                )
+            if status_code == 200 and CodeExecutionUtil.is_cacheable_result(
+                response_data
+            ):
+                cache.set(
+                    cache_key,
+                    response_data,
+                    getattr(settings, "CODE_EXECUTION_CACHE_TIMEOUT", 600),
+                )
+        elif on_test_result is not None:
+            for category in ("basic", "advanced", "custom"):
+                for index, result in enumerate(
+                    response_data.get(f"{category}_results", [])
+                ):
+                    on_test_result(category, index, result)
 
         exec_res = response_data.get("execution_result", {})
         execution_output = exec_res.get("output", "")
@@ -105,16 +204,57 @@ class CodeExecutionUtil:
         }
 
     @staticmethod
-    def check_plagiarism(code, language, question, user, service_url):
+    def stream_execution(payload, on_test_result):
         """
-        Check for plagiarism against recent submissions
+        Run a payload through the executor's streaming endpoint, calling
+        on_test_result(category, index, result) as each test case finishes
+
+        Returns:
+            tuple: (status_code, response_data) as /execute-with-tests answers
+
+        Raises:
+            requests.exceptions.RequestException: If the executor is unavailable
+                or the stream ends before the final result
+        """
+        with get_executor_client().post(
+            "/execute-with-tests/stream",
+            json=payload,
+            timeout=15,
+            idempotent=True,
+            stream=True,
+        ) as executor_response:
+            if executor_response.status_code != 200:
+                return executor_response.status_code, executor_response.json()
+
+            for line in executor_response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["event"] == "result":
+                    on_test_result(event["category"], event["index"], event["result"])
+                elif event["event"] == "complete":
+                    return 200, event["response"]
+                else:
+                    return event.get("status_code", 500), {
+                        "detail": event.get("detail", "")
+                    }
+
+        raise requests.exceptions.ConnectionError(
+            "Code executor closed the result stream early"
+        )
+
+    @staticmethod
+    def check_plagiarism(code, language, question, user):
+        """
+        Check for plagiarism against every earlier practice submission of the
+        question: the fingerprint index picks the closest candidates and only
+        those are scored by the code executor
 
         Args:
             code (str): Code to check
             language (str): Programming language
             question (Question): Question object
             user: User object
-            service_url (str): Code executor service URL
 
         Returns:
             tuple: (plagiarism_score, plagiarism_details)
@@ -123,28 +263,14 @@ class CodeExecutionUtil:
         plagiarism_details = {}
 
         try:
-            reference_submissions = []
-
-            recent_submissions = (
-                StudentCodePractice.objects.filter(question=question)
-                .exclude(user=user)
-                .select_related("user")
-                .order_by("-created_at")[:20]
+            candidates = plagiarism_index.find_candidates(
+                question,
+                StudentCodePractice._meta.label_lower,
+                code,
+                language,
+                exclude_user=user,
             )
-
-            for submission in recent_submissions:
-                code_data = (
-                    submission.answer_latest.get("code", "")
-                    if submission.answer_latest
-                    else ""
-                )
-                reference_submissions.append(
-                    {
-                        "submission_id": str(submission.id),
-                        "user_id": str(submission.user.id),
-                        "answer_data": {"code": code_data},
-                    }
-                )
+            reference_submissions = plagiarism_index.reference_submissions(candidates)
 
             if reference_submissions:
                 plagiarism_payload = {
@@ -153,10 +279,11 @@ class CodeExecutionUtil:
                     "reference_submissions": reference_submissions,
                 }
 
-                plag_response = requests.post(
-                    f"{service_url}/plagiarism-check",
+                plag_response = get_executor_client().post(
+                    "/plagiarism-check",
                     json=plagiarism_payload,
                     timeout=5,
+                    idempotent=True,
                 )
 
                 if plag_response.status_code == 200:
@@ -170,6 +297,24 @@ class CodeExecutionUtil:
 
         return plagiarism_score, plagiarism_details
 
+    @staticmethod
+    def index_practice_record(practice_record):
+        """Add a practice submission's latest code to the plagiarism index"""
+        answer = practice_record.answer_latest or {}
+        if not answer.get("code"):
+            return
+        try:
+            plagiarism_index.index_submission(
+                question=practice_record.question,
+                user=practice_record.user,
+                source=StudentCodePractice._meta.label_lower,
+                source_id=practice_record.id,
+                language=answer.get("language", ""),
+                code=answer["code"],
+            )
+        except Exception as e:
+            print(f"Plagiarism indexing failed: {e}")
+
     @staticmethod
     def create_or_update_practice_record(
         user,
@@ -245,8 +390,25 @@ class CodeExecutionUtil:
         )
 
         practice_record.save()
+        CodeExecutionUtil.index_practice_record(practice_record)
         return practice_record
 
+    @staticmethod
+    def mask_advanced_result(result):
+        """Hidden (advanced) test case result as shown to students"""
+        passed = result.get("passed", False)
+        return {
+            "passed": passed,
+            "input": CodeExecutionUtil.mask_test_data(result.get("input", "")),
+            "expected_output": CodeExecutionUtil.mask_test_data(
+                result.get("expected_output", "")
+            ),
+            "actual_output": result.get("actual_output", "") if passed else "***",
+            "error": result.get("error", "") if not passed else "",
+            "execution_time": result.get("execution_time", 0),
+            "is_hidden": True,
+        }
+
     @staticmethod
     def mask_test_data(data_str):
         """
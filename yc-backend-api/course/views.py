@@ -3,16 +3,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db import IntegrityError
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-import os
 import requests
 from django.db.models import (
     Count, Q, F, Case, When, Value, IntegerField, FloatField, 
-    OuterRef, Subquery, Sum, Exists
+    OuterRef, Subquery, Exists, FilteredRelation
 )
 from django.db.models.functions import Coalesce
 from authentication.permissions import CanManageCourses, IsAuthenticatedUser
 from .utils import CodeExecutionUtil
+from . import progress_rollup, structure_cache, submission_queue
 from .models import (
     Course,
     Topic,
@@ -22,7 +23,9 @@ from .models import (
     CourseInstructor,
     Question,
     UserCourseProgress,
+    UserCourseRollup,
     StudentCodePractice,
+    CodeSubmissionJob,
 )
 from .serializers import (
     CourseSerializer,
@@ -34,6 +37,7 @@ from .serializers import (
     NoteSerializer,
     QuestionSerializer,
     StudentCodePracticeSerializer,
+    CodeSubmissionJobSerializer,
 )
 from django.contrib.auth import get_user_model
 
@@ -44,6 +48,29 @@ def instructor_assigned(user, course):
     return CourseInstructor.objects.filter(instructor=user, course=course).exists()
 
 
+def wants_async_submission(request):
+    """Clients opt in to queued evaluation with "async": true (body or query)"""
+    value = request.data.get("async", request.query_params.get("async", False))
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def enqueue_submission(request, kind):
+    """Queue the submission for the workers and answer 202 with its job id"""
+    data = request.data.dict() if hasattr(request.data, "dict") else dict(request.data)
+    data.pop("async", None)
+    job = submission_queue.enqueue(request.user, kind, data)
+    return Response(
+        {
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": request.build_absolute_uri(
+                reverse("codesubmissionjob-detail", args=[job.id])
+            ),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 class CourseViewSet(viewsets.ModelViewSet):
     queryset = Course.objects.all()
     permission_classes = [CanManageCourses]
@@ -57,51 +84,24 @@ class CourseViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
 
-        practice_questions_filter = Q(type='coding') & Q(categories__contains=['practice'])
-        
-        queryset = queryset.annotate(
-            total_problems=Count(
-                'questions', 
-                filter=Q(questions__type='coding') & Q(questions__categories__contains=['practice']), 
-                distinct=True
-            ) + Count(
-                'topics__questions',
-                filter=Q(topics__questions__type='coding') & Q(topics__questions__categories__contains=['practice']),
-                distinct=True
-            ) + Count(
-                'topics__subtopics__questions',
-                filter=Q(topics__subtopics__questions__type='coding') & Q(topics__subtopics__questions__categories__contains=['practice']),
-                distinct=True
-            )
-        )
+        # Counters are maintained by course/practice_stats.py
+        queryset = queryset.annotate(total_problems=F("total_practice_problems"))
 
         if self.request.user.is_authenticated:
-            solved_subquery = StudentCodePractice.objects.filter(
-                user=self.request.user,
-                course=OuterRef('pk'),
-                status__in=['completed', 'evaluated'],
-                question__type='coding',
-                question__categories__contains=['practice']
-            ).values('course').annotate(cnt=Count('id')).values('cnt')
-            
-            score_subquery = StudentCodePractice.objects.filter(
-                user=self.request.user,
-                course=OuterRef('pk'),
-                question__type='coding',
-                question__categories__contains=['practice']
-            ).values('course').annotate(total_valid_score=Sum('marks_obtained')).values('total_valid_score')
-
-            ai_subquery = StudentCodePractice.objects.filter(
-                user=self.request.user,
-                course=OuterRef('pk'),
-                question__type='coding',
-                question__categories__contains=['practice']
-            ).values('course').annotate(total_ai=Sum('ai_help_count')).values('total_ai')
-
             queryset = queryset.annotate(
-                solved_problems=Coalesce(Subquery(solved_subquery), 0, output_field=IntegerField()),
-                total_score=Coalesce(Subquery(score_subquery), 0.0, output_field=FloatField()),
-                ai_help_used=Coalesce(Subquery(ai_subquery), 0, output_field=IntegerField())
+                user_practice=FilteredRelation(
+                    "user_practice_stats",
+                    condition=Q(user_practice_stats__user=self.request.user),
+                ),
+                solved_problems=Coalesce(
+                    F("user_practice__solved_problems"), 0, output_field=IntegerField()
+                ),
+                total_score=Coalesce(
+                    F("user_practice__total_score"), 0.0, output_field=FloatField()
+                ),
+                ai_help_used=Coalesce(
+                    F("user_practice__ai_help_used"), 0, output_field=IntegerField()
+                ),
             )
         else:
             queryset = queryset.annotate(
@@ -110,7 +110,6 @@ class CourseViewSet(viewsets.ModelViewSet):
                 ai_help_used=Value(0, output_field=IntegerField())
             )
 
-        
         queryset = queryset.annotate(
             progress_percentage=Case(
                 When(total_problems__gt=0, then=F('solved_problems') * 100.0 / F('total_problems')),
@@ -189,18 +188,8 @@ class TopicViewSet(viewsets.ModelViewSet):
         if course_id:
             qs = qs.filter(course_id=course_id)
 
-        
-        qs = qs.annotate(
-            total_problems=Count(
-                'questions', 
-                filter=Q(questions__type='coding') & Q(questions__categories__contains=['practice']), 
-                distinct=True
-            ) + Count(
-                'subtopics__questions',
-                filter=Q(subtopics__questions__type='coding') & Q(subtopics__questions__categories__contains=['practice']),
-                distinct=True
-            )
-        )
+        # Maintained by course/practice_stats.py
+        qs = qs.annotate(total_problems=F("total_practice_problems"))
 
         
         if self.request.user.is_authenticated:
@@ -552,7 +541,10 @@ class QuestionViewSet(viewsets.ModelViewSet):
         if user.role == "admin" or (
             user.role == "instructor" and instructor_assigned(user, course)
         ):
-            return super().update(request, *args, **kwargs)
+            response = super().update(request, *args, **kwargs)
+            # Cached executor results were computed against the old test cases
+            CodeExecutionUtil.invalidate_question_results(question.id)
+            return response
 
         return Response({"error": "Not allowed"}, status=403)
 
@@ -653,16 +645,25 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["post"])
     def submit_coding(self, request):
-        user = request.user
-        subtopic_id = request.data.get("subtopic_id")
-        coding_status = request.data.get("coding_status", {})
+        if wants_async_submission(request):
+            return enqueue_submission(request, CodeSubmissionJob.KIND_COURSE_CODING)
+        return self.evaluate_coding_submission(request.user, request.data)
 
-        question_id = request.data.get("question_id")
-        language = request.data.get("language")
-        code = request.data.get("code")
-        test_cases_basic = request.data.get("test_cases_basic", [])
-        test_cases_advanced = request.data.get("test_cases_advanced", [])
-        test_cases_custom = request.data.get("test_cases_custom", [])
+    @staticmethod
+    def evaluate_coding_submission(user, data, on_test_result=None):
+        """
+        Run a coding submission and update course progress; shared by
+        submit_coding and the submission workers
+        """
+        subtopic_id = data.get("subtopic_id")
+        coding_status = data.get("coding_status", {})
+
+        question_id = data.get("question_id")
+        language = data.get("language")
+        code = data.get("code")
+        test_cases_basic = data.get("test_cases_basic", [])
+        test_cases_advanced = data.get("test_cases_advanced", [])
+        test_cases_custom = data.get("test_cases_custom", [])
 
         # Try to get subtopic from subtopic_id or derive from question
         subtopic = None
@@ -707,6 +708,7 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
                     test_cases_basic=test_cases_basic,
                     test_cases_advanced=test_cases_advanced,
                     test_cases_custom=test_cases_custom,
+                    on_test_result=on_test_result,
                 )
 
                 execution_results = result["execution_results"]
@@ -767,9 +769,9 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
                 if q_id not in progress.coding_answers:
                     progress.coding_answers[q_id] = is_solved
 
-            total_questions = Question.objects.filter(
-                subtopic=subtopic, type="coding"
-            ).count()
+            total_questions = structure_cache.question_type_counts(
+                subtopic.topic.course_id, subtopic.id
+            ).get("coding", 0)
 
             solved_count = 0
             if progress.coding_answers:
@@ -877,38 +879,36 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"])
     def continue_learning(self, request):
-        user = request.user
-        # Sort by last_accessed to ensure the most recently viewed subtopic is returned
-        last_progress = (
-            UserCourseProgress.objects.filter(user=user)
-            .order_by("-last_accessed", "-updated_at")
+        # The rollup of the most recently accessed course holds its last subtopic
+        rollup = (
+            UserCourseRollup.objects.filter(
+                user=request.user, last_accessed_subtopic__isnull=False
+            )
+            .select_related("course", "last_accessed_subtopic")
+            .order_by("-last_accessed")
             .first()
         )
 
-        if not last_progress:
+        if not rollup:
             return Response({"message": "No progress found"}, status=200)
 
-        course = last_progress.course
-
-        total_lessons = Subtopic.objects.filter(topic__course=course).count()
-
-        user_progress_list = UserCourseProgress.objects.filter(user=user, course=course)
-        total_percent_sum = sum(p.progress_percent for p in user_progress_list)
+        course = rollup.course
+        subtopic = rollup.last_accessed_subtopic
 
         avg_percent = 0
-        if total_lessons > 0:
-            avg_percent = round(total_percent_sum / total_lessons)
+        if rollup.subtopics_total > 0:
+            avg_percent = round(rollup.progress_sum / rollup.subtopics_total)
 
         return Response(
             {
                 "course_id": course.id,
                 "course_name": course.name,
-                "topic_id": last_progress.topic.id if last_progress.topic else None,
-                "subtopic_id": last_progress.subtopic.id,
-                "subtopic_name": last_progress.subtopic.name,
-                "total_lessons": total_lessons,
+                "topic_id": subtopic.topic_id,
+                "subtopic_id": subtopic.id,
+                "subtopic_name": subtopic.name,
+                "total_lessons": rollup.subtopics_total,
                 "percent": avg_percent,
-                "lesson": user_progress_list.count(),  # approximate 'current lesson' count
+                "lesson": rollup.started_count,  # approximate 'current lesson' count
             }
         )
 
@@ -917,46 +917,15 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
         """
         Return user learning stats.
         """
-        user = request.user
+        rollups = list(UserCourseRollup.objects.filter(user=request.user))
 
-        # Calculate stats
-        completed_count = UserCourseProgress.objects.filter(
-            user=user, is_completed=True
-        ).count()
+        completed_count = sum(r.completed_count for r in rollups)
+        total_minutes = sum(r.minutes_estimate for r in rollups)
 
-        # Calculate average progress
+        # Average of the per-course percentages
         avg_progress = 0
-        total_minutes = 0
-
-        progress_records = UserCourseProgress.objects.filter(user=user)
-
-        if progress_records.exists():
-            for p in progress_records:
-                total_minutes += 5  # Base
-                if p.is_videos_watched:
-                    total_minutes += 15
-                if p.is_quiz_completed:
-                    total_minutes += 10
-                if p.is_coding_completed:
-                    total_minutes += 25
-
-            course_map = {}  # {course_id: sum_of_percentages}
-            for p in progress_records:
-                cid = p.course_id
-                course_map[cid] = course_map.get(cid, 0) + p.progress_percent
-
-            # 2. Calculate % for each course
-            total_course_pct = 0
-            for cid, current_sum in course_map.items():
-                total_subs = Subtopic.objects.filter(topic__course_id=cid).count()
-                if total_subs > 0:
-                    c_pct = current_sum / total_subs
-                    c_pct = min(c_pct, 100.0)
-                    total_course_pct += c_pct
-
-            # 3. Overall Average
-            if len(course_map) > 0:
-                avg_progress = round(total_course_pct / len(course_map))
+        if rollups:
+            avg_progress = round(sum(r.percent for r in rollups) / len(rollups))
 
         # Format time string "Xh Ym"
         hours = total_minutes // 60
@@ -980,30 +949,13 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
         Get overall progress percentage for all courses the user has started.
         Returns: [{'course_id': 'uuid', 'percent': 45.5}, ...]
         """
-        user = request.user
-
-        # Get all progress records
-        progress_records = UserCourseProgress.objects.filter(user=user).select_related(
-            "course"
+        rollups = UserCourseRollup.objects.filter(
+            user=request.user, subtopics_total__gt=0
         )
-
-        # Group by course
-        course_stats = {}
-        for p in progress_records:
-            cid = str(p.course.id)
-            if cid not in course_stats:
-                course_stats[cid] = {"sum": 0.0}
-            course_stats[cid]["sum"] += p.progress_percent
-
-        results = []
-        for cid, stats in course_stats.items():
-            # Count total subtopics for this course
-            total_subs = Subtopic.objects.filter(topic__course_id=cid).count()
-            if total_subs > 0:
-                percent = round(stats["sum"] / total_subs, 1)
-                # Cap at 100% just in case
-                percent = min(percent, 100.0)
-                results.append({"course_id": cid, "percent": percent})
+        results = [
+            {"course_id": str(r.course_id), "percent": round(r.percent, 1)}
+            for r in rollups
+        ]
 
         return Response(results)
 
@@ -1039,9 +991,9 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
             return Response({"error": "course_id is required"}, status=400)
 
         progress_qs = (
-            UserCourseProgress.objects.filter(user=user, course_id=course_id)
-            .select_related("subtopic")
-            .prefetch_related("subtopic__questions")
+            UserCourseProgress.objects.filter(
+                user=user, course_id=course_id
+            ).select_related("subtopic")
         )
 
         updated_records = []
@@ -1053,6 +1005,7 @@ class StudentCourseProgressViewSet(viewsets.GenericViewSet):
             UserCourseProgress.objects.bulk_update(
                 updated_records, ["progress_percent", "is_completed"]
             )
+            progress_rollup.refresh_rollup(user.id, course_id)
 
         from .serializers import UserCourseProgressSerializer
 
@@ -1114,15 +1067,25 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="submit")
     def submit_code(self, request):
+        if wants_async_submission(request):
+            return enqueue_submission(request, CodeSubmissionJob.KIND_PRACTICE_SUBMIT)
+        return self.evaluate_submission(request.user, request.data)
+
+    @staticmethod
+    def evaluate_submission(user, data, on_test_result=None):
+        """
+        Run a practice submission and record it; shared by submit_code and the
+        submission workers
+        """
         try:
-            code = request.data.get("code")
-            language = request.data.get("language")
-            question_id = request.data.get("question_id")  # Updated to match learn mode
-            course_id = request.data.get("course_id")
-            topic_id = request.data.get("topic_id")
-            test_cases_basic = request.data.get("test_cases_basic", [])
-            test_cases_advanced = request.data.get("test_cases_advanced", [])
-            test_cases_custom = request.data.get("test_cases_custom", [])
+            code = data.get("code")
+            language = data.get("language")
+            question_id = data.get("question_id")  # Updated to match learn mode
+            course_id = data.get("course_id")
+            topic_id = data.get("topic_id")
+            test_cases_basic = data.get("test_cases_basic", [])
+            test_cases_advanced = data.get("test_cases_advanced", [])
+            test_cases_custom = data.get("test_cases_custom", [])
 
             if not code or not language or not question_id:
                 return Response(
@@ -1145,6 +1108,7 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
                     test_cases_basic=test_cases_basic,
                     test_cases_advanced=test_cases_advanced,
                     test_cases_custom=test_cases_custom,
+                    on_test_result=on_test_result,
                 )
 
                 execution_results = result["execution_results"]
@@ -1152,15 +1116,10 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
                 execution_output = result["execution_output"]
                 response_data = result["response_data"]
 
-                service_url = os.environ.get(
-                    "CODE_EXECUTOR_URL", "http://code-executor:8002"
-                )
                 (
                     plagiarism_score,
                     plagiarism_details,
-                ) = CodeExecutionUtil.check_plagiarism(
-                    code, language, question, request.user, service_url
-                )
+                ) = CodeExecutionUtil.check_plagiarism(code, language, question, user)
 
                 course = None
                 topic = None
@@ -1198,7 +1157,7 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
                 is_successful = total_tests > 0 and total_passed == total_tests
 
                 existing_submission = StudentCodePractice.objects.filter(
-                    user=request.user, question=question
+                    user=user, question=question
                 ).first()
 
                 if existing_submission:
@@ -1268,7 +1227,7 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
 
                 else:
                     submission = StudentCodePractice.objects.create(
-                        user=request.user,
+                        user=user,
                         question=question,
                         course=course,
                         topic=topic,
@@ -1318,6 +1277,8 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
                         marks_obtained=question.marks if is_successful else 0,
                     )
 
+                CodeExecutionUtil.index_practice_record(submission)
+
                 basic_count = len(test_cases_basic)
                 custom_count = len(test_cases_custom)
                 advanced_count = len(test_cases_advanced)
@@ -1329,26 +1290,9 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
 
                 masked_advanced_results = []
                 for i, result in enumerate(advanced_results):
-                    masked_input = CodeExecutionUtil.mask_test_data(
-                        result.get("input", "")
-                    )
-                    masked_expected = CodeExecutionUtil.mask_test_data(
-                        result.get("expected_output", "")
-                    )
-
                     masked_advanced_results.append(
                         {
-                            "passed": result.get("passed", False),
-                            "input": masked_input,
-                            "expected_output": masked_expected,
-                            "actual_output": result.get("actual_output", "")
-                            if result.get("passed", False)
-                            else "***",
-                            "error": result.get("error", "")
-                            if not result.get("passed", False)
-                            else "",
-                            "execution_time": result.get("execution_time", 0),
-                            "is_hidden": True,
+                            **CodeExecutionUtil.mask_advanced_result(result),
                             "test_case_number": visible_test_count + i + 1,
                         }
                     )
@@ -1414,3 +1358,17 @@ class StudentCodePracticeViewSet(viewsets.ModelViewSet):
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class CodeSubmissionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of queued code submissions (submit endpoints called with "async": true)
+    Route: /api/course/submission-jobs/
+    """
+
+    queryset = CodeSubmissionJob.objects.all()
+    serializer_class = CodeSubmissionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
@@ -0,0 +1,102 @@
+"""
+Candidate cards: the JobProfile projection of search results and listings.
+
+JobProfileSerializer nests the profile's experiences, projects, education,
+certifications and social links, which costs several queries per candidate
+unless every relation is prefetched, and candidate lists only show a card.
+Lists are therefore built from ``.values()`` rows of the page, with the job
+skills, profile skills and experience companies of all its candidates fetched
+in one query each, and formatted by CandidateCardSerializer. The nested
+JobProfileSerializer is only used to retrieve a single candidate.
+"""
+from collections import defaultdict
+
+from .models import Experience, JobSkill, Skill
+
+CARD_VALUES = [
+    "id",
+    "profile_id",
+    "profile__full_name",
+    "profile__title",
+    "profile__location",
+    "profile__about",
+    "profile__user_id",
+    "profile__user__email",
+    "profile__user__first_name",
+    "profile__user__last_name",
+    "profile__user__username",
+    "current_ctc",
+    "expected_ctc",
+    "currency",
+    "total_experience_years",
+    "total_experience_months",
+    "notice_period",
+    "available_from",
+    "preferred_employment_types",
+    "preferred_locations",
+    "open_to_remote",
+    "highest_education",
+    "domain",
+    "preferred_company_types",
+    "is_actively_looking",
+    "last_active",
+    "resume_file",
+    "created_at",
+    "updated_at",
+]
+
+PROFILE_FIELDS = ["full_name", "title", "location", "about"]
+USER_FIELDS = ["email", "first_name", "last_name", "username"]
+
+
+def values(queryset):
+    """The card columns of a JobProfile queryset, plus its annotations"""
+    return queryset.values(*CARD_VALUES, *queryset.query.annotation_select)
+
+
+def build(rows):
+    """Card dicts for ``values()`` rows, in three queries however many rows"""
+    rows = list(rows)
+    job_profile_ids = [row["id"] for row in rows]
+    profile_ids = [row["profile_id"] for row in rows]
+
+    job_skills = defaultdict(list)
+    for job_skill in JobSkill.objects.filter(job_profile_id__in=job_profile_ids).values(
+        "job_profile_id", "skill_name", "proficiency", "years_of_experience"
+    ):
+        job_skills[job_skill.pop("job_profile_id")].append(job_skill)
+
+    skill_names = defaultdict(list)
+    for profile_id, name in Skill.objects.filter(
+        profile_id__in=profile_ids
+    ).values_list("profile_id", "name"):
+        skill_names[profile_id].append(name)
+
+    companies = defaultdict(list)
+    for profile_id, company in Experience.objects.filter(
+        profile_id__in=profile_ids
+    ).values_list("profile_id", "company"):
+        companies[profile_id].append(company)
+
+    cards = []
+    for row in rows:
+        profile = {field: row[f"profile__{field}"] for field in PROFILE_FIELDS}
+        card = {
+            field: row[field]
+            for field in CARD_VALUES
+            if not field.startswith("profile")
+        }
+        card.update(profile)
+        card["profile"] = profile
+        card["user"] = {
+            "id": str(row["profile__user_id"]),
+            **{field: row[f"profile__user__{field}"] for field in USER_FIELDS},
+        }
+        card["total_experience_in_years"] = row["total_experience_years"] + (
+            row["total_experience_months"] / 12
+        )
+        card["skills_list"] = skill_names[row["profile_id"]]
+        card["experience_companies"] = companies[row["profile_id"]]
+        card["job_skills"] = job_skills[row["id"]]
+        cards.append(card)
+    return cards
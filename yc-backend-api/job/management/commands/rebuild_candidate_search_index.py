@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from job import search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the candidate search document of every job profile"
+
+    def handle(self, *args, **options):
+        rebuilt = search_index.rebuild_all()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt search documents for {rebuilt} job profiles.")
+        )
@@ -0,0 +1,217 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:54
+
+import re
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+import django.db.models.deletion
+
+# A frozen copy of the document helpers in job/search_index.py as of this
+# migration, so later changes there do not change what this migration builds
+WORD_RE = re.compile(r"[a-z0-9+#.]*[a-z0-9+#]")
+TOKEN_MAX_LENGTH = 100
+
+
+def normalize_skill(name):
+    return " ".join((name or "").lower().split())[:TOKEN_MAX_LENGTH]
+
+
+def words(text):
+    return {word[:TOKEN_MAX_LENGTH] for word in WORD_RE.findall((text or "").lower())}
+
+
+def document_fields(title, about, location, preferred_locations, skill_names):
+    skills = sorted({normalize_skill(name) for name in skill_names} - {""})
+    locations = [location or ""] + [
+        str(place) for place in preferred_locations or [] if place
+    ]
+    return {
+        "skills_text": "\n".join(skills),
+        "keywords_text": "\n".join(part for part in [title, about] if part),
+        "locations_text": "\n".join(part for part in locations if part),
+    }
+
+
+def document_tokens(fields):
+    skill_tokens = {
+        ("skill", skill) for skill in fields["skills_text"].split("\n") if skill
+    }
+    keyword_tokens = {("keyword", word) for word in words(fields["keywords_text"])}
+    return sorted(skill_tokens | keyword_tokens)
+
+
+def search_vector():
+    return SearchVector("skills_text", weight="A", config="simple") + SearchVector(
+        "keywords_text", weight="B", config="english"
+    )
+
+
+# icontains compares UPPER(column::text), so the trigram indexes are on that
+POSTGRES_INDEXES = [
+    (
+        "candidate_search_vector_idx",
+        "USING gin (search_vector)",
+    ),
+    (
+        "candidate_search_skills_trgm_idx",
+        "USING gin (UPPER(skills_text::text) gin_trgm_ops)",
+    ),
+    (
+        "candidate_search_keywords_trgm_idx",
+        "USING gin (UPPER(keywords_text::text) gin_trgm_ops)",
+    ),
+    (
+        "candidate_search_locations_trgm_idx",
+        "USING gin (UPPER(locations_text::text) gin_trgm_ops)",
+    ),
+]
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in POSTGRES_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON candidate_search_document {definition}"
+        )
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def build_documents(apps, schema_editor):
+    JobProfile = apps.get_model("job", "JobProfile")
+    JobSkill = apps.get_model("job", "JobSkill")
+    Skill = apps.get_model("job", "Skill")
+    CandidateSearchDocument = apps.get_model("job", "CandidateSearchDocument")
+    CandidateSearchToken = apps.get_model("job", "CandidateSearchToken")
+
+    skill_names = {}
+    for job_profile_id, name in JobSkill.objects.values_list(
+        "job_profile_id", "skill_name"
+    ):
+        skill_names.setdefault(job_profile_id, []).append(name)
+    profile_skill_names = {}
+    for profile_id, name in Skill.objects.values_list("profile_id", "name"):
+        profile_skill_names.setdefault(profile_id, []).append(name)
+
+    documents = []
+    tokens = []
+    for (
+        job_profile_id,
+        profile_id,
+        title,
+        about,
+        location,
+        preferred_locations,
+    ) in JobProfile.objects.values_list(
+        "id",
+        "profile_id",
+        "profile__title",
+        "profile__about",
+        "profile__location",
+        "preferred_locations",
+    ).iterator():
+        fields = document_fields(
+            title,
+            about,
+            location,
+            preferred_locations,
+            skill_names.get(job_profile_id, [])
+            + profile_skill_names.get(profile_id, []),
+        )
+        documents.append(
+            CandidateSearchDocument(job_profile_id=job_profile_id, **fields)
+        )
+        tokens.extend(
+            CandidateSearchToken(document_id=job_profile_id, field=field, token=token)
+            for field, token in document_tokens(fields)
+        )
+    CandidateSearchDocument.objects.bulk_create(documents, batch_size=500)
+    CandidateSearchToken.objects.bulk_create(tokens, batch_size=1000)
+    if schema_editor.connection.vendor == "postgresql":
+        CandidateSearchDocument.objects.update(search_vector=search_vector())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("job", "0002_jobprofile_alter_job_status_sociallinks_skill_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidateSearchDocument",
+            fields=[
+                (
+                    "job_profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="job.jobprofile",
+                    ),
+                ),
+                ("skills_text", models.TextField(blank=True, default="")),
+                ("keywords_text", models.TextField(blank=True, default="")),
+                ("locations_text", models.TextField(blank=True, default="")),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "candidate_search_document",
+            },
+        ),
+        migrations.CreateModel(
+            name="CandidateSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[("skill", "Skill"), ("keyword", "Keyword")],
+                        max_length=10,
+                    ),
+                ),
+                ("token", models.CharField(max_length=100)),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to="job.candidatesearchdocument",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "candidate_search_token",
+                "indexes": [
+                    models.Index(
+                        fields=["field", "token"], name="candidate_s_field_f81250_idx"
+                    )
+                ],
+                "unique_together": {("document", "field", "token")},
+            },
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
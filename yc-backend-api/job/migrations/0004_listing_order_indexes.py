@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("job", "0003_candidate_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="job_job_created_18db1a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobprofile",
+            index=models.Index(
+                fields=["-last_active", "-id"], name="job_profile_last_ac_97ffff_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("job", "0004_listing_order_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(
+                fields=["job", "is_applied", "-applied_at"],
+                name="job_jobappl_job_id_198cb5_idx",
+            ),
+        ),
+    ]
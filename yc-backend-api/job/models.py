@@ -1,4 +1,5 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth import get_user_model
 from core.models import BaseModel, BaseTimestampedModel
@@ -90,6 +91,8 @@ class Job(BaseModel):
 
     class Meta:
         ordering = ["-created_at"]
+        # Keyset pagination order of the job listings (job/pagination.py)
+        indexes = [models.Index(fields=["-created_at", "-id"])]
 
 
 class JobApplication(BaseTimestampedModel):
@@ -142,6 +145,8 @@ class JobApplication(BaseTimestampedModel):
     class Meta:
         ordering = ["-applied_at"]
         unique_together = ["job", "applicant"]
+        # Application counts and the most recent applications of each job
+        indexes = [models.Index(fields=["job", "is_applied", "-applied_at"])]
 
     def __str__(self):
         return f"{self.applicant.username} applied for {self.job.title} at {self.job.company.name}"
@@ -335,6 +340,8 @@ class JobProfile(models.Model):
 
     class Meta:
         db_table = "job_profile"
+        # Keyset pagination order of the candidate listings (job/pagination.py)
+        indexes = [models.Index(fields=["-last_active", "-id"])]
 
     def __str__(self):
         return f"Job Profile - {self.profile.user.email}"
@@ -377,6 +384,55 @@ class JobSkill(models.Model):
         return f"{self.skill_name} - {self.proficiency}"
 
 
+class CandidateSearchDocument(models.Model):
+    """Denormalized search text of a JobProfile, kept current by job/search_index.py"""
+
+    job_profile = models.OneToOneField(
+        JobProfile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    skills_text = models.TextField(blank=True, default="")
+    keywords_text = models.TextField(blank=True, default="")
+    locations_text = models.TextField(blank=True, default="")
+    # Only filled on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "candidate_search_document"
+
+    def __str__(self):
+        return f"Search document - {self.job_profile_id}"
+
+
+class CandidateSearchToken(models.Model):
+    """Inverted index entry: one normalized term of a search document"""
+
+    FIELD_SKILL = "skill"
+    FIELD_KEYWORD = "keyword"
+
+    FIELD_CHOICES = [
+        (FIELD_SKILL, "Skill"),
+        (FIELD_KEYWORD, "Keyword"),
+    ]
+
+    document = models.ForeignKey(
+        CandidateSearchDocument, on_delete=models.CASCADE, related_name="tokens"
+    )
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = "candidate_search_token"
+        unique_together = ("document", "field", "token")
+        indexes = [models.Index(fields=["field", "token"])]
+
+    def __str__(self):
+        return f"{self.field}:{self.token}"
+
+
 class CandidateSearchLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     recruiter = models.ForeignKey(
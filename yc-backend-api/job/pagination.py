@@ -0,0 +1,149 @@
+"""
+Pagination for job and candidate listings.
+
+Pages are cut with keyset cursors over a stable ordering that ends with the
+primary key: the cursor holds the ordering values of the last row served, and
+the next page is the rows after it, so deep pages cost the same as the first
+one instead of growing with an OFFSET. Page sizes are capped at
+JOB_LIST_MAX_PAGE_SIZE, and counts are only computed when asked for:
+
+- JobCursorPagination and CandidateCursorPagination are DRF paginations for
+  the list endpoints, answering {"next", "previous", "results"}, plus an exact
+  "count" with ``?count=true``;
+- keyset_page() pages CandidateSearchViewSet.search, whose ordering (by
+  relevance) comes from job/search_index.py;
+- cached_count() reuses a search's count for CANDIDATE_SEARCH_COUNT_TIMEOUT.
+"""
+import base64
+import hashlib
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+COUNT_KEY_PREFIX = "candidate_search_count"
+TRUE_VALUES = {"1", "true", "yes"}
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+
+    def get_page_size(self, request):
+        self.page_size = settings.JOB_LIST_PAGE_SIZE
+        self.max_page_size = settings.JOB_LIST_MAX_PAGE_SIZE
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if str(request.query_params.get(self.count_query_param)).lower() in TRUE_VALUES:
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data["count"] = self.count
+        return response
+
+
+class JobCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CandidateCursorPagination(KeysetPagination):
+    ordering = ("-last_active", "-id")
+
+
+def page_size(requested):
+    """``requested`` within 1..JOB_LIST_MAX_PAGE_SIZE"""
+    return max(1, min(settings.JOB_LIST_MAX_PAGE_SIZE, requested))
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_plain(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError):
+        raise NotFound(CursorPagination.invalid_cursor_message)
+    if not isinstance(values, list) or len(values) != length:
+        raise NotFound(CursorPagination.invalid_cursor_message)
+    return values
+
+
+def _after(ordering, values):
+    """Rows that come after ``values`` in ``ordering``"""
+    after = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            condition &= Q(**{previous.lstrip("-"): value})
+        after |= condition
+    return after
+
+
+def keyset_page(queryset, size, cursor=None, offset=0):
+    """
+    One page of an ordered queryset: (rows, next cursor or None).
+
+    The queryset's ordering must be unique (end with the primary key). With a
+    ``cursor`` the page starts after the row it points at, otherwise at
+    ``offset``.
+    """
+    ordering = [str(field) for field in queryset.query.order_by]
+    fields = [field.lstrip("-") for field in ordering]
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, len(fields))))
+        offset = 0
+    try:
+        rows = list(queryset[offset : offset + size + 1])
+    except (ValidationError, ValueError):
+        raise NotFound(CursorPagination.invalid_cursor_message)
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [
+                last[field] if isinstance(last, dict) else getattr(last, field)
+                for field in fields
+            ]
+        )
+    return rows, next_cursor
+
+
+def cached_count(queryset, filters, exact=False):
+    """The number of rows of a search, reused for the same ``filters``"""
+    digest = hashlib.sha256(
+        json.dumps(filters, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    key = f"{COUNT_KEY_PREFIX}_{digest}"
+    if not exact:
+        count = cache.get(key)
+        if count is not None:
+            return count
+    count = queryset.count()
+    cache.set(key, count, settings.CANDIDATE_SEARCH_COUNT_TIMEOUT)
+    return count
@@ -0,0 +1,261 @@
+"""
+Candidate search index.
+
+CandidateSearchViewSet.search used to match skills, keywords and locations
+with ``icontains`` across JobSkill, Skill, Profile and the
+``preferred_locations`` JSON, which needs joins, ``.distinct()`` and a scan of
+every profile. Each JobProfile now has a CandidateSearchDocument holding that
+text in three columns, so the text filters are single-table conditions on a
+one-to-one join:
+
+- ``skills_text``: job skills and profile skills, one per line;
+- ``keywords_text``: the profile title and about;
+- ``locations_text``: the profile location and preferred locations.
+
+On PostgreSQL the document also has a ``search_vector`` for ranked full-text
+keyword search, and migration 0003 adds a GIN index on it and pg_trgm indexes
+on the three text columns for the ``icontains`` filters. Elsewhere (SQLite
+test runs) keywords are matched and ranked with CandidateSearchToken, an
+inverted index of the words of each document. Skill tokens (normalized skill
+names) are stored on every database and rank exact skill matches above
+substring ones.
+
+job/signals.py refreshes the document whenever a JobProfile, JobSkill, Skill
+or Profile changes (for a Profile, unless the save only writes fields outside
+PROFILE_FIELDS); ``manage.py rebuild_candidate_search_index`` rebuilds all of
+them.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import (
+    CandidateSearchDocument,
+    CandidateSearchToken,
+    JobProfile,
+    JobSkill,
+    Skill,
+)
+
+# Keeps terms like c++, c#, node.js and .net whole
+WORD_RE = re.compile(r"[a-z0-9+#.]*[a-z0-9+#]")
+TOKEN_MAX_LENGTH = 100
+SKILL_WEIGHT = 1.0
+KEYWORD_CONFIG = "english"
+REBUILD_BATCH_SIZE = 500
+# Profile fields copied into the search document
+PROFILE_FIELDS = {"title", "about", "location"}
+
+
+def uses_search_vector():
+    return connection.vendor == "postgresql"
+
+
+def normalize_skill(name):
+    return " ".join((name or "").lower().split())[:TOKEN_MAX_LENGTH]
+
+
+def words(text):
+    return {word[:TOKEN_MAX_LENGTH] for word in WORD_RE.findall((text or "").lower())}
+
+
+def document_fields(title, about, location, preferred_locations, skill_names):
+    """The text columns of a search document"""
+    skills = sorted({normalize_skill(name) for name in skill_names} - {""})
+    locations = [location or ""] + [
+        str(place) for place in preferred_locations or [] if place
+    ]
+    return {
+        "skills_text": "\n".join(skills),
+        "keywords_text": "\n".join(part for part in [title, about] if part),
+        "locations_text": "\n".join(part for part in locations if part),
+    }
+
+
+def document_tokens(fields):
+    """(field, token) pairs of the inverted index for a document"""
+    skill_tokens = {
+        (CandidateSearchToken.FIELD_SKILL, skill)
+        for skill in fields["skills_text"].split("\n")
+        if skill
+    }
+    keyword_tokens = {
+        (CandidateSearchToken.FIELD_KEYWORD, word)
+        for word in words(fields["keywords_text"])
+    }
+    return sorted(skill_tokens | keyword_tokens)
+
+
+def search_vector():
+    """Expression computing ``search_vector`` from a document's text columns"""
+    return SearchVector("skills_text", weight="A", config="simple") + SearchVector(
+        "keywords_text", weight="B", config=KEYWORD_CONFIG
+    )
+
+
+def _skill_names(job_profiles):
+    """{job profile id: [skill name, ...]} from JobSkill and Skill, two queries"""
+    names = {job_profile_id: [] for job_profile_id, _ in job_profiles}
+    by_profile = {
+        profile_id: job_profile_id for job_profile_id, profile_id in job_profiles
+    }
+    for job_profile_id, name in JobSkill.objects.filter(
+        job_profile_id__in=names
+    ).values_list("job_profile_id", "skill_name"):
+        names[job_profile_id].append(name)
+    for profile_id, name in Skill.objects.filter(profile_id__in=by_profile).values_list(
+        "profile_id", "name"
+    ):
+        names[by_profile[profile_id]].append(name)
+    return names
+
+
+def refresh_many(job_profile_ids):
+    """Rebuild the search documents of the given job profiles"""
+    rows = list(
+        JobProfile.objects.filter(id__in=list(job_profile_ids)).values_list(
+            "id",
+            "profile_id",
+            "profile__title",
+            "profile__about",
+            "profile__location",
+            "preferred_locations",
+        )
+    )
+    if not rows:
+        return
+    skill_names = _skill_names([(row[0], row[1]) for row in rows])
+
+    documents = []
+    tokens = []
+    for job_profile_id, _, title, about, location, preferred_locations in rows:
+        fields = document_fields(
+            title, about, location, preferred_locations, skill_names[job_profile_id]
+        )
+        documents.append(
+            CandidateSearchDocument(job_profile_id=job_profile_id, **fields)
+        )
+        tokens.extend(
+            CandidateSearchToken(document_id=job_profile_id, field=field, token=token)
+            for field, token in document_tokens(fields)
+        )
+
+    ids = [document.job_profile_id for document in documents]
+    with transaction.atomic():
+        CandidateSearchDocument.objects.filter(job_profile_id__in=ids).delete()
+        CandidateSearchDocument.objects.bulk_create(documents)
+        CandidateSearchToken.objects.bulk_create(tokens)
+        if uses_search_vector():
+            CandidateSearchDocument.objects.filter(job_profile_id__in=ids).update(
+                search_vector=search_vector()
+            )
+
+
+def refresh(job_profile_id):
+    """Rebuild one job profile's search document"""
+    refresh_many([job_profile_id])
+
+
+def refresh_for_profile(profile_id):
+    """Rebuild the search document of the job profile of a Profile, if any"""
+    job_profile_id = (
+        JobProfile.objects.filter(profile_id=profile_id)
+        .values_list("id", flat=True)
+        .first()
+    )
+    if job_profile_id is not None:
+        refresh(job_profile_id)
+
+
+def rebuild_all(batch_size=REBUILD_BATCH_SIZE):
+    """Rebuild every search document; returns the number of job profiles"""
+    ids = list(JobProfile.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), batch_size):
+        refresh_many(ids[start : start + batch_size])
+    return len(ids)
+
+
+def _token_matches(field, tokens):
+    """Number of ``tokens`` in a job profile's document, as a subquery"""
+    matches = (
+        CandidateSearchToken.objects.filter(
+            document_id=OuterRef("pk"), field=field, token__in=list(tokens)
+        )
+        .order_by()
+        .values("document_id")
+        .annotate(matches=Count("id"))
+        .values("matches")
+    )
+    return Coalesce(Subquery(matches, output_field=FloatField()), Value(0.0))
+
+
+def search(queryset, skills=None, keywords=None, location=None):
+    """
+    Narrow a JobProfile queryset to the candidates matching the text filters.
+
+    A candidate matches if one of ``skills`` is part of one of their skills,
+    their title or about contains ``keywords`` or all of its words (stemmed on
+    PostgreSQL), and their location or a preferred location contains
+    ``location``. With skills or keywords the result is ordered by relevance
+    (annotated as ``relevance``), otherwise by most recently active.
+    """
+    scores = []
+
+    if skills:
+        skills_q = Q()
+        for skill in skills:
+            skills_q |= Q(search_document__skills_text__icontains=skill)
+        queryset = queryset.filter(skills_q)
+        skill_tokens = {normalize_skill(skill) for skill in skills}
+        scores.append(
+            _token_matches(CandidateSearchToken.FIELD_SKILL, skill_tokens)
+            * SKILL_WEIGHT
+        )
+
+    if keywords:
+        keywords_q = Q(search_document__keywords_text__icontains=keywords)
+        if uses_search_vector():
+            query = SearchQuery(
+                keywords, config=KEYWORD_CONFIG, search_type="websearch"
+            )
+            queryset = queryset.filter(
+                keywords_q | Q(search_document__search_vector=query)
+            )
+            scores.append(SearchRank(F("search_document__search_vector"), query))
+        else:
+            keyword_words = words(keywords)
+            if keyword_words:
+                matched = _token_matches(
+                    CandidateSearchToken.FIELD_KEYWORD, keyword_words
+                )
+                queryset = queryset.alias(keyword_matches=matched).filter(
+                    keywords_q | Q(keyword_matches__gte=len(keyword_words))
+                )
+                scores.append(matched / len(keyword_words))
+            else:
+                queryset = queryset.filter(keywords_q)
+
+    if location:
+        queryset = queryset.filter(search_document__locations_text__icontains=location)
+
+    if not scores:
+        return queryset.order_by("-last_active", "-id")
+    relevance = scores[0]
+    for score in scores[1:]:
+        relevance = relevance + score
+    # Double precision, so a cursor's decoded relevance equals the row's: on
+    # PostgreSQL ts_rank is a real, which JSON round-trips as a different value
+    return queryset.annotate(relevance=Cast(relevance, FloatField())).order_by(
+        "-relevance", "-last_active", "-id"
+    )
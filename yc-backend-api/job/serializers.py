@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.core.cache import cache
+from core import cache as shared_cache
 from .models import (
     Job,
     Company,
@@ -24,6 +24,10 @@ User = get_user_model()
 
 logger = logging.getLogger(__name__)
 
+# Shared cache namespace of per-job application counts (see job/signals.py)
+APPLICATIONS_CACHE_NAMESPACE = "job_applications"
+RECENT_APPLICATIONS_LIMIT = 5
+
 
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
@@ -191,8 +195,9 @@ class JobApplicationSerializer(serializers.ModelSerializer):
                     existing_app.status = "under_review"
                 existing_app.save()
 
-                cache_key = f"job_applications_count_{validated_data['job_id']}"
-                cache.delete(cache_key)
+                shared_cache.invalidate(
+                    APPLICATIONS_CACHE_NAMESPACE, entity=validated_data["job_id"]
+                )
 
                 logger.info(
                     f"Updated existing record to application with ID: {existing_app.id}, status: {existing_app.status}"
@@ -213,8 +218,9 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         try:
             application = JobApplication.objects.create(**validated_data)
 
-            cache_key = f"job_applications_count_{validated_data['job_id']}"
-            cache.delete(cache_key)
+            shared_cache.invalidate(
+                APPLICATIONS_CACHE_NAMESPACE, entity=validated_data["job_id"]
+            )
 
             logger.info(
                 f"Job application created successfully with ID: {application.id}, status: {application.status}"
@@ -269,19 +275,23 @@ class JobWithApplicationsSerializer(JobSerializer):
         ]
 
     def get_applications_count(self, obj):
-        cache_key = f"job_applications_count_{obj.id}"
-        count = cache.get(cache_key)
-
-        if count is None:
-            count = obj.applications.filter(is_applied=True).count()
-            cache.set(cache_key, count, timeout=300)  # Cache for 5 minutes
-
-        return count
+        if hasattr(obj, "applied_count"):
+            # Annotated by JobViewSet.with_applications
+            return obj.applied_count
+        return shared_cache.get_or_set(
+            APPLICATIONS_CACHE_NAMESPACE,
+            lambda: obj.applications.filter(is_applied=True).count(),
+            "count",
+            entity=obj.id,
+            timeout=300,  # Cache for 5 minutes
+        )
 
     def get_recent_applications(self, obj):
-        recent_apps = obj.applications.filter(is_applied=True).order_by("-applied_at")[
-            :5
-        ]
+        recent_apps = getattr(obj, "recent_applications_list", None)
+        if recent_apps is None:
+            recent_apps = obj.applications.filter(is_applied=True).order_by(
+                "-applied_at"
+            )[:RECENT_APPLICATIONS_LIMIT]
         return JobApplicationListSerializer(recent_apps, many=True).data
 
 
@@ -377,6 +387,40 @@ class JobProfileSerializer(serializers.ModelSerializer):
         return profile_data
 
 
+class CandidateCardSerializer(serializers.Serializer):
+    """A candidate in search results and listings, from job/candidate_cards.py"""
+
+    id = serializers.UUIDField()
+    full_name = serializers.CharField()
+    title = serializers.CharField()
+    location = serializers.CharField()
+    about = serializers.CharField()
+    user = serializers.DictField()
+    profile = serializers.DictField()
+    current_ctc = serializers.DecimalField(max_digits=10, decimal_places=2)
+    expected_ctc = serializers.DecimalField(max_digits=10, decimal_places=2)
+    currency = serializers.CharField()
+    total_experience_years = serializers.IntegerField()
+    total_experience_months = serializers.IntegerField()
+    total_experience_in_years = serializers.FloatField()
+    notice_period = serializers.CharField()
+    available_from = serializers.DateField()
+    preferred_employment_types = serializers.JSONField()
+    preferred_locations = serializers.JSONField()
+    open_to_remote = serializers.BooleanField()
+    highest_education = serializers.CharField()
+    domain = serializers.CharField()
+    preferred_company_types = serializers.JSONField()
+    is_actively_looking = serializers.BooleanField()
+    last_active = serializers.DateTimeField()
+    resume_file = serializers.URLField()
+    skills_list = serializers.ListField(child=serializers.CharField())
+    experience_companies = serializers.ListField(child=serializers.CharField())
+    job_skills = JobSkillSerializer(many=True)
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+
 class CandidateSearchSerializer(serializers.Serializer):
     skills = serializers.CharField(required=False, allow_blank=True)
     keywords = serializers.CharField(required=False, allow_blank=True)
@@ -417,6 +461,10 @@ class CandidateSearchSerializer(serializers.Serializer):
     page_size = serializers.IntegerField(
         required=False, min_value=1, max_value=100, default=20
     )
+    # next_cursor of the previous page; takes the place of ``page``
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    # Count the results now instead of reusing a recent count
+    exact_count = serializers.BooleanField(required=False, default=False)
 
     def to_internal_value(self, data):
         numeric_fields = [
@@ -435,13 +483,14 @@ class CandidateSearchSerializer(serializers.Serializer):
 
 
 class CandidateSearchResultSerializer(serializers.Serializer):
-    candidates = JobProfileSerializer(many=True)
+    candidates = CandidateCardSerializer(many=True)
     total_count = serializers.IntegerField()
     page = serializers.IntegerField()
     page_size = serializers.IntegerField()
     total_pages = serializers.IntegerField()
     has_next = serializers.BooleanField()
     has_previous = serializers.BooleanField()
+    next_cursor = serializers.CharField(allow_null=True)
 
 
 class FilterOptionsSerializer(serializers.Serializer):
@@ -1,29 +1,50 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
-from .models import JobApplication
+from authentication.models import Profile
+from core import cache as shared_cache
+from . import search_index
+from .models import JobApplication, JobProfile, JobSkill, Skill
+from .serializers import APPLICATIONS_CACHE_NAMESPACE
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=JobApplication)
-def invalidate_job_application_cache_on_save(sender, instance, **kwargs):
-    """Invalidate cache when a job application is saved"""
+@receiver(post_delete, sender=JobApplication)
+def invalidate_job_application_cache(sender, instance, **kwargs):
+    """Invalidate the cached application counts of the job on every worker"""
     if instance.job_id:
-        cache_key = f"job_applications_count_{instance.job_id}"
-        cache.delete(cache_key)
+        shared_cache.invalidate(APPLICATIONS_CACHE_NAMESPACE, entity=instance.job_id)
         logger.info(
-            f"Invalidated cache for job {instance.job_id} after application save"
+            f"Invalidated cache for job {instance.job_id} after application change"
         )
 
 
-@receiver(post_delete, sender=JobApplication)
-def invalidate_job_application_cache_on_delete(sender, instance, **kwargs):
-    """Invalidate cache when a job application is deleted"""
-    if instance.job_id:
-        cache_key = f"job_applications_count_{instance.job_id}"
-        cache.delete(cache_key)
-        logger.info(
-            f"Invalidated cache for job {instance.job_id} after application delete"
-        )
+@receiver(post_save, sender=JobProfile)
+def refresh_search_document_on_job_profile_save(sender, instance, **kwargs):
+    """Keep the candidate search document in step with the job profile"""
+    search_index.refresh(instance.pk)
+
+
+@receiver(post_save, sender=JobSkill)
+@receiver(post_delete, sender=JobSkill)
+def refresh_search_document_on_job_skill_change(sender, instance, **kwargs):
+    """Job skills are part of the candidate search document"""
+    search_index.refresh(instance.job_profile_id)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def refresh_search_document_on_skill_change(sender, instance, **kwargs):
+    """Profile skills are part of the candidate search document"""
+    search_index.refresh_for_profile(instance.profile_id)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_search_document_on_profile_save(
+    sender, instance, update_fields=None, **kwargs
+):
+    """Title, about and location are part of the candidate search document"""
+    if update_fields is None or search_index.PROFILE_FIELDS & set(update_fields):
+        search_index.refresh_for_profile(instance.pk)
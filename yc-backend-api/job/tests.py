@@ -1,3 +1,457 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from . import search_index
+from .models import (
+    CandidateSearchDocument,
+    CandidateSearchToken,
+    Certification,
+    Company,
+    Education,
+    Experience,
+    Job,
+    JobApplication,
+    JobProfile,
+    JobSkill,
+    Project,
+    Skill,
+    SocialLinks,
+)
+
+User = get_user_model()
+
+SEARCH_URL = "/api/jobs/candidates/job-profiles/search/"
+
+# count, page rows, job skills, skills, experience companies, search log
+SEARCH_QUERIES = 6
+
+WITH_APPLICATIONS_URL = "/api/jobs/with-applications/"
+
+
+class CandidateSearchQueryCountTest(APITestCase):
+    """
+    Test the number of queries of candidate search pages.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create_user(
+            email="recruiter@test.com",
+            username="recruiter",
+            password="testpass123",
+            role="recruiter",
+        )
+        self.client.force_authenticate(self.recruiter)
+
+    def add_candidate(self, index):
+        user = User.objects.create_user(
+            email=f"candidate{index}@test.com",
+            username=f"candidate{index}",
+            password="testpass123",
+        )
+        profile = user.profile
+        profile.title = "Backend Developer"
+        profile.save()
+        job_profile = JobProfile.objects.create(profile=profile)
+        JobSkill.objects.create(
+            job_profile=job_profile, skill_name="Python", proficiency="expert"
+        )
+        Skill.objects.create(profile=profile, name="Django", level="Advanced")
+        Experience.objects.create(
+            profile=profile, company="Acme", role="Developer", duration="2 years"
+        )
+        Project.objects.create(
+            profile=profile, title="API", description="REST API", role="Lead"
+        )
+        Education.objects.create(
+            profile=profile,
+            institution="University",
+            degree="B.Tech",
+            field="CS",
+            duration="4 years",
+        )
+        Certification.objects.create(
+            profile=profile, name="AWS", issuer="Amazon", completion_date="2024"
+        )
+        SocialLinks.objects.create(profile=profile, github="https://github.com/x")
+        return job_profile
+
+    def search(self, **filters):
+        response = self.client.post(
+            SEARCH_URL, {"page_size": 20, **filters}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_queries_do_not_grow_with_page_size(self):
+        """Test a page of candidates costs the same queries for 2 or 12 rows."""
+        for index in range(2):
+            self.add_candidate(index)
+        with self.assertNumQueries(SEARCH_QUERIES):
+            data = self.search(skills="python")
+        self.assertEqual(len(data["candidates"]), 2)
+
+        for index in range(2, 12):
+            self.add_candidate(index)
+        with self.assertNumQueries(SEARCH_QUERIES):
+            data = self.search(skills="python", exact_count=True)
+        self.assertEqual(len(data["candidates"]), 12)
+
+    def test_cards_carry_the_listing_fields(self):
+        """Test search results are cards and retrieve returns the full profile."""
+        job_profile = self.add_candidate(0)
+        card = self.search(keywords="backend")["candidates"][0]
+        self.assertEqual(card["id"], str(job_profile.id))
+        self.assertEqual(card["title"], "Backend Developer")
+        self.assertEqual(card["skills_list"], ["Django"])
+        self.assertEqual(card["experience_companies"], ["Acme"])
+        self.assertEqual(card["job_skills"][0]["skill_name"], "Python")
+        self.assertNotIn("projects", card["profile"])
+
+        response = self.client.get(
+            f"/api/jobs/candidates/job-profiles/{job_profile.id}/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["profile"]["projects"]), 1)
+        self.assertEqual(
+            response.data["profile"]["links"]["github"], "https://github.com/x"
+        )
+
+
+class JobsWithApplicationsQueryCountTest(APITestCase):
+    """
+    Test the recruiter dashboard's jobs with applications.
+    """
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user(
+            email="recruiter@test.com",
+            username="recruiter",
+            password="testpass123",
+            role="recruiter",
+        )
+        self.company = Company.objects.create(name="Acme", created_by=self.recruiter)
+        self.applicants = [
+            User.objects.create_user(
+                email=f"applicant{index}@test.com",
+                username=f"applicant{index}",
+                password="testpass123",
+            )
+            for index in range(7)
+        ]
+        self.client.force_authenticate(self.recruiter)
+
+    def add_job(self, applications):
+        job = Job.objects.create(
+            company=self.company,
+            title="Backend Developer",
+            description="Build APIs",
+            employment_type="full-time",
+            experience_min_years=0,
+            created_by=self.recruiter,
+        )
+        for applicant in self.applicants[:applications]:
+            JobApplication.objects.create(
+                job=job, applicant=applicant, is_applied=True, applied_at=timezone.now()
+            )
+        # A bookmark is not an application
+        JobApplication.objects.create(job=job, applicant=self.recruiter)
+        return job
+
+    def test_fixed_number_of_queries(self):
+        """Test counts and recent applications take two queries for any jobs."""
+        self.add_job(applications=7)
+        with self.assertNumQueries(2):
+            response = self.client.get(WITH_APPLICATIONS_URL)
+        self.assertEqual(response.status_code, 200)
+        job = response.data[0]
+        self.assertEqual(job["applications_count"], 7)
+        self.assertEqual(len(job["recent_applications"]), 5)
+        self.assertEqual(
+            job["recent_applications"][0]["applicant_email"], "applicant6@test.com"
+        )
+
+        for applications in range(4):
+            self.add_job(applications=applications)
+        with self.assertNumQueries(2):
+            response = self.client.get(WITH_APPLICATIONS_URL)
+        self.assertEqual(
+            sorted(job["applications_count"] for job in response.data),
+            [0, 1, 2, 3, 7],
+        )
+
+
+class CandidateSearchIndexTest(APITestCase):
+    """
+    Test cases for the candidate search documents and their ranking.
+    """
+
+    def add_candidate(self, name, skills=(), title="", about="", location=""):
+        user = User.objects.create_user(
+            email=f"{name}@test.com", username=name, password="testpass123"
+        )
+        profile = user.profile
+        profile.title = title
+        profile.about = about
+        profile.location = location
+        profile.save()
+        job_profile = JobProfile.objects.create(profile=profile)
+        for skill in skills:
+            JobSkill.objects.create(
+                job_profile=job_profile, skill_name=skill, proficiency="expert"
+            )
+        return job_profile
+
+    def search(self, **filters):
+        return list(search_index.search(JobProfile.objects.all(), **filters))
+
+    def test_exact_skills_rank_first(self):
+        """Test an exact skill match outranks a skill that only contains it."""
+        partial = self.add_candidate("partial", skills=["MicroPython"])
+        exact = self.add_candidate("exact", skills=["Python"])
+        both = self.add_candidate("both", skills=["Python", "Django"])
+        self.add_candidate("other", skills=["Java"])
+
+        self.assertEqual(
+            self.search(skills=["python", "django"]), [both, exact, partial]
+        )
+        self.assertEqual(
+            self.search(skills=["python"], location="pune"),
+            [],
+        )
+
+    def test_keywords_match_all_words(self):
+        """Test keywords match the phrase or all of its words, in any order."""
+        phrase = self.add_candidate("phrase", title="Backend Developer")
+        words = self.add_candidate("words", about="A developer working on backend")
+        self.add_candidate("half", title="Frontend Developer")
+
+        self.assertEqual(
+            set(self.search(keywords="backend developer")), {phrase, words}
+        )
+
+    @skipIf(search_index.uses_search_vector(), "PostgreSQL ranks with search_vector")
+    def test_token_fallback(self):
+        """Test keyword tokens are indexed and ranked without full-text search."""
+        job_profile = self.add_candidate(
+            "tokens", skills=["C++", "Node.js"], title="C++ developer", about="Node.js"
+        )
+        self.assertEqual(
+            set(
+                CandidateSearchToken.objects.filter(
+                    document_id=job_profile.id
+                ).values_list("field", "token")
+            ),
+            {
+                ("skill", "c++"),
+                ("skill", "node.js"),
+                ("keyword", "c++"),
+                ("keyword", "developer"),
+                ("keyword", "node.js"),
+            },
+        )
+        result = self.search(keywords="node.js c++")
+        self.assertEqual(result, [job_profile])
+        self.assertEqual(result[0].relevance, 1.0)
+        self.assertEqual(self.search(keywords="node.js java"), [])
+
+    def test_profile_saves_refresh_the_document(self):
+        """Test profile saves rebuild the document unless they skip its fields."""
+        job_profile = self.add_candidate("saver", title="Backend Developer")
+        profile = job_profile.profile
+
+        with patch.object(search_index, "refresh_for_profile") as refresh:
+            profile.user.save(update_fields=["last_login"])
+            profile.save(update_fields=["full_name"])
+            refresh.assert_not_called()
+
+        profile.location = "Pune"
+        profile.save(update_fields=["location"])
+        document = CandidateSearchDocument.objects.get(job_profile=job_profile)
+        self.assertEqual(document.locations_text, "Pune")
+
+        profile.title = "Data Engineer"
+        profile.user.save()
+        document.refresh_from_db()
+        self.assertEqual(document.keywords_text, "Data Engineer")
+
+    def test_rebuild_command(self):
+        """Test the rebuild command recreates every search document."""
+        job_profiles = [
+            self.add_candidate(f"candidate{index}", skills=["Go"]) for index in range(3)
+        ]
+        CandidateSearchDocument.objects.all().delete()
+        self.assertEqual(self.search(skills=["go"]), [])
+
+        out = StringIO()
+        call_command("rebuild_candidate_search_index", stdout=out)
+        self.assertIn("Rebuilt search documents for 3 job profiles.", out.getvalue())
+        self.assertEqual(set(self.search(skills=["go"])), set(job_profiles))
+        self.assertEqual(CandidateSearchToken.objects.count(), 3)
+
+
+class ListingPaginationTest(APITestCase):
+    """
+    Test cases for the cursor pagination of job and candidate listings.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create_user(
+            email="recruiter@test.com",
+            username="recruiter",
+            password="testpass123",
+            role="recruiter",
+        )
+        self.company = Company.objects.create(name="Acme", created_by=self.recruiter)
+        self.client.force_authenticate(self.recruiter)
+
+    def add_job(self, index):
+        return Job.objects.create(
+            company=self.company,
+            title=f"Job {index}",
+            description="Build APIs",
+            employment_type="full-time",
+            experience_min_years=0,
+            created_by=self.recruiter,
+        )
+
+    def add_candidate(self, index, about="Backend developer"):
+        user = User.objects.create_user(
+            email=f"candidate{index}@test.com",
+            username=f"candidate{index}",
+            password="testpass123",
+        )
+        profile = user.profile
+        profile.about = about
+        profile.save()
+        job_profile = JobProfile.objects.create(profile=profile)
+        JobSkill.objects.create(
+            job_profile=job_profile, skill_name="Python", proficiency="expert"
+        )
+        return job_profile
+
+    def follow(self, url, params):
+        """Every page of a cursor listing, as lists of ids"""
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([row["id"] for row in response.data["results"]])
+            if not response.data["next"]:
+                return pages
+            response = self.client.get(response.data["next"])
+
+    def search_pages(self, **filters):
+        """Every page of a candidate search followed through next_cursor"""
+        pages = []
+        filters = {"page_size": 2, **filters}
+        while True:
+            response = self.client.post(SEARCH_URL, filters, format="json")
+            self.assertEqual(response.status_code, 200)
+            pages.append([card["id"] for card in response.data["candidates"]])
+            if not response.data["next_cursor"]:
+                return pages
+            self.assertTrue(response.data["has_next"])
+            filters["cursor"] = response.data["next_cursor"]
+
+    def test_job_list_cursor_pages(self):
+        """Test jobs are listed newest first, each once, across cursor pages."""
+        jobs = [self.add_job(index) for index in range(5)]
+        pages = self.follow("/api/jobs/", {"page_size": 2})
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            sum(pages, []),
+            [
+                str(job.id)
+                for job in sorted(
+                    jobs, key=lambda job: (job.created_at, job.id), reverse=True
+                )
+            ],
+        )
+
+        response = self.client.get("/api/jobs/", {"page_size": 2})
+        self.assertNotIn("count", response.data)
+        response = self.client.get("/api/jobs/", {"page_size": 2, "count": "true"})
+        self.assertEqual(response.data["count"], 5)
+
+    @override_settings(JOB_LIST_MAX_PAGE_SIZE=3)
+    def test_page_size_ceiling(self):
+        """Test a page never holds more than JOB_LIST_MAX_PAGE_SIZE rows."""
+        for index in range(5):
+            self.add_job(index)
+            self.add_candidate(index)
+
+        response = self.client.get("/api/jobs/", {"page_size": 100})
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.client.get(
+            "/api/jobs/candidates/job-profiles/", {"page_size": 100}
+        )
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.client.post(
+            SEARCH_URL, {"skills": "python", "page_size": 100}, format="json"
+        )
+        self.assertEqual(len(response.data["candidates"]), 3)
+        self.assertEqual(response.data["page_size"], 3)
+
+    def test_search_total_is_cached(self):
+        """Test a search reuses its total until exact_count asks for a new one."""
+        for index in range(3):
+            self.add_candidate(index)
+        filters = {"skills": "python", "page_size": 2}
+        response = self.client.post(SEARCH_URL, filters, format="json")
+        self.assertEqual(response.data["total_count"], 3)
+
+        self.add_candidate(3)
+        # Paging the same search keeps the total it started with
+        response = self.client.post(SEARCH_URL, {**filters, "page": 2}, format="json")
+        self.assertEqual(response.data["total_count"], 3)
+        response = self.client.post(
+            SEARCH_URL, {**filters, "exact_count": True}, format="json"
+        )
+        self.assertEqual(response.data["total_count"], 4)
+
+        response = self.client.post(
+            SEARCH_URL, {**filters, "keywords": "backend"}, format="json"
+        )
+        self.assertEqual(response.data["total_count"], 4)
+
+    def test_search_cursor_pages_through_ties(self):
+        """Test candidates with the same relevance are each served once."""
+        job_profiles = [self.add_candidate(index) for index in range(5)]
+        pages = self.search_pages(skills="python")
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            sorted(sum(pages, [])),
+            sorted(str(job_profile.id) for job_profile in job_profiles),
+        )
+
+        response = self.client.post(
+            SEARCH_URL, {"skills": "python", "cursor": "garbage"}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @skipUnless(connection.vendor == "postgresql", "ts_rank is PostgreSQL only")
+    def test_search_cursor_pages_through_tied_ranks(self):
+        """Test tied full-text ranks page without skipping or repeating rows."""
+        job_profiles = [
+            self.add_candidate(index, about="Senior backend developer, Django APIs")
+            for index in range(5)
+        ]
+        self.add_candidate(5, about="Frontend engineer")
+
+        pages = self.search_pages(keywords="backend developer")
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            sorted(sum(pages, [])),
+            sorted(str(job_profile.id) for job_profile in job_profiles),
+        )
@@ -1,10 +1,9 @@
 from rest_framework import viewsets, status, permissions, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Count, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from datetime import timedelta
 from .models import (
     Job,
@@ -21,13 +20,16 @@ from .models import (
     CandidateSearchLog,
 )
 from authentication.models import Profile
+from . import candidate_cards, pagination, search_index
 from .serializers import (
     JobSerializer,
     CompanySerializer,
     JobApplicationSerializer,
     JobApplicationListSerializer,
     JobWithApplicationsSerializer,
+    RECENT_APPLICATIONS_LIMIT,
     JobProfileSerializer,
+    CandidateCardSerializer,
     CandidateSearchSerializer,
     CandidateSearchResultSerializer,
     FilterOptionsSerializer,
@@ -84,6 +86,7 @@ class CompanyViewSet(viewsets.ModelViewSet):
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
+    pagination_class = pagination.JobCursorPagination
 
     def get_queryset(self):
         queryset = Job.objects.all()
@@ -111,7 +114,7 @@ class JobViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         logger.info("Fetching jobs list")
         response = super().list(request, *args, **kwargs)
-        logger.info(f"Returning {len(response.data)} jobs")
+        logger.info(f"Returning {len(response.data['results'])} jobs")
         return response
 
     def update(self, request, *args, **kwargs):
@@ -231,8 +234,9 @@ class JobViewSet(viewsets.ModelViewSet):
         if filters.get("experience_level"):
             queryset = queryset.filter(experience_level=filters["experience_level"])
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=["post"])
     def apply(self, request, pk=None):
@@ -311,7 +315,30 @@ class JobViewSet(viewsets.ModelViewSet):
                 {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        queryset = self.get_queryset()
+        # Two queries for any number of jobs: the jobs with their companies and
+        # application counts, then the latest applications of every job (a
+        # ROW_NUMBER() window per job, which Django uses for sliced prefetches)
+        recent_applications = (
+            JobApplication.objects.filter(is_applied=True)
+            .select_related("applicant")
+            .order_by("-applied_at")[:RECENT_APPLICATIONS_LIMIT]
+        )
+        queryset = (
+            self.get_queryset()
+            .select_related("company")
+            .annotate(
+                applied_count=Count(
+                    "applications", filter=Q(applications__is_applied=True)
+                )
+            )
+            .prefetch_related(
+                Prefetch(
+                    "applications",
+                    queryset=recent_applications,
+                    to_attr="recent_applications_list",
+                )
+            )
+        )
         serializer = JobWithApplicationsSerializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -684,33 +711,7 @@ class CandidateSearchViewSet(viewsets.ViewSet):
 
         filters = search_serializer.validated_data
 
-        queryset = (
-            JobProfile.objects.select_related("profile__user")
-            .prefetch_related("job_skills", "profile__skills", "profile__experiences")
-            .all()
-        )
-
-        if filters.get("skills"):
-            skills_query = filters["skills"].strip()
-            if skills_query:
-                skills_list = [
-                    skill.strip() for skill in skills_query.split(",") if skill.strip()
-                ]
-                if skills_list:
-                    skills_q = Q()
-                    for skill in skills_list:
-                        skills_q |= Q(job_skills__skill_name__icontains=skill) | Q(
-                            profile__skills__name__icontains=skill
-                        )
-                    queryset = queryset.filter(skills_q).distinct()
-
-        if filters.get("keywords"):
-            keywords = filters["keywords"].strip()
-            if keywords:
-                queryset = queryset.filter(
-                    Q(profile__about__icontains=keywords)
-                    | Q(profile__title__icontains=keywords)
-                ).distinct()
+        queryset = JobProfile.objects.all()
 
         if (
             filters.get("experience_from") is not None
@@ -725,14 +726,6 @@ class CandidateSearchViewSet(viewsets.ViewSet):
                 total_experience_years__lte=filters["experience_to"]
             )
 
-        if filters.get("location"):
-            location = filters["location"].strip()
-            if location:
-                queryset = queryset.filter(
-                    Q(profile__location__icontains=location)
-                    | Q(preferred_locations__icontains=location)
-                ).distinct()
-
         if filters.get("ctc_from") is not None and filters["ctc_from"] > 0:
             ctc_from_rupees = filters["ctc_from"] * 100000
             queryset = queryset.filter(
@@ -790,33 +783,41 @@ class CandidateSearchViewSet(viewsets.ViewSet):
             cutoff_date = timezone.now() - timedelta(days=days)
             queryset = queryset.filter(last_active__gte=cutoff_date)
 
-        total_count = queryset.count()
-
-        page = max(1, filters.get("page", 1))
-        page_size = max(1, min(100, filters.get("page_size", 20)))
-
-        paginator = Paginator(queryset, page_size)
-        total_pages = paginator.num_pages
+        skills = [
+            skill.strip()
+            for skill in (filters.get("skills") or "").split(",")
+            if skill.strip()
+        ]
+        queryset = search_index.search(
+            queryset,
+            skills=skills,
+            keywords=(filters.get("keywords") or "").strip(),
+            location=(filters.get("location") or "").strip(),
+        )
 
-        try:
-            candidates_page = paginator.page(page)
-        except (EmptyPage, PageNotAnInteger):
-            if page > total_pages and total_pages > 0:
-                candidates_page = paginator.page(total_pages)
-                page = total_pages
-            else:
-                candidates_page = paginator.page(1) if total_pages > 0 else None
-                page = 1
-        except Exception:
-            candidates_page = paginator.page(1) if total_pages > 0 else None
-            page = 1
+        paging_fields = ["page", "page_size", "cursor", "exact_count"]
+        total_count = pagination.cached_count(
+            queryset,
+            {key: value for key, value in filters.items() if key not in paging_fields},
+            exact=filters.get("exact_count", False),
+        )
 
-        candidates_data = []
-        if candidates_page:
-            candidates_serializer = JobProfileSerializer(
-                candidates_page.object_list, many=True
-            )
-            candidates_data = candidates_serializer.data
+        page = max(1, filters.get("page", 1))
+        page_size = pagination.page_size(filters.get("page_size", 20))
+        total_pages = (total_count + page_size - 1) // page_size
+        cursor = filters.get("cursor")
+        if not cursor and page > total_pages:
+            page = max(1, total_pages)
+
+        rows, next_cursor = pagination.keyset_page(
+            candidate_cards.values(queryset),
+            page_size,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+        candidates_data = CandidateCardSerializer(
+            candidate_cards.build(rows), many=True
+        ).data
 
         if hasattr(request.user, "role") and request.user.role in [
             "recruiter",
@@ -841,14 +842,14 @@ class CandidateSearchViewSet(viewsets.ViewSet):
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "has_next": candidates_page.has_next() if candidates_page else False,
-            "has_previous": candidates_page.has_previous()
-            if candidates_page
-            else False,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1,
+            "next_cursor": next_cursor,
             "applied_filters": {
                 key: value
                 for key, value in filters.items()
-                if value is not None
+                if key not in ["cursor", "exact_count"]
+                and value is not None
                 and value != ""
                 and value != []
                 and not (
@@ -952,11 +953,9 @@ class CandidateSearchViewSet(viewsets.ViewSet):
             )
 
     def list(self, request):
-        queryset = (
-            JobProfile.objects.select_related("profile__user")
-            .prefetch_related("job_skills", "profile__skills", "profile__experiences")
-            .all()
-        )
+        queryset = candidate_cards.values(JobProfile.objects.all())
 
-        serializer = JobProfileSerializer(queryset, many=True)
-        return Response(serializer.data)
+        paginator = pagination.CandidateCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CandidateCardSerializer(candidate_cards.build(page), many=True)
+        return paginator.get_paginated_response(serializer.data)
@@ -32,6 +32,32 @@ REQUEST_DURATION = Histogram(
     "http_request_duration_seconds", "HTTP request duration", ["method", "endpoint"]
 )
 ACTIVE_CONNECTIONS = Gauge("active_connections", "Active database connections")
+EXECUTOR_REQUEST_DURATION = Histogram(
+    "code_executor_request_duration_seconds",
+    "Latency of backend calls to the code executor",
+    ["endpoint"],
+)
+EXECUTOR_REQUESTS = Counter(
+    "code_executor_requests_total",
+    "Backend calls to the code executor by outcome",
+    ["endpoint", "outcome"],
+)
+EXECUTOR_RETRIES = Counter(
+    "code_executor_retries_total", "Retried calls to the code executor", ["endpoint"]
+)
+EXECUTOR_CIRCUIT_OPEN = Gauge(
+    "code_executor_circuit_open", "1 while the code executor circuit breaker is open"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Shared cache lookups by namespace and result (hit, miss or wait)",
+    ["namespace", "result"],
+)
+CACHE_OPERATION_DURATION = Histogram(
+    "cache_operation_duration_seconds",
+    "Latency of shared cache lookups and of recomputing missing values",
+    ["namespace", "operation"],
+)
 
 
 def setup_telemetry():
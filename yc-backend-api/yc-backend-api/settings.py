@@ -77,6 +77,31 @@ WSGI_APPLICATION = "yc-backend-api.wsgi.application"
 # Database
 DATABASES = {"default": dj_database_url.parse(config("DATABASE_URL"))}
 
+# Cache (core/cache.py). With CACHE_URL (e.g. redis://redis:6379/1) all workers
+# share one Redis; without it, as in tests, each process has a memory cache
+CACHE_URL = config("CACHE_URL", default="")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": config("CACHE_KEY_PREFIX", default="yc"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "yc-backend-api",
+        }
+    }
+# Seconds a caller waits for another one computing the same missing value, and
+# how long that computation may hold its lock
+CACHE_SINGLE_FLIGHT_WAIT = config("CACHE_SINGLE_FLIGHT_WAIT", default=2.0, cast=float)
+CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT = config(
+    "CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT", default=30, cast=int
+)
+
 # Custom User Model
 AUTH_USER_MODEL = "authentication.User"
 
@@ -242,6 +267,87 @@ CODE_EXECUTOR_SERVICE_URL = os.getenv(
     "CODE_EXECUTOR_SERVICE_URL", "http://code-executor:8002"
 )
 
+# Shared executor HTTP client (core/executor_client.py), calling
+# CODE_EXECUTOR_SERVICE_URL
+CODE_EXECUTOR_POOL_SIZE = config("CODE_EXECUTOR_POOL_SIZE", default=20, cast=int)
+CODE_EXECUTOR_KEEP_ALIVE = config("CODE_EXECUTOR_KEEP_ALIVE", default=True, cast=bool)
+# Retries (with exponential backoff) apply to idempotent calls only
+CODE_EXECUTOR_RETRIES = config("CODE_EXECUTOR_RETRIES", default=2, cast=int)
+CODE_EXECUTOR_RETRY_BACKOFF = config(
+    "CODE_EXECUTOR_RETRY_BACKOFF", default=0.2, cast=float
+)
+# Consecutive failures that open the circuit, and seconds before a trial call
+CODE_EXECUTOR_CIRCUIT_THRESHOLD = config(
+    "CODE_EXECUTOR_CIRCUIT_THRESHOLD", default=5, cast=int
+)
+CODE_EXECUTOR_CIRCUIT_RESET = config(
+    "CODE_EXECUTOR_CIRCUIT_RESET", default=30, cast=float
+)
+
+# Seconds an executor response is reused for identical code and test cases
+CODE_EXECUTION_CACHE_TIMEOUT = config(
+    "CODE_EXECUTION_CACHE_TIMEOUT", default=600, cast=int
+)
+
+# Course structure counts (course/structure_cache.py); entries are versioned per
+# course, so the timeout only bounds how long unused entries are kept
+COURSE_STRUCTURE_CACHE_TIMEOUT = config(
+    "COURSE_STRUCTURE_CACHE_TIMEOUT", default=86400, cast=int
+)
+COURSE_STRUCTURE_LOCAL_CACHE_SIZE = config(
+    "COURSE_STRUCTURE_LOCAL_CACHE_SIZE", default=256, cast=int
+)
+
+# Compiled MCQ answer keys kept in memory per process (assessment/grading.py)
+MCQ_ANSWER_KEY_CACHE_SIZE = config("MCQ_ANSWER_KEY_CACHE_SIZE", default=4096, cast=int)
+
+# Candidate question ids for random assessment questions (assessment/question_pool.py),
+# versioned on every question change. With a paper pool size above 0, contests
+# hand out one of that many pre-assembled papers instead of sampling per start.
+ASSESSMENT_QUESTION_POOL_TIMEOUT = config(
+    "ASSESSMENT_QUESTION_POOL_TIMEOUT", default=86400, cast=int
+)
+ASSESSMENT_PAPER_POOL_SIZE = config("ASSESSMENT_PAPER_POOL_SIZE", default=0, cast=int)
+
+# Most events accepted by one log-activity/batch request (assessment/mixins.py)
+ASSESSMENT_ACTIVITY_BATCH_LIMIT = config(
+    "ASSESSMENT_ACTIVITY_BATCH_LIMIT", default=500, cast=int
+)
+
+# Contest leaderboards (assessment/leaderboard.py): how often a board is rebuilt
+# from the database
+CONTEST_LEADERBOARD_REBUILD_SECONDS = config(
+    "CONTEST_LEADERBOARD_REBUILD_SECONDS", default=300, cast=int
+)
+
+# Plagiarism fingerprint index (course/plagiarism_index.py). Changing the k-gram
+# size or window requires `manage.py build_plagiarism_index --rebuild`
+PLAGIARISM_KGRAM_SIZE = config("PLAGIARISM_KGRAM_SIZE", default=5, cast=int)
+PLAGIARISM_WINNOW_WINDOW = config("PLAGIARISM_WINNOW_WINDOW", default=4, cast=int)
+# Candidates from the index that the code executor scores exactly
+PLAGIARISM_MAX_CANDIDATES = config("PLAGIARISM_MAX_CANDIDATES", default=10, cast=int)
+
+# Queued code submissions, evaluated by `manage.py run_submission_workers`
+CODE_SUBMISSION_WORKERS = config("CODE_SUBMISSION_WORKERS", default=4, cast=int)
+CODE_SUBMISSION_POLL_INTERVAL = config(
+    "CODE_SUBMISSION_POLL_INTERVAL", default=0.5, cast=float
+)
+# Seconds a running job may take before it is considered abandoned and requeued
+CODE_SUBMISSION_JOB_TIMEOUT = config(
+    "CODE_SUBMISSION_JOB_TIMEOUT", default=120, cast=int
+)
+CODE_SUBMISSION_MAX_ATTEMPTS = config(
+    "CODE_SUBMISSION_MAX_ATTEMPTS", default=3, cast=int
+)
+
+# Job and candidate listings (job/pagination.py): default and largest page size
+JOB_LIST_PAGE_SIZE = config("JOB_LIST_PAGE_SIZE", default=20, cast=int)
+JOB_LIST_MAX_PAGE_SIZE = config("JOB_LIST_MAX_PAGE_SIZE", default=100, cast=int)
+# Seconds a candidate search result count is reused for the same filters
+CANDIDATE_SEARCH_COUNT_TIMEOUT = config(
+    "CANDIDATE_SEARCH_COUNT_TIMEOUT", default=60, cast=int
+)
+
 # API Documentation Settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "YC Backend API",
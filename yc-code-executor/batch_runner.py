@@ -0,0 +1,155 @@
+"""
+Framed protocol and sessions for batched test case harnesses.
+
+A harness is one long-lived process that runs many test cases of a single
+submission. The pool side writes one case frame at a time and reads back one
+result frame per case:
+
+    case:    b"<timeout_ms> <input_len>\\n" + input
+    result:  b"<exit_code> <timed_out> <wall_us> <cpu_us> <stdout_len> <stderr_len>\\n"
+             + stdout + stderr
+
+The same framing (space separated integers, the last one being the payload
+length) is used for any setup frame a harness needs before its first case.
+The harnesses live in harness/ (C/C++, JavaScript, Java) and python_worker.py.
+"""
+import asyncio
+import logging
+import os
+import signal
+from typing import Awaitable, Callable, Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+HARNESS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'harness')
+
+# Frames can carry large program output
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def encode_frame(fields: List[int], payload: bytes) -> bytes:
+    header = ' '.join(str(field) for field in fields + [len(payload)])
+    return header.encode() + b'\n' + payload
+
+
+class HarnessError(RuntimeError):
+    """The harness process died or broke the protocol"""
+
+
+class HarnessProcess:
+    """One harness process speaking the framed protocol over stdin/stdout"""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def spawn(cls, command: List[str], cwd: str = None) -> 'HarnessProcess':
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+            limit=STREAM_LIMIT,
+        )
+        return cls(process)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def send(self, data: bytes):
+        try:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise HarnessError(str(e))
+
+    async def run(self, input_data: str, timeout: float) -> Dict[str, Any]:
+        """Run one test case. Raises asyncio.TimeoutError if the harness stops responding."""
+        await self.send(encode_frame([int(timeout * 1000)], input_data.encode()))
+        # The harness enforces the timeout itself; the margin covers startup/reporting.
+        header = await asyncio.wait_for(self.process.stdout.readline(), timeout=timeout + 2)
+        if not header:
+            raise HarnessError('Harness exited unexpectedly')
+        try:
+            exit_code, timed_out, wall_us, cpu_us, stdout_len, stderr_len = map(int, header.split())
+            stdout = await self.process.stdout.readexactly(stdout_len)
+            stderr = await self.process.stdout.readexactly(stderr_len)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            raise HarnessError(f'Malformed harness result: {e}')
+        return {
+            'stdout': stdout.decode(errors='replace'),
+            'stderr': stderr.decode(errors='replace'),
+            'returncode': exit_code,
+            'timed_out': bool(timed_out),
+            'execution_time': wall_us / 1_000_000,
+            'cpu_time': cpu_us / 1_000_000,
+        }
+
+    def kill(self):
+        """Terminate the harness together with any forked test case children."""
+        if self.process.returncode is not None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def retire(self):
+        self.kill()
+        try:
+            await self.process.wait()
+        except Exception:
+            pass
+
+
+class HarnessSession:
+    """Harness processes dedicated to one submission, handed to test cases as they free up.
+
+    A harness that times out or fails is replaced before the next case, and all
+    of them are retired when the submission finishes.
+    """
+
+    def __init__(self, spawn: Callable[[], Awaitable[HarnessProcess]], workers: int):
+        self.spawn = spawn
+        self.worker_count = max(1, workers)
+        self._processes: List[HarnessProcess] = []
+        self._free: asyncio.Queue = asyncio.Queue()
+
+    async def __aenter__(self) -> 'HarnessSession':
+        try:
+            for _ in range(self.worker_count):
+                await self._add()
+        except Exception:
+            await self.__aexit__()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.gather(*(process.retire() for process in self._processes))
+
+    async def _add(self):
+        process = await self.spawn()
+        self._processes.append(process)
+        self._free.put_nowait(process)
+
+    async def run(self, input_data: str, timeout: float) -> Dict[str, Any]:
+        process = await self._free.get()
+        recycle = True
+        try:
+            result = await process.run(input_data, timeout)
+            recycle = result['timed_out'] or not process.alive
+            return result
+        finally:
+            if recycle:
+                process.kill()
+                try:
+                    await self._add()
+                except Exception as e:
+                    # Keep the dead harness queued so later cases fail fast instead of waiting
+                    logger.warning(f"Could not replace test harness: {e}")
+                    self._free.put_nowait(process)
+            else:
+                self._free.put_nowait(process)
@@ -0,0 +1,125 @@
+"""
+Content-addressed on-disk cache of compiled artifacts (C, C++, Java)
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from typing import List
+
+from observability import record_compile_cache, COMPILE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class CompileCache:
+    """Size-bounded LRU cache of build outputs keyed by hash(language, flags, source).
+
+    Each entry is a directory named after the key holding the compiled artifacts.
+    Entries are published with an atomic rename, so concurrent workers never see
+    a partially written entry. The entry mtime is refreshed on every hit and the
+    least recently used entries are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(language: str, flags: List[str], source: str) -> str:
+        digest = hashlib.sha256()
+        for part in (language, "\0".join(flags), source):
+            digest.update(part.encode())
+            digest.update(b"\0\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def restore(self, key: str, language: str, dest_dir: str) -> bool:
+        """Copy a cached build into dest_dir. Returns False on a miss."""
+        if not self.enabled:
+            return False
+        entry = self._entry_path(key)
+        try:
+            names = os.listdir(entry)
+            for name in names:
+                shutil.copy2(os.path.join(entry, name), os.path.join(dest_dir, name))
+            os.utime(entry)
+        except FileNotFoundError:
+            record_compile_cache(language, hit=False)
+            return False
+        except OSError as e:
+            logger.warning(f"Compile cache restore failed for {key}: {e}")
+            record_compile_cache(language, hit=False)
+            return False
+        record_compile_cache(language, hit=True)
+        return True
+
+    def store(self, key: str, src_dir: str, artifacts: List[str]):
+        """Publish freshly compiled artifacts from src_dir under key."""
+        if not self.enabled or not artifacts:
+            return
+        entry = self._entry_path(key)
+        if os.path.isdir(entry):
+            return
+        staging = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(staging)
+            for name in artifacts:
+                shutil.copy2(os.path.join(src_dir, name), os.path.join(staging, name))
+            os.rename(staging, entry)
+        except OSError as e:
+            # Another worker may have published the same key first
+            logger.debug(f"Compile cache store skipped for {key}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(".tmp-"):
+                continue
+            path = self._entry_path(name)
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+                )
+                entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                continue
+            total += size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+        COMPILE_CACHE_SIZE.set(total)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        COMPILE_CACHE_SIZE.set(0)
+
+
+compile_cache = CompileCache(
+    cache_dir=os.getenv(
+        "COMPILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "yc-compile-cache")
+    ),
+    max_bytes=int(os.getenv("COMPILE_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    enabled=os.getenv("COMPILE_CACHE_ENABLED", "true").lower() == "true",
+)
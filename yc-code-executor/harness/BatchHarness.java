@@ -0,0 +1,177 @@
+import java.io.BufferedInputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.management.ManagementFactory;
+import java.lang.management.ThreadMXBean;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.security.Permission;
+
+/**
+ * Batched test case harness for Java submissions.
+ *
+ * Usage: java -Djava.security.manager=allow -cp . BatchHarness
+ *
+ * For every case frame read from stdin (see batch_runner.py) the harness loads
+ * Solution through a fresh class loader, so static state never leaks between
+ * cases, and runs Solution.main on its own thread with System.in/out/err bound
+ * to the case. Results are written back as frames with the wall-clock and CPU
+ * time of the case. On a timeout the harness reports the case and halts; the
+ * executor starts a new harness for the remaining cases.
+ */
+public class BatchHarness {
+
+    /** Thrown instead of exiting the JVM when a submission calls System.exit. */
+    static class ExitTrap extends SecurityException {
+        final int status;
+
+        ExitTrap(int status) {
+            super("System.exit(" + status + ")");
+            this.status = status;
+        }
+    }
+
+    static final ThreadGroup CASES = new ThreadGroup("test-cases");
+
+    static void installExitTrap() {
+        try {
+            System.setSecurityManager(new SecurityManager() {
+                @Override
+                public void checkExit(int status) {
+                    if (Thread.currentThread().getThreadGroup() == CASES) {
+                        throw new ExitTrap(status);
+                    }
+                }
+
+                @Override
+                public void checkPermission(Permission perm) {
+                }
+
+                @Override
+                public void checkPermission(Permission perm, Object context) {
+                }
+            });
+        } catch (UnsupportedOperationException e) {
+            // Security manager unavailable on this JVM: System.exit ends the harness
+            // and the executor falls back to one process per case.
+        }
+    }
+
+    static String readLine(InputStream in) throws IOException {
+        StringBuilder line = new StringBuilder();
+        int c;
+        while ((c = in.read()) != -1 && c != '\n') {
+            line.append((char) c);
+        }
+        if (c == -1 && line.length() == 0) {
+            return null;
+        }
+        return line.toString().trim();
+    }
+
+    static byte[] readExact(InputStream in, int length) throws IOException {
+        byte[] data = new byte[length];
+        int done = 0;
+        while (done < length) {
+            int n = in.read(data, done, length - done);
+            if (n < 0) {
+                throw new IOException("Unexpected end of input");
+            }
+            done += n;
+        }
+        return data;
+    }
+
+    public static void main(String[] args) throws Exception {
+        InputStream frames = new BufferedInputStream(new FileInputStream(FileDescriptor.in));
+        OutputStream results = new FileOutputStream(FileDescriptor.out);
+        URL classpath = new File(".").toURI().toURL();
+        ThreadMXBean threads = ManagementFactory.getThreadMXBean();
+        installExitTrap();
+
+        String header;
+        while ((header = readLine(frames)) != null) {
+            if (header.isEmpty()) {
+                continue;
+            }
+            String[] fields = header.split("\\s+");
+            long timeoutMs = Long.parseLong(fields[0]);
+            byte[] input = readExact(frames, Integer.parseInt(fields[1]));
+
+            ByteArrayOutputStream stdout = new ByteArrayOutputStream();
+            ByteArrayOutputStream stderr = new ByteArrayOutputStream();
+            PrintStream caseOut = new PrintStream(stdout, true);
+            PrintStream caseErr = new PrintStream(stderr, true);
+            System.setIn(new ByteArrayInputStream(input));
+            System.setOut(caseOut);
+            System.setErr(caseErr);
+
+            final int[] exitCode = {0};
+            final long[] cpuNanos = {0};
+            URLClassLoader loader = new URLClassLoader(new URL[] {classpath}, ClassLoader.getPlatformClassLoader());
+            Thread worker = new Thread(CASES, () -> {
+                try {
+                    Class<?> solution = loader.loadClass("Solution");
+                    Method entry = solution.getMethod("main", String[].class);
+                    entry.invoke(null, (Object) new String[0]);
+                } catch (InvocationTargetException e) {
+                    Throwable cause = e.getCause();
+                    if (cause instanceof ExitTrap) {
+                        exitCode[0] = ((ExitTrap) cause).status;
+                    } else {
+                        System.err.print("Exception in thread \"main\" ");
+                        cause.printStackTrace();
+                        exitCode[0] = 1;
+                    }
+                } catch (ExitTrap e) {
+                    exitCode[0] = e.status;
+                } catch (Throwable e) {
+                    e.printStackTrace();
+                    exitCode[0] = 1;
+                } finally {
+                    System.out.flush();
+                    System.err.flush();
+                    cpuNanos[0] = threads.getCurrentThreadCpuTime();
+                }
+            }, "main");
+
+            long start = System.nanoTime();
+            worker.start();
+            worker.join(Math.max(1, timeoutMs));
+            long wallUs = (System.nanoTime() - start) / 1000;
+            boolean timedOut = worker.isAlive();
+            if (timedOut) {
+                cpuNanos[0] = threads.getThreadCpuTime(worker.getId());
+                exitCode[0] = -1;
+            }
+            caseOut.flush();
+            caseErr.flush();
+
+            byte[] out = stdout.toByteArray();
+            byte[] err = stderr.toByteArray();
+            String result = exitCode[0] + " " + (timedOut ? 1 : 0) + " " + wallUs + " "
+                    + Math.max(0, cpuNanos[0]) / 1000 + " " + out.length + " " + err.length + "\n";
+            results.write(result.getBytes(StandardCharsets.US_ASCII));
+            results.write(out);
+            results.write(err);
+            results.flush();
+            loader.close();
+
+            if (timedOut) {
+                // A runaway thread cannot be stopped safely; start over in a new JVM
+                Runtime.getRuntime().halt(0);
+            }
+        }
+    }
+}
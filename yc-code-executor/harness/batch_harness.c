@@ -0,0 +1,193 @@
+/*
+ * Batched test case harness for C and C++ submissions.
+ *
+ * The submission is compiled together with this file using
+ * -Dmain=yc_student_main, so its main() becomes an ordinary function. The
+ * harness reads case frames from stdin and, for every case, forks a child
+ * that runs the student's main() with stdin/stdout/stderr redirected to
+ * temporary files. The parent never runs student code, so each child starts
+ * from a pristine copy of the program. Results are written back as frames
+ * (see batch_runner.py) with the wall-clock and CPU time of the case.
+ *
+ * The file is valid C and C++; g++ compiles it as C++ for C++ submissions.
+ */
+#undef main
+
+#ifndef _GNU_SOURCE
+#define _GNU_SOURCE
+#endif
+#include <errno.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/stat.h>
+#include <sys/time.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <time.h>
+#include <unistd.h>
+
+#ifdef __cplusplus
+/* The student may declare either form of main(); link whichever exists. */
+int yc_student_main() __attribute__((weak));
+int yc_student_main(int, char **) __attribute__((weak));
+#else
+int yc_student_main();
+#endif
+
+static int read_exact(int fd, char *buf, size_t len) {
+    size_t done = 0;
+    while (done < len) {
+        ssize_t n = read(fd, buf + done, len - done);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) return -1;
+        done += (size_t)n;
+    }
+    return 0;
+}
+
+static int write_all(int fd, const char *buf, size_t len) {
+    size_t done = 0;
+    while (done < len) {
+        ssize_t n = write(fd, buf + done, len - done);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) return -1;
+        done += (size_t)n;
+    }
+    return 0;
+}
+
+/* Reads "<timeout_ms> <input_len>\n"; returns 0 on success, -1 on EOF. */
+static int read_header(long *timeout_ms, long *input_len) {
+    char line[64];
+    size_t len = 0;
+    while (len < sizeof(line) - 1) {
+        if (read_exact(0, line + len, 1) < 0) return -1;
+        if (line[len] == '\n') break;
+        len++;
+    }
+    line[len] = '\0';
+    return sscanf(line, "%ld %ld", timeout_ms, input_len) == 2 ? 0 : -1;
+}
+
+static int temp_file(void) {
+    char path[] = "/tmp/yc-harness-XXXXXX";
+    int fd = mkstemp(path);
+    if (fd >= 0) unlink(path);
+    return fd;
+}
+
+static int send_file(int fd, off_t len) {
+    char buf[65536];
+    off_t offset = 0;
+    while (offset < len) {
+        ssize_t n = pread(fd, buf, sizeof(buf), offset);
+        if (n <= 0) return -1;
+        if (write_all(1, buf, (size_t)n) < 0) return -1;
+        offset += n;
+    }
+    return 0;
+}
+
+static int run_student_main(void) {
+    char program[] = "solution";
+    char *argv[] = {program, NULL};
+#ifdef __cplusplus
+    int (*no_args)() = yc_student_main;
+    int (*with_args)(int, char **) = yc_student_main;
+    if (with_args) return with_args(1, argv);
+    if (no_args) return no_args();
+    return 0;
+#else
+    return yc_student_main(1, argv);
+#endif
+}
+
+static int run_case(long timeout_ms, const char *input, long input_len) {
+    int in_fd = temp_file(), out_fd = temp_file(), err_fd = temp_file();
+    if (in_fd < 0 || out_fd < 0 || err_fd < 0) return -1;
+    if (write_all(in_fd, input, (size_t)input_len) < 0) return -1;
+    lseek(in_fd, 0, SEEK_SET);
+
+    struct timespec start, end;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    pid_t pid = fork();
+    if (pid < 0) return -1;
+    if (pid == 0) {
+        dup2(in_fd, 0);
+        dup2(out_fd, 1);
+        dup2(err_fd, 2);
+
+        struct rlimit core = {0, 0};
+        setrlimit(RLIMIT_CORE, &core);
+        rlim_t cpu_seconds = (rlim_t)((timeout_ms + 999) / 1000);
+        struct rlimit cpu = {cpu_seconds, cpu_seconds};
+        setrlimit(RLIMIT_CPU, &cpu);
+
+        struct itimerval timer;
+        memset(&timer, 0, sizeof(timer));
+        timer.it_value.tv_sec = timeout_ms / 1000;
+        timer.it_value.tv_usec = (timeout_ms % 1000) * 1000;
+        setitimer(ITIMER_REAL, &timer, NULL);
+
+        /* exit() flushes stdio and C++ streams just like returning from main */
+        exit(run_student_main());
+    }
+
+    int status = 0;
+    struct rusage usage;
+    while (wait4(pid, &status, 0, &usage) < 0 && errno == EINTR) {
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    long wall_us = (end.tv_sec - start.tv_sec) * 1000000L + (end.tv_nsec - start.tv_nsec) / 1000L;
+    long cpu_us = usage.ru_utime.tv_sec * 1000000L + usage.ru_utime.tv_usec
+                + usage.ru_stime.tv_sec * 1000000L + usage.ru_stime.tv_usec;
+    int timed_out = 0;
+    int exit_code;
+    if (WIFSIGNALED(status)) {
+        int sig = WTERMSIG(status);
+        timed_out = sig == SIGALRM || sig == SIGXCPU || sig == SIGKILL;
+        exit_code = -sig;
+    } else {
+        exit_code = WEXITSTATUS(status);
+    }
+
+    struct stat out_stat, err_stat;
+    fstat(out_fd, &out_stat);
+    fstat(err_fd, &err_stat);
+
+    char header[160];
+    int header_len = snprintf(header, sizeof(header), "%d %d %ld %ld %ld %ld\n",
+                              exit_code, timed_out, wall_us, cpu_us,
+                              (long)out_stat.st_size, (long)err_stat.st_size);
+    int rc = 0;
+    if (write_all(1, header, (size_t)header_len) < 0
+        || send_file(out_fd, out_stat.st_size) < 0
+        || send_file(err_fd, err_stat.st_size) < 0) {
+        rc = -1;
+    }
+    close(in_fd);
+    close(out_fd);
+    close(err_fd);
+    return rc;
+}
+
+int main(void) {
+    long timeout_ms, input_len;
+    while (read_header(&timeout_ms, &input_len) == 0) {
+        char *input = (char *)malloc((size_t)input_len + 1);
+        if (!input) return 1;
+        if (input_len > 0 && read_exact(0, input, (size_t)input_len) < 0) {
+            free(input);
+            return 1;
+        }
+        int rc = run_case(timeout_ms, input, input_len);
+        free(input);
+        if (rc < 0) return 1;
+    }
+    return 0;
+}
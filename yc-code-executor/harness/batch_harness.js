@@ -0,0 +1,167 @@
+"use strict";
+
+/**
+ * Batched test case harness for JavaScript submissions.
+ *
+ * Usage: node batch_harness.js solution.js
+ *
+ * The submission is compiled once. For every case frame read from stdin (see
+ * batch_runner.py) it runs in a fresh module scope where `process.stdin`,
+ * `fs.readFileSync(0)`, `process.stdout`, `process.stderr`, `console` and
+ * `process.exit` are bound to that case's input and captured output. Results
+ * are written back as frames with the wall-clock and CPU time of the case.
+ */
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+const { Console } = require('console');
+const { Readable, Writable } = require('stream');
+const Module = require('module');
+
+const file = path.resolve(process.argv[2]);
+const source = fs.readFileSync(file, 'utf8').replace(/^#!.*/, '');
+const realRequire = Module.createRequire(file);
+const script = new vm.Script(
+    '(function (exports, require, module, __filename, __dirname, process, console) {' +
+    source +
+    '\n}).apply(this, globalThis.__ycCaseArgs);',
+    { filename: file }
+);
+
+class ExitSignal {
+    constructor(code) {
+        this.code = code;
+    }
+}
+
+function captureStream(chunks) {
+    const stream = new Writable({
+        write(chunk, encoding, callback) {
+            chunks.push(Buffer.from(chunk, encoding));
+            callback();
+        },
+    });
+    stream.isTTY = false;
+    return stream;
+}
+
+function isStdinPath(target) {
+    return target === 0 || target === '/dev/stdin';
+}
+
+function makeCase(input) {
+    const stdout = [];
+    const stderr = [];
+    const stdoutStream = captureStream(stdout);
+    const stderrStream = captureStream(stderr);
+    const stdin = Readable.from([Buffer.from(input)], { objectMode: false });
+
+    const caseFs = Object.assign({}, fs, {
+        readFileSync(target, options) {
+            if (isStdinPath(target)) {
+                const encoding = typeof options === 'string' ? options : options && options.encoding;
+                const data = Buffer.from(input);
+                return encoding ? data.toString(encoding) : data;
+            }
+            return fs.readFileSync(target, options);
+        },
+    });
+
+    const caseProcess = Object.create(process, {
+        stdin: { value: stdin },
+        stdout: { value: stdoutStream },
+        stderr: { value: stderrStream },
+        exit: { value: (code) => { throw new ExitSignal(code === undefined ? 0 : code); } },
+    });
+    const caseRequire = (name) => (name === 'fs' || name === 'node:fs') ? caseFs : realRequire(name);
+    Object.assign(caseRequire, realRequire);
+
+    const caseModule = { exports: {}, filename: file, id: '.', loaded: false };
+    return {
+        stdin,
+        stdout,
+        stderr,
+        args: [caseModule.exports, caseRequire, caseModule, file, path.dirname(file), caseProcess, new Console(stdoutStream, stderrStream)],
+    };
+}
+
+function settle(stdin, release) {
+    // Let readline/'data' handlers consume the whole input before collecting output
+    if (stdin.readableEnded || stdin.listenerCount('data') === 0 && stdin.listenerCount('readable') === 0) {
+        release();
+    } else {
+        stdin.once('end', release);
+        stdin.once('close', release);
+    }
+}
+
+async function runCase(timeoutMs, input) {
+    const testCase = makeCase(input.toString());
+    const start = process.hrtime.bigint();
+    const cpuStart = process.cpuUsage();
+    let exitCode = 0;
+    let timedOut = 0;
+    let release;
+    const settled = new Promise((resolve) => {
+        release = () => setImmediate(() => setImmediate(resolve));
+    });
+
+    const onError = (error) => {
+        if (error instanceof ExitSignal) {
+            exitCode = error.code;
+        } else {
+            testCase.stderr.push(Buffer.from(String(error && error.stack || error) + '\n'));
+            exitCode = 1;
+        }
+        release();
+    };
+    process.on('uncaughtException', onError);
+    try {
+        globalThis.__ycCaseArgs = testCase.args;
+        script.runInThisContext({ timeout: Math.max(1, timeoutMs) });
+        settle(testCase.stdin, release);
+        await settled;
+    } catch (error) {
+        if (error && error.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+            timedOut = 1;
+            exitCode = -1;
+        } else {
+            onError(error);
+        }
+    } finally {
+        process.removeListener('uncaughtException', onError);
+        delete globalThis.__ycCaseArgs;
+    }
+
+    const wallUs = Number((process.hrtime.bigint() - start) / 1000n);
+    const cpu = process.cpuUsage(cpuStart);
+    const stdout = Buffer.concat(testCase.stdout);
+    const stderr = Buffer.concat(testCase.stderr);
+    const header = `${exitCode} ${timedOut} ${wallUs} ${cpu.user + cpu.system} ${stdout.length} ${stderr.length}\n`;
+    fs.writeSync(1, Buffer.concat([Buffer.from(header), stdout, stderr]));
+}
+
+async function main() {
+    let buffer = Buffer.alloc(0);
+    let pending = null;
+    for await (const chunk of process.stdin) {
+        buffer = Buffer.concat([buffer, chunk]);
+        while (true) {
+            if (!pending) {
+                const newline = buffer.indexOf(10);
+                if (newline < 0) break;
+                const [timeoutMs, length] = buffer.slice(0, newline).toString().trim().split(/\s+/).map(Number);
+                pending = { timeoutMs, length };
+                buffer = buffer.slice(newline + 1);
+            }
+            if (buffer.length < pending.length) break;
+            const input = buffer.slice(0, pending.length);
+            buffer = buffer.slice(pending.length);
+            const { timeoutMs } = pending;
+            pending = null;
+            await runCase(timeoutMs, input);
+        }
+    }
+}
+
+main();
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import subprocess
 import tempfile
 import os
@@ -10,7 +11,14 @@ import psutil
 import difflib
 import asyncio
 import json
+import hashlib
+import logging
 from observability import setup_telemetry, instrument_fastapi_app, get_tracer, record_code_execution
+from compile_cache import compile_cache
+from python_pool import PythonWorkerPool
+from batch_runner import HarnessProcess, HarnessSession, HarnessError, HARNESS_DIR
+
+logger = logging.getLogger(__name__)
 
 # Initialize OpenTelemetry
 setup_telemetry()
@@ -56,6 +64,11 @@ class CodeExecutionWithTestsRequest(BaseModel):
     test_cases_advanced: Optional[List[TestCase]] = []
     test_cases_custom: Optional[List[TestCase]] = []
     timeout: int = 10
+    # Upper bound on test cases run concurrently for this request; capped by
+    # EXECUTOR_MAX_PARALLELISM. None uses the service-wide limit.
+    max_parallelism: Optional[int] = None
+    # Skip remaining test cases once one fails (interactive "run" requests).
+    stop_on_first_failure: bool = False
 
 class ExecutionResult(BaseModel):
     success: bool
@@ -73,6 +86,7 @@ class TestResult(BaseModel):
     error: str
     execution_time: float
     console_output: str = ""  # Add console output field
+    cpu_time: float = 0.0  # Reported by the batched harnesses
 
 class CodeExecutionResponse(BaseModel):
     execution_result: ExecutionResult
@@ -359,40 +373,249 @@ if __name__ == '__main__':
     _driver_execution()
 """
 
+# Maximum number of test case processes running at once across the service.
+# Defaults to the number of available cores.
+EXECUTOR_MAX_PARALLELISM = max(1, int(os.environ.get('EXECUTOR_MAX_PARALLELISM', os.cpu_count() or 1)))
+_execution_slots = asyncio.Semaphore(EXECUTOR_MAX_PARALLELISM)
+
+SKIPPED_TEST_ERROR = 'Skipped: a previous test case failed'
+
+# Pre-started Python interpreters; each test case runs in a sandboxed fork of one.
+PYTHON_POOL_ENABLED = os.environ.get('PYTHON_POOL_ENABLED', 'true').lower() == 'true'
+python_pool = PythonWorkerPool(
+    size=int(os.environ.get('PYTHON_POOL_SIZE', EXECUTOR_MAX_PARALLELISM)),
+    python_command=LANGUAGE_CONFIGS['python']['command']
+)
+
+# Run all test cases of a JavaScript/C/C++/Java submission in one long-lived
+# harness process per worker slot instead of one process per case.
+BATCH_RUNNER_ENABLED = os.environ.get('BATCH_RUNNER_ENABLED', 'true').lower() == 'true'
+HARNESS_JS = os.path.join(HARNESS_DIR, 'batch_harness.js')
+HARNESS_C = os.path.join(HARNESS_DIR, 'batch_harness.c')
+HARNESS_JAVA = os.path.join(HARNESS_DIR, 'BatchHarness.java')
+
+
+def preprocess_native_input(input_data: str) -> str:
+    """Convert JSON-style array lines into "len\nelems" form for C/C++/Java programs"""
+    try:
+        processed_lines = []
+        for line in input_data.split('\n'):
+            line = line.strip()
+            if not line: continue
+            try:
+                data = json.loads(line)
+                if isinstance(data, list):
+                    processed_lines.append(str(len(data)))
+                    processed_lines.append(" ".join(map(str, data)))
+                else:
+                    processed_lines.append(str(data))
+            except:
+                if line.startswith('[') and line.endswith(']'):
+                    content = line[1:-1].replace(',', ' ')
+                    parts = content.split()
+                    if parts:
+                        processed_lines.append(str(len(parts)))
+                        processed_lines.append(" ".join(parts))
+                    else:
+                        processed_lines.append(line)
+                else:
+                    processed_lines.append(line)
+        if processed_lines:
+            input_data = "\n".join(processed_lines)
+    except:
+        pass
+    return input_data
+
+
+async def run_test_case(test_case: TestCase, language: str, run_cmd: Optional[List[str]], cwd: str, timeout: int,
+                        session: Optional[HarnessSession] = None) -> TestResult:
+    """Run a single test case against an already prepared (compiled) program"""
+    input_data = test_case.input
+    if language in ['cpp', 'c', 'java']:
+        input_data = preprocess_native_input(input_data)
+
+    if session is not None:
+        try:
+            return await run_batched_test_case(test_case, input_data, session, timeout)
+        except HarnessError as e:
+            if run_cmd is None:
+                return TestResult(
+                    passed=False,
+                    input=test_case.input,
+                    expected_output=test_case.expected_output,
+                    actual_output='',
+                    error=f'Runtime Error: {str(e)}',
+                    execution_time=0,
+                    console_output=''
+                )
+            # e.g. the submission terminated the harness itself; rerun in its own process
+            logger.warning(
+                f"Harness failed, running test case in a separate process: {e}",
+                exc_info=True
+            )
+
+    start_time = time.time()
+    process = await asyncio.create_subprocess_exec(
+        *run_cmd,
+        cwd=cwd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    try:
+        # Ensure input ends with newline
+        if input_data and not input_data.endswith('\n'):
+            input_data = input_data + '\n'
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(input=input_data.encode()),
+            timeout=timeout
+        )
+        execution_time = time.time() - start_time
+
+        actual_output = stdout.decode().strip()
+        console_output = stderr.decode().strip()  # Console output from print statements
+        expected_output = test_case.expected_output.strip()
+
+        passed = actual_output == expected_output
+
+        return TestResult(
+            passed=passed,
+            input=test_case.input,
+            expected_output=expected_output,
+            actual_output=actual_output,
+            error=stderr.decode() if not passed and not console_output else "",
+            execution_time=execution_time,
+            console_output=console_output
+        )
+    except asyncio.TimeoutError:
+        try: process.kill()
+        except: pass
+        # Reap it so timed out cases do not leave zombies behind
+        await process.wait()
+        return TestResult(
+            passed=False,
+            input=test_case.input,
+            expected_output=test_case.expected_output,
+            actual_output='',
+            error='Timeout',
+            execution_time=timeout,
+            console_output=''
+        )
+
+
+async def run_batched_test_case(test_case: TestCase, input_data: str, session: HarnessSession, timeout: int) -> TestResult:
+    """Run a single test case on one of the submission's harness processes"""
+    if input_data and not input_data.endswith('\n'):
+        input_data = input_data + '\n'
+    try:
+        outcome = await session.run(input_data, timeout)
+    except asyncio.TimeoutError:
+        outcome = {'timed_out': True}
+
+    if outcome.get('timed_out'):
+        return TestResult(
+            passed=False,
+            input=test_case.input,
+            expected_output=test_case.expected_output,
+            actual_output='',
+            error='Timeout',
+            execution_time=timeout,
+            console_output=''
+        )
+
+    actual_output = outcome['stdout'].strip()
+    console_output = outcome['stderr'].strip()
+    expected_output = test_case.expected_output.strip()
+    passed = actual_output == expected_output
+
+    return TestResult(
+        passed=passed,
+        input=test_case.input,
+        expected_output=expected_output,
+        actual_output=actual_output,
+        error=outcome['stderr'] if not passed and not console_output else "",
+        execution_time=outcome['execution_time'],
+        console_output=console_output,
+        cpu_time=outcome['cpu_time']
+    )
+
+
+def harness_spawner(language: str, source: str, temp_dir: str, filename: str):
+    """Return a factory starting the batched harness for this submission, or None if disabled"""
+    config = LANGUAGE_CONFIGS[language]
+    if language == 'python':
+        if not PYTHON_POOL_ENABLED:
+            return None
+        # Workers are loaded with this submission only and retired afterwards
+        return lambda: python_pool.checkout(source + PYTHON_DRIVER_CODE, filename, temp_dir)
+    if not BATCH_RUNNER_ENABLED:
+        return None
+    if language == 'javascript':
+        command = config['command'] + [HARNESS_JS, filename]
+    elif language == 'java':
+        command = config['run_command'] + ['-Djava.security.manager=allow', 'BatchHarness']
+    else:
+        command = [os.path.join(temp_dir, 'solution_batch')]
+    return lambda: HarnessProcess.spawn(command, cwd=temp_dir)
+
+
+async def compile_program(language: str, source: str, temp_dir: str, filename: str, timeout: int,
+                          batch: bool = False) -> Optional[str]:
+    """Compile source in temp_dir, reusing cached artifacts for identical builds.
+
+    With batch=True the submission is built together with its batched test
+    harness (solution_batch for C/C++, BatchHarness.class for Java).
+    Returns the compiler output on failure and None on success.
+    """
+    config = LANGUAGE_CONFIGS[language]
+    flags = list(config['compile_command'])
+    if language == 'java':
+        harness_flags = ['-d', '.']
+        compile_cmd = config['compile_command'] + [filename]
+        if batch:
+            compile_cmd += harness_flags + [HARNESS_JAVA]
+    else:
+        harness_flags = ['-Dmain=yc_student_main']
+        if batch:
+            compile_cmd = config['compile_command'] + [os.path.join(temp_dir, 'solution_batch')] + harness_flags + [filename, HARNESS_C]
+        else:
+            compile_cmd = config['compile_command'] + [os.path.join(temp_dir, 'solution'), filename]
+    if batch:
+        # Rebuild cached programs whenever the harness source changes
+        with open(HARNESS_JAVA if language == 'java' else HARNESS_C, 'rb') as f:
+            flags += harness_flags + [hashlib.sha256(f.read()).hexdigest()]
+
+    cache_key = compile_cache.make_key(language, flags, source)
+    if compile_cache.restore(cache_key, language, temp_dir):
+        return None
+
+    compile_process = await asyncio.create_subprocess_exec(
+        *compile_cmd,
+        cwd=temp_dir,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    compile_stdout, compile_stderr = await asyncio.wait_for(
+        compile_process.communicate(), timeout=timeout
+    )
+    if compile_process.returncode != 0:
+        return compile_stderr.decode()
+
+    if language == 'java':
+        artifacts = [name for name in os.listdir(temp_dir) if name.endswith('.class')]
+    else:
+        artifacts = ['solution_batch' if batch else 'solution']
+    compile_cache.store(cache_key, temp_dir, artifacts)
+    return None
+
+
 class CodeExecutorService:
     @staticmethod
     async def execute_code(code: str, language: str, input_data: str = "", timeout: int = 10) -> Dict[str, Any]:
         """Execute code and return results"""
         if language in ['cpp', 'c', 'java']:
-            try:
-                processed_lines = []
-                for line in input_data.split('\n'):
-                    line = line.strip()
-                    if not line: continue
-                    try:
-                        data = json.loads(line)
-                        if isinstance(data, list):
-                            processed_lines.append(str(len(data)))
-                            processed_lines.append(" ".join(map(str, data)))
-                        else:
-                            processed_lines.append(str(data))
-                    except:
-                        # Fallback for Malformed or string-quoted arrays like "[1, 2, 3]"
-                        if line.startswith('[') and line.endswith(']'):
-                            # remove brackets and commas
-                            content = line[1:-1].replace(',', ' ')
-                            parts = content.split()
-                            if parts:
-                                processed_lines.append(str(len(parts)))
-                                processed_lines.append(" ".join(parts))
-                            else:
-                                processed_lines.append(line)
-                        else:
-                            processed_lines.append(line)
-                if processed_lines:
-                    input_data = "\n".join(processed_lines)
-            except:
-                pass
+            input_data = preprocess_native_input(input_data)
 
         if language not in LANGUAGE_CONFIGS:
             return {
@@ -436,23 +659,11 @@ class CodeExecutorService:
                     
                     process = None
                     if language == 'java':
-                        # Compile Java
-                        compile_cmd = config['compile_command'] + [filename]
-                        compile_process = await asyncio.create_subprocess_exec(
-                            *compile_cmd,
-                            cwd=temp_dir,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE
-                        )
-                        
-                        compile_stdout, compile_stderr = await asyncio.wait_for(
-                            compile_process.communicate(), timeout=timeout
-                        )
-                        
-                        if compile_process.returncode != 0:
+                        compile_error = await compile_program(language, code, temp_dir, filename, timeout)
+                        if compile_error is not None:
                             res = {
                                 'success': False,
-                                'error': compile_stderr.decode(),
+                                'error': compile_error,
                                 'output': '',
                                 'execution_time': time.time() - start_time,
                                 'memory_usage': 0,
@@ -472,24 +683,12 @@ class CodeExecutorService:
                         )
                         
                     elif language in ['cpp', 'c']:
-                        # Compile C/C++
                         output_file = os.path.join(temp_dir, 'solution')
-                        compile_cmd = config['compile_command'] + [output_file, filename]
-                        compile_process = await asyncio.create_subprocess_exec(
-                            *compile_cmd,
-                            cwd=temp_dir,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE
-                        )
-                        
-                        compile_stdout, compile_stderr = await asyncio.wait_for(
-                            compile_process.communicate(), timeout=timeout
-                        )
-                        
-                        if compile_process.returncode != 0:
+                        compile_error = await compile_program(language, code, temp_dir, filename, timeout)
+                        if compile_error is not None:
                             res = {
                                 'success': False,
-                                'error': compile_stderr.decode(),
+                                'error': compile_error,
                                 'output': '',
                                 'execution_time': time.time() - start_time,
                                 'memory_usage': 0,
@@ -617,6 +816,15 @@ class CodeExecutorService:
         
         return '\n'.join(lines)
 
+@app.on_event("startup")
+async def start_python_pool():
+    if PYTHON_POOL_ENABLED:
+        python_pool.warm_up()
+
+@app.on_event("shutdown")
+async def stop_python_pool():
+    await python_pool.shutdown()
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -640,252 +848,252 @@ async def execute_code(request: CodeExecutionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/execute-with-tests", response_model=CodeExecutionResponse)
-async def execute_code_with_tests(request: CodeExecutionWithTestsRequest):
-    """Execute code and run test cases"""
-    try:
-        all_test_cases = []
-        all_test_cases.extend(request.test_cases_basic or [])
-        all_test_cases.extend(request.test_cases_advanced or [])
-        all_test_cases.extend(request.test_cases_custom or [])
-        
-        # Track counts for separation
-        basic_count = len(request.test_cases_basic or [])
-        advanced_count = len(request.test_cases_advanced or [])
-        custom_count = len(request.test_cases_custom or [])
+async def evaluate_submission(request: CodeExecutionWithTestsRequest,
+                              on_result: Optional[Callable[[int, TestResult], Awaitable[None]]] = None) -> CodeExecutionResponse:
+    """Compile once and run every test case; on_result is awaited as each case finishes"""
+    all_test_cases = []
+    all_test_cases.extend(request.test_cases_basic or [])
+    all_test_cases.extend(request.test_cases_advanced or [])
+    all_test_cases.extend(request.test_cases_custom or [])
+    
+    # Track counts for separation
+    basic_count = len(request.test_cases_basic or [])
+    advanced_count = len(request.test_cases_advanced or [])
+    custom_count = len(request.test_cases_custom or [])
+    
+    if not all_test_cases:
+        raise HTTPException(status_code=400, detail="No test cases provided")
+
+    language = request.language
+    if language not in LANGUAGE_CONFIGS:
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
+
+    config = LANGUAGE_CONFIGS[language]
+    
+    # 1. First, compile the code once if needed
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if language == 'java':
+            filename = "Solution.java"
+        else:
+            filename = f"solution{config['extension']}"
         
-        if not all_test_cases:
-            raise HTTPException(status_code=400, detail="No test cases provided")
-
-        language = request.language
-        if language not in LANGUAGE_CONFIGS:
-            raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
-
-        config = LANGUAGE_CONFIGS[language]
-        
-        # 1. First, compile the code once if needed
-        with tempfile.TemporaryDirectory() as temp_dir:
-            if language == 'java':
-                filename = "Solution.java"
-            else:
-                filename = f"solution{config['extension']}"
+        filepath = os.path.join(temp_dir, filename)
+        with open(filepath, 'w') as f:
+            f.write(request.code)
+            if language == 'python':
+                f.write(PYTHON_DRIVER_CODE)
+
+        # Compilation step (if applicable)
+        spawn_harness = harness_spawner(language, request.code, temp_dir, filename)
+        is_compiled = 'compile_command' in config
+        if is_compiled:
+            compile_error = None
+            if spawn_harness is not None:
+                batch_error = await compile_program(language, request.code, temp_dir, filename, request.timeout, batch=True)
+                if batch_error is not None:
+                    # Report the submission's own compiler output, not the harness build's
+                    spawn_harness = None
+            if spawn_harness is None:
+                compile_error = await compile_program(language, request.code, temp_dir, filename, request.timeout)
             
-            filepath = os.path.join(temp_dir, filename)
-            with open(filepath, 'w') as f:
-                f.write(request.code)
-                if language == 'python':
-                    f.write(PYTHON_DRIVER_CODE)
-
-            # Compilation step (if applicable)
-            is_compiled = 'compile_command' in config
-            if is_compiled:
-                if language == 'java':
-                    compile_cmd = config['compile_command'] + [filename]
-                elif language in ['cpp', 'c']:
-                    output_file = os.path.join(temp_dir, 'solution')
-                    compile_cmd = config['compile_command'] + [output_file, filename]
-                
-                compile_process = await asyncio.create_subprocess_exec(
-                    *compile_cmd,
-                    cwd=temp_dir,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
+            if compile_error is not None:
+                # Return error for all tests if compilation failed
+                error_result = TestResult(
+                    passed=False,
+                    input='',
+                    expected_output='',
+                    actual_output='',
+                    error=compile_error,
+                    execution_time=0
                 )
-                stdout, stderr = await asyncio.wait_for(compile_process.communicate(), timeout=request.timeout)
                 
-                if compile_process.returncode != 0:
-                    # Return error for all tests if compilation failed
-                    error_result = TestResult(
-                        passed=False,
-                        input='',
-                        expected_output='',
-                        actual_output='',
-                        error=stderr.decode(),
-                        execution_time=0
-                    )
-                    
-                    basic_results = [TestResult(
-                        passed=False,
-                        input=tc.input,
-                        expected_output=tc.expected_output,
-                        actual_output='',
-                        error=stderr.decode(),
-                        execution_time=0,
-                        console_output=''
-                    ) for tc in (request.test_cases_basic or [])]
-                    
-                    advanced_results = [TestResult(
-                        passed=False,
-                        input=tc.input,
-                        expected_output=tc.expected_output,
-                        actual_output='',
-                        error=stderr.decode(),
-                        execution_time=0,
-                        console_output=''
-                    ) for tc in (request.test_cases_advanced or [])]
-                    
-                    custom_results = [TestResult(
-                        passed=False,
-                        input=tc.input,
-                        expected_output=tc.expected_output,
-                        actual_output='',
-                        error=stderr.decode(),
+                basic_results = [TestResult(
+                    passed=False,
+                    input=tc.input,
+                    expected_output=tc.expected_output,
+                    actual_output='',
+                    error=compile_error,
+                    execution_time=0,
+                    console_output=''
+                ) for tc in (request.test_cases_basic or [])]
+                
+                advanced_results = [TestResult(
+                    passed=False,
+                    input=tc.input,
+                    expected_output=tc.expected_output,
+                    actual_output='',
+                    error=compile_error,
+                    execution_time=0,
+                    console_output=''
+                ) for tc in (request.test_cases_advanced or [])]
+                
+                custom_results = [TestResult(
+                    passed=False,
+                    input=tc.input,
+                    expected_output=tc.expected_output,
+                    actual_output='',
+                    error=compile_error,
+                    execution_time=0,
+                    console_output=''
+                ) for tc in (request.test_cases_custom or [])]
+                
+                all_results = basic_results + advanced_results + custom_results
+                
+                return CodeExecutionResponse(
+                    execution_result=ExecutionResult(
+                        success=False,
+                        output='',
+                        error=compile_error,
                         execution_time=0,
-                        console_output=''
-                    ) for tc in (request.test_cases_custom or [])]
-                    
-                    all_results = basic_results + advanced_results + custom_results
-                    
-                    return CodeExecutionResponse(
-                        execution_result=ExecutionResult(
-                            success=False,
-                            output='',
-                            error=stderr.decode(),
-                            execution_time=0,
-                            memory_usage=0,
-                            status='compilation_error'
-                        ),
-                        test_results=all_results,
-                        total_passed=0,
-                        total_tests=len(all_results),
-                        basic_results=basic_results,
-                        advanced_results=advanced_results,
-                        custom_results=custom_results,
-                        basic_passed=0,
-                        advanced_passed=0,
-                        custom_passed=0
-                    )
-
-            # 2. Run all test cases using the compiled binary (or source for script langs)
-            test_results = []
-            passed_count = 0
-
-            for test_case in all_test_cases:
-                # Pre-process input for this test case
-                input_data = test_case.input
-                if language in ['cpp', 'c', 'java']:
-                    try:
-                        processed_lines = []
-                        for line in input_data.split('\n'):
-                            line = line.strip()
-                            if not line: continue
-                            try:
-                                data = json.loads(line)
-                                if isinstance(data, list):
-                                    processed_lines.append(str(len(data)))
-                                    processed_lines.append(" ".join(map(str, data)))
-                                else:
-                                    processed_lines.append(str(data))
-                            except:
-                                if line.startswith('[') and line.endswith(']'):
-                                    content = line[1:-1].replace(',', ' ')
-                                    parts = content.split()
-                                    if parts:
-                                        processed_lines.append(str(len(parts)))
-                                        processed_lines.append(" ".join(parts))
-                                    else:
-                                        processed_lines.append(line)
-                                else:
-                                    processed_lines.append(line)
-                        if processed_lines:
-                            input_data = "\n".join(processed_lines)
-                    except:
-                        pass
-
-                # Run process
-                start_time = time.time()
-                if language == 'java':
-                    run_cmd = config['run_command'] + ['Solution']
-                elif language in ['cpp', 'c']:
-                    run_cmd = [os.path.join(temp_dir, 'solution')]
-                else:
-                    run_cmd = config['command'] + [filename]
-
-                process = await asyncio.create_subprocess_exec(
-                    *run_cmd,
-                    cwd=temp_dir,
-                    stdin=asyncio.subprocess.PIPE,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
+                        memory_usage=0,
+                        status='compilation_error'
+                    ),
+                    test_results=all_results,
+                    total_passed=0,
+                    total_tests=len(all_results),
+                    basic_results=basic_results,
+                    advanced_results=advanced_results,
+                    custom_results=custom_results,
+                    basic_passed=0,
+                    advanced_passed=0,
+                    custom_passed=0
                 )
 
-                try:
-                    # Ensure input ends with newline
-                    if input_data and not input_data.endswith('\n'):
-                        input_data = input_data + '\n'
-                    stdout, stderr = await asyncio.wait_for(
-                        process.communicate(input=input_data.encode()),
-                        timeout=request.timeout
-                    )
-                    execution_time = time.time() - start_time
-
-
-                    actual_output = stdout.decode().strip()
-                    console_output = stderr.decode().strip()  # Console output from print statements
-                    expected_output = test_case.expected_output.strip()
-                    
-                    passed = actual_output == expected_output
-                    if passed: passed_count += 1
-                    
-                    test_results.append(TestResult(
-                        passed=passed,
-                        input=test_case.input,
-                        expected_output=expected_output,
-                        actual_output=actual_output,
-                        error=stderr.decode() if not passed and not console_output else "",
-                        execution_time=execution_time,
-                        console_output=console_output
-                    ))
-                except asyncio.TimeoutError:
-                    try: process.kill()
-                    except: pass
-                    test_results.append(TestResult(
+        # 2. Run all test cases using the compiled binary (or source for script langs).
+        # Cases fan out across worker slots bounded per request and per service;
+        # gather keeps results in submission order.
+        if language == 'java':
+            run_cmd = config['run_command'] + ['Solution']
+        elif language in ['cpp', 'c']:
+            # Only the harness build exists when batching
+            run_cmd = None if spawn_harness is not None else [os.path.join(temp_dir, 'solution')]
+        else:
+            run_cmd = config['command'] + [filename]
+
+        parallelism = EXECUTOR_MAX_PARALLELISM
+        if request.max_parallelism:
+            parallelism = max(1, min(request.max_parallelism, EXECUTOR_MAX_PARALLELISM))
+        request_slots = asyncio.Semaphore(parallelism)
+        abort = asyncio.Event()
+
+        async def run_in_slot(index: int, test_case: TestCase) -> TestResult:
+            async with request_slots, _execution_slots:
+                if abort.is_set():
+                    result = TestResult(
                         passed=False,
                         input=test_case.input,
                         expected_output=test_case.expected_output,
                         actual_output='',
-                        error='Timeout',
-                        execution_time=request.timeout,
+                        error=SKIPPED_TEST_ERROR,
+                        execution_time=0,
                         console_output=''
-                    ))
-
-            # Determine basic_result (first test or summary)
-            basic_result = ExecutionResult(
-                success=passed_count == len(all_test_cases),
-                output=test_results[0].actual_output if test_results else "",
-                error="",
-                execution_time=sum(t.execution_time for t in test_results),
-                memory_usage=0,
-                status='completed'
-            )
+                    )
+                else:
+                    result = await run_test_case(test_case, language, run_cmd, temp_dir, request.timeout, session)
+            if not result.passed and request.stop_on_first_failure:
+                abort.set()
+            if on_result is not None:
+                await on_result(index, result)
+            return result
+
+        if spawn_harness is not None:
+            # One harness process per worker slot runs this submission's cases
+            async with HarnessSession(spawn_harness, workers=min(parallelism, len(all_test_cases))) as session:
+                test_results = list(await asyncio.gather(*(run_in_slot(i, tc) for i, tc in enumerate(all_test_cases))))
+        else:
+            session = None
+            test_results = list(await asyncio.gather(*(run_in_slot(i, tc) for i, tc in enumerate(all_test_cases))))
+        passed_count = sum(1 for result in test_results if result.passed)
+
+        # Determine basic_result (first test or summary)
+        basic_result = ExecutionResult(
+            success=passed_count == len(all_test_cases),
+            output=test_results[0].actual_output if test_results else "",
+            error="",
+            execution_time=sum(t.execution_time for t in test_results),
+            memory_usage=0,
+            status='completed'
+        )
 
-            # Separate results by type
-            basic_results = test_results[:basic_count]
-            advanced_results = test_results[basic_count:basic_count + advanced_count]
-            custom_results = test_results[basic_count + advanced_count:]
-            
-            # Count passed tests by type
-            basic_passed = sum(1 for result in basic_results if result.passed)
-            advanced_passed = sum(1 for result in advanced_results if result.passed)
-            custom_passed = sum(1 for result in custom_results if result.passed)
-
-            return CodeExecutionResponse(
-                execution_result=basic_result,
-                test_results=test_results,
-                total_passed=passed_count,
-                total_tests=len(all_test_cases),
-                basic_results=basic_results,
-                advanced_results=advanced_results,
-                custom_results=custom_results,
-                basic_passed=basic_passed,
-                advanced_passed=advanced_passed,
-                custom_passed=custom_passed
-            )
+        # Separate results by type
+        basic_results = test_results[:basic_count]
+        advanced_results = test_results[basic_count:basic_count + advanced_count]
+        custom_results = test_results[basic_count + advanced_count:]
+        
+        # Count passed tests by type
+        basic_passed = sum(1 for result in basic_results if result.passed)
+        advanced_passed = sum(1 for result in advanced_results if result.passed)
+        custom_passed = sum(1 for result in custom_results if result.passed)
+
+        return CodeExecutionResponse(
+            execution_result=basic_result,
+            test_results=test_results,
+            total_passed=passed_count,
+            total_tests=len(all_test_cases),
+            basic_results=basic_results,
+            advanced_results=advanced_results,
+            custom_results=custom_results,
+            basic_passed=basic_passed,
+            advanced_passed=advanced_passed,
+            custom_passed=custom_passed
+        )
 
+
+@app.post("/execute-with-tests", response_model=CodeExecutionResponse)
+async def execute_code_with_tests(request: CodeExecutionWithTestsRequest):
+    """Execute code and run test cases"""
+    try:
+        return await evaluate_submission(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/execute-with-tests/stream")
+async def execute_code_with_tests_stream(request: CodeExecutionWithTestsRequest):
+    """
+    Same as /execute-with-tests, streamed as newline-delimited JSON: one
+    {"event": "result"} line per test case as soon as it finishes, then a
+    {"event": "complete"} line carrying the full response, or an
+    {"event": "error"} line.
+    """
+    basic_count = len(request.test_cases_basic or [])
+    advanced_count = len(request.test_cases_advanced or [])
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def publish(index: int, result: TestResult):
+        if index < basic_count:
+            category, offset = 'basic', 0
+        elif index < basic_count + advanced_count:
+            category, offset = 'advanced', basic_count
+        else:
+            category, offset = 'custom', basic_count + advanced_count
+        await events.put({'event': 'result', 'category': category, 'index': index - offset, 'result': result.model_dump()})
+
+    async def evaluate():
+        try:
+            response = await evaluate_submission(request, on_result=publish)
+            await events.put({'event': 'complete', 'response': response.model_dump()})
+        except HTTPException as e:
+            await events.put({'event': 'error', 'status_code': e.status_code, 'detail': e.detail})
+        except Exception as e:
+            await events.put({'event': 'error', 'status_code': 500, 'detail': str(e)})
+
+    async def stream():
+        task = asyncio.ensure_future(evaluate())
+        try:
+            while True:
+                event = await events.get()
+                yield json.dumps(event) + '\n'
+                if event['event'] != 'result':
+                    break
+        finally:
+            # Client went away: stop running its remaining cases
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type='application/x-ndjson')
+
+
 
 @app.get("/supported-languages-and-templates")
 async def get_supported_languages():
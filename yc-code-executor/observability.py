@@ -22,6 +22,10 @@ CODE_EXECUTIONS = Counter('code_executions_total', 'Total code executions', ['la
 EXECUTION_DURATION = Histogram('code_execution_duration_seconds', 'Code execution duration', ['language'])
 ACTIVE_EXECUTIONS = Gauge('active_code_executions', 'Currently running code executions')
 MEMORY_USAGE = Gauge('code_execution_memory_bytes', 'Memory usage during code execution')
+COMPILE_CACHE_REQUESTS = Counter('compile_cache_requests_total', 'Compilation cache lookups', ['language', 'result'])
+COMPILE_CACHE_SIZE = Gauge('compile_cache_size_bytes', 'Bytes of compiled artifacts held in the compilation cache')
+PLAGIARISM_FEATURE_CACHE_REQUESTS = Counter('plagiarism_feature_cache_requests_total', 'Plagiarism featurization cache lookups', ['result'])
+PLAGIARISM_FEATURE_CACHE_ENTRIES = Gauge('plagiarism_feature_cache_entries', 'Submissions held in the plagiarism featurization cache')
 
 def setup_telemetry():
     """Initialize OpenTelemetry tracing and metrics"""
@@ -113,4 +117,13 @@ def record_code_execution(language: str, status: str, duration: float, memory_us
     CODE_EXECUTIONS.labels(language=language, status=status).inc()
     EXECUTION_DURATION.labels(language=language).observe(duration)
     if memory_usage > 0:
-        MEMORY_USAGE.set(memory_usage)
\ No newline at end of file
+        MEMORY_USAGE.set(memory_usage)
+
+def record_compile_cache(language: str, hit: bool):
+    """Record a compilation cache lookup"""
+    COMPILE_CACHE_REQUESTS.labels(language=language, result='hit' if hit else 'miss').inc()
+
+def record_plagiarism_feature_cache(hit: bool, entries: int):
+    """Record a plagiarism featurization cache lookup"""
+    PLAGIARISM_FEATURE_CACHE_REQUESTS.labels(result='hit' if hit else 'miss').inc()
+    PLAGIARISM_FEATURE_CACHE_ENTRIES.set(entries)
@@ -0,0 +1,63 @@
+"""
+Pool of pre-started Python workers for test case execution
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import List, Optional
+
+from batch_runner import HarnessProcess, encode_frame
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python_worker.py')
+
+
+class PythonWorkerPool:
+    """Keeps `size` idle workers warm; a checked-out worker serves one submission and is then retired"""
+
+    def __init__(self, size: int, python_command: List[str]):
+        self.size = size
+        self.python_command = python_command
+        self._idle: List[HarnessProcess] = []
+        self._refilling: Optional[asyncio.Task] = None
+
+    async def _spawn(self) -> HarnessProcess:
+        return await HarnessProcess.spawn(self.python_command + [WORKER_SCRIPT])
+
+    async def _refill(self):
+        while len(self._idle) < self.size:
+            try:
+                self._idle.append(await self._spawn())
+            except Exception as e:
+                logger.warning(f"Could not start Python worker: {e}")
+                return
+
+    def warm_up(self):
+        """Start filling the idle pool in the background"""
+        self._schedule_refill()
+
+    def _schedule_refill(self):
+        if self._refilling is None or self._refilling.done():
+            self._refilling = asyncio.ensure_future(self._refill())
+
+    async def checkout(self, source: str, filename: str, cwd: str) -> HarnessProcess:
+        """Take a warm worker (or start one) and load the submission into it"""
+        worker = None
+        while self._idle:
+            candidate = self._idle.pop()
+            if candidate.alive:
+                worker = candidate
+                break
+        if worker is None:
+            worker = await self._spawn()
+        self._schedule_refill()
+
+        job = json.dumps({'source': source, 'filename': filename, 'cwd': cwd})
+        await worker.send(encode_frame([], job.encode()))
+        return worker
+
+    async def shutdown(self):
+        workers, self._idle = self._idle, []
+        await asyncio.gather(*(worker.retire() for worker in workers))
@@ -0,0 +1,143 @@
+"""
+Warm Python worker used by python_pool.PythonWorkerPool.
+
+The worker starts ahead of time with the driver's imports already loaded and
+then serves a single submission using the framed protocol from batch_runner:
+a setup frame carrying {"source", "filename", "cwd"} as JSON, followed by one
+case frame per test case, each answered with a result frame.
+
+The source is compiled once. Each test case then runs in a freshly forked
+child with the sandbox rlimits applied, so no state leaks between cases. The
+worker exits on EOF, and the pool never reuses it for another submission.
+"""
+import ast  # noqa: F401  (warm imports used by the driver)
+import io  # noqa: F401
+import json
+import os
+import resource
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+MEMORY_LIMIT_MB = int(os.environ.get('PYTHON_POOL_MEMORY_MB', '256'))
+
+
+def set_limits(timeout: float):
+    # Set memory limit (in bytes)
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT_MB * 1024 * 1024, MEMORY_LIMIT_MB * 1024 * 1024))
+    # Set CPU time limit
+    cpu_seconds = max(1, int(timeout + 0.999))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    # Disable core dumps
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    # Limit number of processes
+    resource.setrlimit(resource.RLIMIT_NPROC, (10, 10))
+
+
+def run_case(code, compile_error, filename, input_data, timeout):
+    """Fork a sandboxed child for one test case and collect its output."""
+    with tempfile.TemporaryFile() as stdin_file, \
+            tempfile.TemporaryFile() as stdout_file, \
+            tempfile.TemporaryFile() as stderr_file:
+        stdin_file.write(input_data)
+        stdin_file.seek(0)
+
+        start_time = time.time()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                os.dup2(stdin_file.fileno(), 0)
+                os.dup2(stdout_file.fileno(), 1)
+                os.dup2(stderr_file.fileno(), 2)
+                sys.stdin = open(0, 'r', closefd=False)
+                sys.stdout = open(1, 'w', closefd=False)
+                sys.stderr = open(2, 'w', closefd=False)
+                set_limits(timeout)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+                if compile_error:
+                    sys.stderr.write(compile_error)
+                    exit_code = 1
+                else:
+                    exec(code, {'__name__': '__main__', '__file__': filename})
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                try:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                finally:
+                    os._exit(exit_code)
+
+        _, status, usage = os.wait4(pid, 0)
+        execution_time = time.time() - start_time
+
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        timed_out = os.WIFSIGNALED(status) and os.WTERMSIG(status) in (signal.SIGALRM, signal.SIGXCPU, signal.SIGKILL)
+        if os.WIFSIGNALED(status):
+            returncode = -os.WTERMSIG(status)
+        else:
+            returncode = os.WEXITSTATUS(status)
+
+        return (
+            returncode,
+            timed_out,
+            execution_time,
+            usage.ru_utime + usage.ru_stime,
+            stdout_file.read(),
+            stderr_file.read(),
+        )
+
+
+def read_frame(stream):
+    """Read one frame; returns (fields, payload) or None on EOF."""
+    header = stream.readline()
+    if not header.strip():
+        return None
+    fields = [int(field) for field in header.split()]
+    payload = stream.read(fields[-1])
+    return fields[:-1], payload
+
+
+def write_result(stream, returncode, timed_out, execution_time, cpu_time, stdout, stderr):
+    header = f"{returncode} {int(timed_out)} {int(execution_time * 1_000_000)} {int(cpu_time * 1_000_000)} {len(stdout)} {len(stderr)}\n"
+    stream.write(header.encode() + stdout + stderr)
+    stream.flush()
+
+
+def main():
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    frame = read_frame(stdin)
+    if frame is None:
+        return
+    job = json.loads(frame[1])
+    filename = job.get('filename', 'solution.py')
+    if job.get('cwd'):
+        os.chdir(job['cwd'])
+
+    code = None
+    compile_error = ''
+    try:
+        code = compile(job['source'], filename, 'exec')
+    except SyntaxError:
+        compile_error = ''.join(traceback.format_exception_only(*sys.exc_info()[:2]))
+
+    while True:
+        frame = read_frame(stdin)
+        if frame is None:
+            break
+        (timeout_ms,), input_data = frame
+        result = run_case(code, compile_error, filename, input_data, timeout_ms / 1000)
+        write_result(stdout, *result)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
+import os
+
 import uvicorn
 from main import app
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8002, reload=False)
\ No newline at end of file
+    # Backend clients pool keep-alive connections; hold idle ones open longer
+    # than uvicorn's 5 s default so they are actually reused
+    keep_alive = int(os.environ.get("KEEP_ALIVE_TIMEOUT", "75"))
+    uvicorn.run(app, host="0.0.0.0", port=8002, reload=False, timeout_keep_alive=keep_alive)
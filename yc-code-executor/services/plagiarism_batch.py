@@ -0,0 +1,301 @@
+"""
+Batch Plagiarism Detection
+Finds similar pairs among many submissions without comparing every pair
+
+Each submission is normalized and reduced to a set of token shingles once.
+MinHash signatures of all shingle sets are computed with NumPy, and LSH
+banding groups submissions whose signatures agree on a whole band; only those
+candidate pairs get the full PlagiarismDetector score, spread across a process
+pool.
+
+Usage:
+    python -m services.plagiarism_batch submissions.json [--workers 4]
+
+submissions.json holds a list of {"id", "user", "code", "language"} objects.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .plagiarism_detector import PlagiarismDetector
+
+# (a * x + b) mod MERSENNE_PRIME stays below 2**64 for 32-bit x and a < 2**31
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+# Upper bound on the (permutations x shingles) matrix hashed at once
+SIGNATURE_CHUNK_CELLS = 1 << 24
+PAIRS_PER_TASK = 200
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def shingle_hashes(normalized_code: str, shingle_size: int) -> np.ndarray:
+    """32-bit hashes of every run of `shingle_size` normalized tokens"""
+
+    tokens = TOKEN_PATTERN.findall(normalized_code)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) < shingle_size:
+        shingles = {' '.join(tokens)}
+    else:
+        shingles = {
+            ' '.join(tokens[i:i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        }
+    return np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+
+def minhash_signatures(shingle_sets: List[np.ndarray], num_perm: int,
+                       seed: int = 1) -> np.ndarray:
+    """
+    MinHash signature of every shingle set, as an (n, num_perm) array
+
+    All shingles are hashed by the num_perm permutations in one vectorized pass
+    per chunk of submissions and reduced per submission with minimum.reduceat.
+    Empty sets get signatures that match nothing.
+    """
+
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 31, size=(num_perm, 1), dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, 1 << 32, size=(num_perm, 1), dtype=np.int64).astype(np.uint64)
+
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    sizes = np.array([len(s) for s in shingle_sets], dtype=np.int64)
+    empty = np.flatnonzero(sizes == 0)
+    # Distinct values per empty set, all above any real hash
+    signatures[empty] = (MAX_HASH + 1 + empty.astype(np.uint64))[:, None]
+
+    max_shingles = max(1, SIGNATURE_CHUNK_CELLS // num_perm)
+    chunk, chunk_size = [], 0
+    for index in np.flatnonzero(sizes > 0):
+        chunk.append(index)
+        chunk_size += sizes[index]
+        if chunk_size >= max_shingles:
+            _fill_signatures(signatures, chunk, shingle_sets, sizes, a, b)
+            chunk, chunk_size = [], 0
+    if chunk:
+        _fill_signatures(signatures, chunk, shingle_sets, sizes, a, b)
+    return signatures
+
+
+def _fill_signatures(signatures, chunk, shingle_sets, sizes, a, b):
+    values = np.concatenate([shingle_sets[i] for i in chunk])
+    offsets = np.concatenate(([0], np.cumsum(sizes[chunk])[:-1]))
+    permuted = ((a * values[None, :] + b) % MERSENNE_PRIME) & MAX_HASH
+    signatures[chunk] = np.minimum.reduceat(permuted, offsets, axis=1).T
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int) -> Set[Tuple[int, int]]:
+    """Pairs of rows whose signatures are identical in at least one band"""
+
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = set()
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, bucket_ids, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        bucket_ids = bucket_ids.ravel()
+        # Submissions sharing a bucket, grouped by bucket
+        members = np.flatnonzero(counts[bucket_ids] > 1)
+        if not len(members):
+            continue
+        members = members[np.argsort(bucket_ids[members], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(bucket_ids[members])) + 1
+        for bucket in np.split(members, boundaries):
+            pairs.update(combinations(bucket.tolist(), 2))
+    return pairs
+
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(codes: List[str], languages: List[str], threshold: float):
+    _worker_state['detector'] = PlagiarismDetector()
+    _worker_state['codes'] = codes
+    _worker_state['languages'] = languages
+    _worker_state['threshold'] = threshold
+
+
+def _score_pairs(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int, float, Optional[Dict]]]:
+    """Full similarity score of each pair, with details for suspicious ones"""
+
+    detector = _worker_state['detector']
+    codes = _worker_state['codes']
+    languages = _worker_state['languages']
+    scored = []
+    for i, j in pairs:
+        score = detector._calculate_similarity(codes[i], codes[j], languages[i])
+        details = None
+        if score > _worker_state['threshold']:
+            details = detector._get_similarity_details(codes[i], codes[j], languages[i])
+        scored.append((i, j, score, details))
+    return scored
+
+
+class BatchPlagiarismChecker:
+    """All-pairs plagiarism check over a batch of submissions using MinHash LSH"""
+
+    def __init__(self, detector: PlagiarismDetector = None, num_perm: int = 128,
+                 bands: int = 32, shingle_size: int = 5, workers: int = None,
+                 progress: ProgressCallback = None):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.detector = detector or PlagiarismDetector()
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress or (lambda stage, done, total: None)
+
+    @property
+    def estimated_threshold(self) -> float:
+        """Shingle Jaccard similarity at which a pair has even odds of being a candidate"""
+
+        rows = self.num_perm // self.bands
+        return (1.0 / self.bands) ** (1.0 / rows)
+
+    def candidate_pairs(self, submissions: List[Dict]) -> List[Tuple[int, int]]:
+        """Index pairs worth a full comparison; only same-language pairs are returned"""
+
+        by_language = defaultdict(list)
+        for index, submission in enumerate(submissions):
+            by_language[submission.get('language', 'python')].append(index)
+
+        shingle_sets = [None] * len(submissions)
+        for done, submission in enumerate(submissions, 1):
+            language = submission.get('language', 'python')
+            # Also warms the feature cache, which forked scoring workers inherit
+            features = self.detector.featurize(submission.get('code', ''), language)
+            shingle_sets[done - 1] = shingle_hashes(features.normalized, self.shingle_size)
+            if done % 500 == 0 or done == len(submissions):
+                self.progress('featurize', done, len(submissions))
+
+        pairs = []
+        for indices in by_language.values():
+            if len(indices) < 2:
+                continue
+            signatures = minhash_signatures(
+                [shingle_sets[i] for i in indices], self.num_perm
+            )
+            for i, j in lsh_candidate_pairs(signatures, self.bands):
+                pairs.append((indices[i], indices[j]))
+        pairs.sort()
+        self.progress('candidates', len(pairs), len(pairs))
+        return pairs
+
+    def check(self, submissions: List[Dict], threshold: float = None) -> Dict[str, Any]:
+        """Same report as PlagiarismDetector.batch_check, for candidate pairs only"""
+
+        threshold = threshold or self.detector.similarity_threshold
+        pairs = self.candidate_pairs(submissions)
+        codes = [submission.get('code', '') for submission in submissions]
+        languages = [submission.get('language', 'python') for submission in submissions]
+
+        scored = []
+        tasks = [pairs[i:i + PAIRS_PER_TASK] for i in range(0, len(pairs), PAIRS_PER_TASK)]
+        if self.workers <= 1 or len(tasks) <= 1:
+            _init_worker(codes, languages, threshold)
+            for task in tasks:
+                scored.extend(_score_pairs(task))
+                self.progress('score', len(scored), len(pairs))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(tasks)),
+                initializer=_init_worker,
+                initargs=(codes, languages, threshold)
+            ) as pool:
+                for future in as_completed(pool.submit(_score_pairs, task) for task in tasks):
+                    scored.extend(future.result())
+                    self.progress('score', len(scored), len(pairs))
+
+        reports = []
+        for i, j, similarity_score, details in scored:
+            if similarity_score <= threshold:
+                continue
+            submission1, submission2 = submissions[i], submissions[j]
+            reports.append({
+                'submission1_id': submission1.get('id'),
+                'submission2_id': submission2.get('id'),
+                'user1': submission1.get('user', 'Unknown'),
+                'user2': submission2.get('user', 'Unknown'),
+                'similarity_score': similarity_score,
+                'flagged': similarity_score > self.detector.high_similarity_threshold,
+                'details': details
+            })
+
+        reports.sort(key=lambda x: x['similarity_score'], reverse=True)
+
+        return {
+            'total_comparisons': len(pairs),
+            'flagged_pairs': len([r for r in reports if r['flagged']]),
+            'suspicious_pairs': len(reports),
+            'reports': reports
+        }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Check a batch of submissions against each other for plagiarism'
+    )
+    parser.add_argument('submissions', help='JSON file with a list of submissions, or - for stdin')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Report pairs scoring above this (default: 0.3)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Scoring processes (default: number of CPU cores)')
+    parser.add_argument('--num-perm', type=int, default=128, help='MinHash permutations')
+    parser.add_argument('--bands', type=int, default=32, help='LSH bands')
+    parser.add_argument('--output', default='-', help='Report file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    if args.submissions == '-':
+        submissions = json.load(sys.stdin)
+    else:
+        with open(args.submissions) as f:
+            submissions = json.load(f)
+
+    started = time.time()
+
+    def report_progress(stage: str, done: int, total: int):
+        print(f'[{time.time() - started:7.1f}s] {stage}: {done}/{total}',
+              file=sys.stderr, flush=True)
+
+    checker = BatchPlagiarismChecker(
+        num_perm=args.num_perm, bands=args.bands, workers=args.workers,
+        progress=report_progress
+    )
+    print(f'Comparing pairs above ~{checker.estimated_threshold:.0%} shingle overlap',
+          file=sys.stderr)
+    report = checker.check(submissions, threshold=args.threshold)
+    print(f'{len(submissions)} submissions, {report["total_comparisons"]} candidate pairs '
+          f'compared, {report["suspicious_pairs"]} suspicious, '
+          f'{report["flagged_pairs"]} flagged', file=sys.stderr)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,15 +4,78 @@ Uses multiple algorithms to detect code similarity
 """
 
 import difflib
+import os
 import re
 import ast
 import hashlib
-from typing import Dict, List, Any, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Any, NamedTuple, Optional, Tuple
 from fuzzywuzzy import fuzz
 import logging
 
+from observability import record_plagiarism_feature_cache
+
 logger = logging.getLogger(__name__)
 
+FEATURE_CACHE_SIZE = int(os.environ.get('PLAGIARISM_FEATURE_CACHE_SIZE', '4096'))
+
+
+class CodeFeatures(NamedTuple):
+    """Everything the similarity measures need from one submission"""
+    normalized: str
+    tokens: FrozenSet[str]
+    ast_features: Optional[Dict[str, int]]  # None unless Python that parses
+
+
+class FeatureCache:
+    """Bounded LRU of CodeFeatures keyed by a hash of language and code"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(code: str, language: str) -> str:
+        return hashlib.sha256(f'{language}\0{code}'.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[CodeFeatures]:
+        with self._lock:
+            features = self._entries.get(key)
+            if features is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            entries = len(self._entries)
+        record_plagiarism_feature_cache(features is not None, entries)
+        return features
+    
+    def put(self, key: str, features: CodeFeatures):
+        with self._lock:
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# Shared by every detector in the process
+feature_cache = FeatureCache(FEATURE_CACHE_SIZE)
+
+
 class PlagiarismDetector:
     """Advanced plagiarism detection using multiple techniques"""
     
@@ -52,10 +115,19 @@ class PlagiarismDetector:
             'analysis': self._generate_analysis(max_similarity, len(similarities))
         }
     
-    def batch_check(self, submissions: List[Dict], threshold: float = None) -> Dict[str, Any]:
-        """Check all submissions against each other for plagiarism"""
+    def batch_check(self, submissions: List[Dict], threshold: float = None,
+                    exhaustive: bool = False, workers: int = None) -> Dict[str, Any]:
+        """Check all submissions against each other for plagiarism
+        
+        By default only the pairs MinHash LSH picks as candidates are scored (see
+        plagiarism_batch.py); with `exhaustive` every pair is compared.
+        """
         
         threshold = threshold or self.similarity_threshold
+        if not exhaustive:
+            from .plagiarism_batch import BatchPlagiarismChecker
+            return BatchPlagiarismChecker(self, workers=workers).check(submissions, threshold)
+        
         reports = []
         
         for i, submission1 in enumerate(submissions):
@@ -91,12 +163,28 @@ class PlagiarismDetector:
             'reports': reports
         }
     
+    def featurize(self, code: str, language: str) -> CodeFeatures:
+        """Normalized text, token set and AST features of code, computed once per content"""
+        
+        key = feature_cache.make_key(code, language)
+        features = feature_cache.get(key)
+        if features is None:
+            normalized = self._normalize_code(code, language)
+            features = CodeFeatures(
+                normalized=normalized,
+                tokens=self._token_set(normalized),
+                ast_features=self._parse_ast_features(code, language)
+            )
+            feature_cache.put(key, features)
+        return features
+    
     def _calculate_similarity(self, code1: str, code2: str, language: str) -> float:
         """Calculate similarity using multiple algorithms"""
         
-        # Normalize codes
-        norm_code1 = self._normalize_code(code1, language)
-        norm_code2 = self._normalize_code(code2, language)
+        features1 = self.featurize(code1, language)
+        features2 = self.featurize(code2, language)
+        norm_code1 = features1.normalized
+        norm_code2 = features2.normalized
         
         if not norm_code1 or not norm_code2:
             return 0.0
@@ -113,11 +201,11 @@ class PlagiarismDetector:
         similarities.append(fuzzy_similarity * 0.3)  # 30% weight
         
         # 3. Token-based similarity
-        token_similarity = self._token_similarity(norm_code1, norm_code2, language)
+        token_similarity = self._jaccard(features1.tokens, features2.tokens)
         similarities.append(token_similarity * 0.2)  # 20% weight
         
         # 4. Structure similarity (for supported languages)
-        struct_similarity = self._structure_similarity(code1, code2, language)
+        struct_similarity = self._feature_similarity(features1, features2)
         similarities.append(struct_similarity * 0.1)  # 10% weight
         
         return sum(similarities)
@@ -151,13 +239,15 @@ class PlagiarismDetector:
         
         return code.strip()
     
+    def _token_set(self, code: str) -> FrozenSet[str]:
+        """Simple tokenization"""
+        return frozenset(re.findall(r'\w+', code.lower()))
+    
     def _token_similarity(self, code1: str, code2: str, language: str) -> float:
         """Calculate similarity based on tokens"""
-        
-        # Simple tokenization
-        tokens1 = set(re.findall(r'\w+', code1.lower()))
-        tokens2 = set(re.findall(r'\w+', code2.lower()))
-        
+        return self._jaccard(self._token_set(code1), self._token_set(code2))
+    
+    def _jaccard(self, tokens1: FrozenSet[str], tokens2: FrozenSet[str]) -> float:
         if not tokens1 or not tokens2:
             return 0.0
         
@@ -169,24 +259,23 @@ class PlagiarismDetector:
     
     def _structure_similarity(self, code1: str, code2: str, language: str) -> float:
         """Calculate structural similarity (AST-based for Python)"""
-        
+        return self._feature_similarity(
+            self.featurize(code1, language), self.featurize(code2, language)
+        )
+    
+    def _feature_similarity(self, features1: CodeFeatures, features2: CodeFeatures) -> float:
+        # Only implemented for Python; code that does not parse scores 0
+        if features1.ast_features is None or features2.ast_features is None:
+            return 0.0
+        return self._compare_features(features1.ast_features, features2.ast_features)
+    
+    def _parse_ast_features(self, code: str, language: str) -> Optional[Dict[str, int]]:
         if language != 'python':
-            return 0.0  # Only implemented for Python
-        
+            return None
         try:
-            # Parse ASTs
-            tree1 = ast.parse(code1)
-            tree2 = ast.parse(code2)
-            
-            # Extract structural features
-            features1 = self._extract_ast_features(tree1)
-            features2 = self._extract_ast_features(tree2)
-            
-            # Compare features
-            return self._compare_features(features1, features2)
-            
+            return self._extract_ast_features(ast.parse(code))
         except SyntaxError:
-            return 0.0
+            return None
     
     def _extract_ast_features(self, tree: ast.AST) -> Dict[str, int]:
         """Extract features from AST"""
@@ -236,14 +325,16 @@ class PlagiarismDetector:
     def _get_similarity_details(self, code1: str, code2: str, language: str) -> Dict[str, Any]:
         """Get detailed similarity analysis"""
         
-        norm_code1 = self._normalize_code(code1, language)
-        norm_code2 = self._normalize_code(code2, language)
+        features1 = self.featurize(code1, language)
+        features2 = self.featurize(code2, language)
+        norm_code1 = features1.normalized
+        norm_code2 = features2.normalized
         
         return {
             'sequence_similarity': difflib.SequenceMatcher(None, norm_code1, norm_code2).ratio(),
             'fuzzy_similarity': fuzz.ratio(norm_code1, norm_code2) / 100.0,
-            'token_similarity': self._token_similarity(norm_code1, norm_code2, language),
-            'structure_similarity': self._structure_similarity(code1, code2, language),
+            'token_similarity': self._jaccard(features1.tokens, features2.tokens),
+            'structure_similarity': self._feature_similarity(features1, features2),
             'common_lines': len(set(code1.split('\n')).intersection(set(code2.split('\n')))),
             'total_lines1': len(code1.split('\n')),
             'total_lines2': len(code2.split('\n'))
@@ -0,0 +1,8 @@
+"""
+Tests run from the service directory (`python -m pytest tests`), which holds
+the modules as plain top-level files.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,195 @@
+"""
+batch_runner framing: HarnessProcess against scripted harnesses, HarnessSession
+recycling, and the C harness end to end.
+"""
+import asyncio
+import shutil
+import sys
+
+import pytest
+
+import main
+from batch_runner import HarnessError, HarnessProcess, HarnessSession, encode_frame
+
+# Speaks the result side of the protocol in one of several (mis)behaviours
+FAKE_HARNESS = r'''
+import sys
+
+mode = sys.argv[1]
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    header = stdin.readline()
+    if not header.strip():
+        break
+    timeout_ms, length = map(int, header.split())
+    data = stdin.read(length)
+    if mode == 'echo':
+        out, err = data.upper(), b'log'
+        stdout.write(b'0 0 1500 700 %d %d\n' % (len(out), len(err)) + out + err)
+    elif mode == 'timeout':
+        stdout.write(b'-14 1 %d 0 0 0\n' % (timeout_ms * 1000))
+    elif mode == 'partial':
+        stdout.write(b'0 0 1 1 100 0\nshort')
+        stdout.flush()
+        sys.exit(0)
+    elif mode == 'garbage':
+        stdout.write(b'not a header\n')
+    elif mode == 'exit':
+        sys.exit(3)
+    elif mode == 'hang':
+        continue
+    stdout.flush()
+'''
+
+
+@pytest.fixture
+def spawn_fake(tmp_path):
+    script = tmp_path / 'fake_harness.py'
+    script.write_text(FAKE_HARNESS)
+
+    def spawn(mode):
+        return HarnessProcess.spawn([sys.executable, str(script), mode])
+
+    return spawn
+
+
+def run_case(spawn_fake, mode, input_data, timeout=5):
+    async def run():
+        harness = await spawn_fake(mode)
+        try:
+            return await harness.run(input_data, timeout)
+        finally:
+            await harness.retire()
+
+    return asyncio.run(run())
+
+
+def test_frames_end_with_the_payload_length():
+    """Integers are space separated and the payload length comes last"""
+    assert encode_frame([1500], b'1 2\n') == b'1500 4\n1 2\n'
+    assert encode_frame([], b'') == b'0\n'
+
+
+def test_result_frame_is_parsed(spawn_fake):
+    """Output, exit code and timings come from the result frame"""
+    result = run_case(spawn_fake, 'echo', 'abc\n')
+    assert result == {
+        'stdout': 'ABC\n',
+        'stderr': 'log',
+        'returncode': 0,
+        'timed_out': False,
+        'execution_time': 0.0015,
+        'cpu_time': 0.0007,
+    }
+
+
+def test_oversized_output_is_read_whole(spawn_fake):
+    """Payloads far larger than a pipe buffer are framed exactly"""
+    data = 'x' * (8 * 1024 * 1024) + '\n'
+    result = run_case(spawn_fake, 'echo', data)
+    assert len(result['stdout']) == len(data)
+    assert result['stderr'] == 'log'
+
+
+@pytest.mark.parametrize('mode, message', [
+    ('partial', 'Malformed harness result'),
+    ('garbage', 'Malformed harness result'),
+    ('exit', 'Harness exited unexpectedly'),
+])
+def test_broken_frames_raise_harness_error(spawn_fake, mode, message):
+    """Short payloads, bad headers and exits are HarnessErrors"""
+    with pytest.raises(HarnessError, match=message):
+        run_case(spawn_fake, mode, 'abc\n')
+
+
+def test_silent_harness_times_out(spawn_fake):
+    """A harness that never answers raises TimeoutError after the margin"""
+    with pytest.raises(asyncio.TimeoutError):
+        run_case(spawn_fake, 'hang', 'abc\n', timeout=0.1)
+
+
+def test_session_replaces_timed_out_harnesses(spawn_fake):
+    """A harness reporting a timeout is killed and replaced before the next case"""
+    spawned = []
+
+    async def spawn():
+        harness = await spawn_fake('timeout' if not spawned else 'echo')
+        spawned.append(harness)
+        return harness
+
+    async def run():
+        async with HarnessSession(spawn, workers=1) as session:
+            first = await session.run('a\n', 0.5)
+            second = await session.run('b\n', 0.5)
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert first['timed_out']
+    assert first['execution_time'] == 0.5
+    assert second['stdout'] == 'B\n'
+    assert len(spawned) == 2
+    assert not any(harness.alive for harness in spawned)
+
+
+def test_session_keeps_healthy_harnesses(spawn_fake):
+    """Cases share the session's harnesses while they keep answering"""
+    spawned = []
+
+    async def spawn():
+        harness = await spawn_fake('echo')
+        spawned.append(harness)
+        return harness
+
+    async def run():
+        async with HarnessSession(spawn, workers=2) as session:
+            return await asyncio.gather(*(session.run(f'{i}\n', 5) for i in range(6)))
+
+    results = asyncio.run(run())
+    assert [result['stdout'] for result in results] == [f'{i}\n' for i in range(6)]
+    assert len(spawned) == 2
+
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason='gcc is not installed')
+def test_c_harness_end_to_end(monkeypatch):
+    """C cases run on the batch harness, in order, including large outputs"""
+    monkeypatch.setattr(main, 'EXECUTOR_MAX_PARALLELISM', 2)
+    monkeypatch.setattr(main, '_execution_slots', asyncio.Semaphore(2))
+    monkeypatch.setattr(main, 'BATCH_RUNNER_ENABLED', True)
+    sessions = []
+
+    class RecordingSession(HarnessSession):
+        async def __aenter__(self):
+            sessions.append(self)
+            return await super().__aenter__()
+
+    monkeypatch.setattr(main, 'HarnessSession', RecordingSession)
+    code = '''
+#include <stdio.h>
+#include <stdlib.h>
+int main() {
+    int n;
+    if (scanf("%d", &n) != 1) return 1;
+    if (n < 0) { fprintf(stderr, "negative"); exit(2); }
+    for (int i = 0; i < n; i++) putchar('x');
+    if (n == 0) printf("zero");
+    return 0;
+}
+'''
+    big = 2 * 1024 * 1024
+    request = main.CodeExecutionWithTestsRequest(
+        code=code,
+        language='c',
+        test_cases_basic=[
+            main.TestCase(input='3', expected_output='xxx'),
+            main.TestCase(input=str(big), expected_output='x' * big),
+            main.TestCase(input='-1', expected_output=''),
+            main.TestCase(input='0', expected_output='zero'),
+        ],
+        timeout=5,
+    )
+    response = asyncio.run(main.evaluate_submission(request))
+
+    assert len(sessions) == 1
+    assert [result.passed for result in response.test_results] == [True, True, True, True]
+    assert response.test_results[2].console_output == 'negative'
+    assert all(result.cpu_time >= 0 for result in response.test_results)
@@ -0,0 +1,122 @@
+"""
+CompileCache: hits, misses, eviction, and compile_program reusing cached builds.
+"""
+import asyncio
+import os
+import shutil
+
+import pytest
+from prometheus_client import REGISTRY
+
+import main
+from compile_cache import CompileCache
+
+
+def lookups(language, result):
+    return REGISTRY.get_sample_value(
+        'compile_cache_requests_total', {'language': language, 'result': result}
+    ) or 0
+
+
+def build(directory, name, size):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(b'x' * size)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompileCache(str(tmp_path / 'cache'), max_bytes=250)
+
+
+def test_keys_depend_on_language_flags_and_source():
+    """Any change to what goes into a build gives another key"""
+    key = CompileCache.make_key('c', ['gcc', '-o'], 'int main(){}')
+    assert key == CompileCache.make_key('c', ['gcc', '-o'], 'int main(){}')
+    assert key != CompileCache.make_key('cpp', ['gcc', '-o'], 'int main(){}')
+    assert key != CompileCache.make_key('c', ['gcc', '-O2'], 'int main(){}')
+    assert key != CompileCache.make_key('c', ['gcc', '-o'], 'int main(){ }')
+    # Parts are delimited, so moving text between them changes the key
+    assert CompileCache.make_key('c', ['a'], 'b') != CompileCache.make_key('c', [], 'ab')
+
+
+def test_miss_then_hit(cache, tmp_path):
+    """A stored build is copied back on the next lookup for its key"""
+    misses, hits = lookups('c', 'miss'), lookups('c', 'hit')
+    dest = tmp_path / 'run'
+    dest.mkdir()
+    assert not cache.restore('k1', 'c', str(dest))
+    assert lookups('c', 'miss') == misses + 1
+
+    build(tmp_path / 'build', 'solution', 10)
+    cache.store('k1', str(tmp_path / 'build'), ['solution'])
+    assert cache.restore('k1', 'c', str(dest))
+    assert (dest / 'solution').read_bytes() == b'x' * 10
+    assert lookups('c', 'hit') == hits + 1
+    # Nothing is left half written in the cache directory
+    assert os.listdir(cache.cache_dir) == ['k1']
+
+
+def test_store_keeps_the_first_published_entry(cache, tmp_path):
+    """Storing an existing key again leaves the published entry alone"""
+    build(tmp_path / 'first', 'solution', 10)
+    build(tmp_path / 'second', 'solution', 20)
+    cache.store('k1', str(tmp_path / 'first'), ['solution'])
+    cache.store('k1', str(tmp_path / 'second'), ['solution'])
+    assert os.path.getsize(os.path.join(cache.cache_dir, 'k1', 'solution')) == 10
+    assert os.listdir(cache.cache_dir) == ['k1']
+
+
+def test_least_recently_used_entries_are_evicted(cache, tmp_path):
+    """Past max_bytes, entries not used for the longest time go first"""
+    for index, key in enumerate(['a', 'b']):
+        build(tmp_path / key, 'solution', 100)
+        cache.store(key, str(tmp_path / key), ['solution'])
+        os.utime(os.path.join(cache.cache_dir, key), (1000 + index, 1000 + index))
+    # A hit makes the oldest entry the most recently used one
+    assert cache.restore('a', 'c', str(tmp_path / 'a'))
+
+    build(tmp_path / 'c', 'solution', 100)
+    cache.store('c', str(tmp_path / 'c'), ['solution'])
+    assert sorted(os.listdir(cache.cache_dir)) == ['a', 'c']
+    assert REGISTRY.get_sample_value('compile_cache_size_bytes') == 200
+
+
+def test_disabled_cache_never_hits(tmp_path):
+    """With the cache disabled nothing is stored or restored"""
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=250, enabled=False)
+    build(tmp_path / 'build', 'solution', 10)
+    cache.store('k1', str(tmp_path / 'build'), ['solution'])
+    assert not cache.restore('k1', 'c', str(tmp_path / 'build'))
+    assert not os.path.exists(cache.cache_dir)
+
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason='gcc is not installed')
+def test_compile_program_reuses_cached_builds(monkeypatch, tmp_path):
+    """The compiler runs once for two identical submissions"""
+    monkeypatch.setattr(main, 'compile_cache', CompileCache(str(tmp_path / 'cache'), 10 * 1024 * 1024))
+    compiles = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def counting_exec(*command, **kwargs):
+        compiles.append(command[0])
+        return await create_subprocess_exec(*command, **kwargs)
+
+    monkeypatch.setattr(main.asyncio, 'create_subprocess_exec', counting_exec)
+    source = '#include <stdio.h>\nint main(){ printf("hi"); return 0; }\n'
+
+    for run in ('first', 'second'):
+        temp_dir = tmp_path / run
+        temp_dir.mkdir()
+        (temp_dir / 'solution.c').write_text(source)
+        error = asyncio.run(main.compile_program('c', source, str(temp_dir), 'solution.c', 10))
+        assert error is None
+        assert (temp_dir / 'solution').exists()
+    assert compiles == ['gcc']
+
+    # A different source is compiled again
+    temp_dir = tmp_path / 'third'
+    temp_dir.mkdir()
+    (temp_dir / 'solution.c').write_text(source + '\n')
+    asyncio.run(main.compile_program('c', source + '\n', str(temp_dir), 'solution.c', 10))
+    assert compiles == ['gcc', 'gcc']
@@ -0,0 +1,155 @@
+"""
+evaluate_submission: result ordering, parallelism bounds, stop-on-first-failure
+and the per-case timeout.
+"""
+import asyncio
+
+import pytest
+
+import main
+from python_pool import PythonWorkerPool
+
+DOUBLER = '''
+class Solution:
+    def solve(self, n):
+        if n < 0:
+            while True:
+                pass
+        return n * 2
+'''
+
+
+@pytest.fixture(autouse=True)
+def execution_slots(monkeypatch):
+    # The service-wide semaphore belongs to the event loop of each test
+    monkeypatch.setattr(main, 'EXECUTOR_MAX_PARALLELISM', 4)
+    monkeypatch.setattr(main, '_execution_slots', asyncio.Semaphore(4))
+    monkeypatch.setattr(main, 'PYTHON_POOL_ENABLED', False)
+
+
+def cases(*inputs):
+    return [main.TestCase(input=value, expected_output=value) for value in inputs]
+
+
+def fake_runner(monkeypatch, delays=None, failing=()):
+    """Replace run_test_case; returns the inputs run and the peak concurrency"""
+    state = {'ran': [], 'running': 0, 'peak': 0}
+
+    async def run_test_case(test_case, language, run_cmd, cwd, timeout, session=None):
+        state['ran'].append(test_case.input)
+        state['running'] += 1
+        state['peak'] = max(state['peak'], state['running'])
+        await asyncio.sleep((delays or {}).get(test_case.input, 0))
+        state['running'] -= 1
+        passed = test_case.input not in failing
+        return main.TestResult(
+            passed=passed,
+            input=test_case.input,
+            expected_output=test_case.expected_output,
+            actual_output=test_case.input if passed else '',
+            error='' if passed else 'Wrong answer',
+            execution_time=0,
+        )
+
+    monkeypatch.setattr(main, 'run_test_case', run_test_case)
+    return state
+
+
+def evaluate(request, on_result=None):
+    return asyncio.run(main.evaluate_submission(request, on_result))
+
+
+def test_results_keep_submission_order_under_parallelism(monkeypatch):
+    """Cases finishing out of order are reported in the order they were given"""
+    state = fake_runner(monkeypatch, delays={'a': 0.3, 'b': 0.2, 'c': 0.1, 'd': 0.05, 'e': 0})
+    finished = []
+
+    async def on_result(index, result):
+        finished.append(index)
+
+    request = main.CodeExecutionWithTestsRequest(
+        code='', language='python',
+        test_cases_basic=cases('a', 'b', 'c'),
+        test_cases_advanced=cases('d'),
+        test_cases_custom=cases('e'),
+        max_parallelism=3,
+    )
+    response = evaluate(request, on_result)
+
+    assert [result.input for result in response.test_results] == ['a', 'b', 'c', 'd', 'e']
+    assert [result.input for result in response.basic_results] == ['a', 'b', 'c']
+    assert [result.input for result in response.advanced_results] == ['d']
+    assert [result.input for result in response.custom_results] == ['e']
+    assert response.total_passed == 5
+    assert finished != sorted(finished)
+    assert sorted(finished) == [0, 1, 2, 3, 4]
+    assert state['peak'] == 3
+
+
+def test_parallelism_is_capped_by_the_service_limit(monkeypatch):
+    """max_parallelism above EXECUTOR_MAX_PARALLELISM is cut down to it"""
+    state = fake_runner(monkeypatch, delays={value: 0.05 for value in 'abcdefgh'})
+    request = main.CodeExecutionWithTestsRequest(
+        code='', language='python', test_cases_basic=cases(*'abcdefgh'), max_parallelism=50,
+    )
+    evaluate(request)
+    assert state['peak'] == 4
+
+
+def test_stop_on_first_failure_skips_the_remaining_cases(monkeypatch):
+    """After a failure, cases not started yet are reported as skipped"""
+    state = fake_runner(monkeypatch, failing={'b'})
+    request = main.CodeExecutionWithTestsRequest(
+        code='', language='python', test_cases_basic=cases('a', 'b', 'c', 'd'),
+        max_parallelism=1, stop_on_first_failure=True,
+    )
+    response = evaluate(request)
+
+    assert state['ran'] == ['a', 'b']
+    assert [result.passed for result in response.test_results] == [True, False, False, False]
+    assert response.test_results[1].error == 'Wrong answer'
+    assert [result.error for result in response.test_results[2:]] == [main.SKIPPED_TEST_ERROR] * 2
+    assert response.total_passed == 1
+
+
+def test_failures_do_not_stop_other_cases_by_default(monkeypatch):
+    """Without stop_on_first_failure every case runs"""
+    state = fake_runner(monkeypatch, failing={'a'})
+    request = main.CodeExecutionWithTestsRequest(
+        code='', language='python', test_cases_basic=cases('a', 'b', 'c'), max_parallelism=1,
+    )
+    response = evaluate(request)
+    assert state['ran'] == ['a', 'b', 'c']
+    assert response.total_passed == 2
+
+
+@pytest.mark.parametrize('pooled', [False, True])
+def test_per_case_timeout(monkeypatch, pooled):
+    """A case running past the timeout fails alone; its neighbours still pass"""
+    monkeypatch.setattr(main, 'PYTHON_POOL_ENABLED', pooled)
+    request = main.CodeExecutionWithTestsRequest(
+        code=DOUBLER,
+        language='python',
+        test_cases_basic=[
+            main.TestCase(input='1', expected_output='2'),
+            main.TestCase(input='-1', expected_output='0'),
+            main.TestCase(input='3', expected_output='6'),
+        ],
+        timeout=1,
+        max_parallelism=2,
+    )
+
+    async def run():
+        pool = PythonWorkerPool(size=1, python_command=main.LANGUAGE_CONFIGS['python']['command'])
+        monkeypatch.setattr(main, 'python_pool', pool)
+        try:
+            return await main.evaluate_submission(request)
+        finally:
+            await pool.shutdown()
+
+    response = asyncio.run(run())
+
+    assert [result.passed for result in response.test_results] == [True, False, True]
+    assert response.test_results[1].error == 'Timeout'
+    assert response.test_results[1].execution_time == 1
+    assert [result.actual_output for result in response.test_results] == ['2', '', '6']
@@ -0,0 +1,121 @@
+"""
+PythonWorkerPool and python_worker: warm workers, isolated cases, timeouts.
+"""
+import asyncio
+import sys
+
+from python_pool import PythonWorkerPool
+
+COUNTER = '''
+import sys
+calls = globals().setdefault('calls', [])
+calls.append(1)
+print(int(sys.stdin.read()) * 2, len(calls))
+'''
+
+
+def with_pool(test, size=1):
+    """Run test(pool) on a fresh pool in its own event loop, then shut it down"""
+
+    async def run():
+        pool = PythonWorkerPool(size=size, python_command=[sys.executable])
+        try:
+            return await test(pool)
+        finally:
+            await pool.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_cases_run_in_isolated_forks(tmp_path):
+    """State left by one case is not seen by the next one on the same worker"""
+
+    async def test(pool):
+        worker = await pool.checkout(COUNTER, 'solution.py', str(tmp_path))
+        try:
+            return [await worker.run(value, 5) for value in ('1\n', '2\n', '3\n')]
+        finally:
+            await worker.retire()
+
+    results = with_pool(test)
+    assert [result['stdout'] for result in results] == ['2 1\n', '4 1\n', '6 1\n']
+    assert all(result['returncode'] == 0 and not result['timed_out'] for result in results)
+
+
+def test_timeout_kills_the_case_not_the_worker(tmp_path):
+    """A case past its timeout is reported as timed out and the worker carries on"""
+    source = 'import sys\nif sys.stdin.read().strip() == "hang":\n    while True: pass\nprint("ok")\n'
+
+    async def test(pool):
+        worker = await pool.checkout(source, 'solution.py', str(tmp_path))
+        try:
+            hung = await worker.run('hang\n', 0.5)
+            after = await worker.run('go\n', 5)
+            return hung, after, worker.alive
+        finally:
+            await worker.retire()
+
+    hung, after, alive = with_pool(test)
+    assert hung['timed_out']
+    assert hung['execution_time'] < 3
+    assert after['stdout'] == 'ok\n'
+    assert alive
+
+
+def test_errors_are_reported_per_case(tmp_path):
+    """Syntax errors and exceptions come back as the case's stderr and exit code"""
+
+    async def test(pool):
+        broken = await pool.checkout('def f(:\n', 'solution.py', str(tmp_path))
+        failing = await pool.checkout('raise ValueError("bad")\n', 'solution.py', str(tmp_path))
+        try:
+            return await broken.run('', 5), await failing.run('', 5)
+        finally:
+            await asyncio.gather(broken.retire(), failing.retire())
+
+    broken, failing = with_pool(test, size=2)
+    assert broken['returncode'] == 1
+    assert 'SyntaxError' in broken['stderr']
+    assert failing['returncode'] == 1
+    assert 'ValueError: bad' in failing['stderr']
+
+
+def test_pool_refills_and_skips_dead_workers(tmp_path):
+    """Checked out and dead workers are replaced so `size` stay warm"""
+
+    async def test(pool):
+        pool.warm_up()
+        await pool._refilling
+        assert len(pool._idle) == 2
+        dead = pool._idle[-1]
+        await dead.retire()
+
+        worker = await pool.checkout('print("hi")\n', 'solution.py', str(tmp_path))
+        try:
+            assert worker is not dead
+            assert worker.alive
+            await pool._refilling
+            assert len(pool._idle) == 2
+            assert dead not in pool._idle
+            return await worker.run('', 5)
+        finally:
+            await worker.retire()
+
+    result = with_pool(test, size=2)
+    assert result['stdout'] == 'hi\n'
+
+
+def test_shutdown_retires_idle_workers():
+    """Shutdown stops every idle worker"""
+
+    async def test(pool):
+        pool.warm_up()
+        await pool._refilling
+        idle = list(pool._idle)
+        await pool.shutdown()
+        return idle, pool._idle
+
+    idle, remaining = with_pool(test, size=2)
+    assert len(idle) == 2
+    assert remaining == []
+    assert not any(worker.alive for worker in idle)
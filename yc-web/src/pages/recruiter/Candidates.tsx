@@ -207,9 +207,16 @@ const Candidates = () => {
     }));
   };
 
-  const handleViewDetails = (candidate: Candidate) => {
+  const handleViewDetails = async (candidate: Candidate) => {
     setSelectedCandidate(candidate);
     setIsDetailsModalOpen(true);
+    try {
+      // Search results only carry the card fields; load the full profile
+      const details = await candidateService.getCandidate(candidate.id);
+      setSelectedCandidate(current => (current?.id === candidate.id ? details : current));
+    } catch (error) {
+      console.error('Error loading candidate details:', error);
+    }
   };
 
   const handleCloseDetailsModal = () => {
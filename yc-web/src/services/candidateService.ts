@@ -1,4 +1,5 @@
 import restApiAuthUtil from '../utils/RestApiAuthUtil';
+import type { CursorPage } from './jobService';
 
 export interface CandidateSearchFilters {
   skills?: string;
@@ -16,6 +17,8 @@ export interface CandidateSearchFilters {
   active_in_days?: number;
   page?: number;
   page_size?: number;
+  cursor?: string;
+  exact_count?: boolean;
 }
 
 export interface CandidateSkill {
@@ -125,6 +128,7 @@ export interface CandidateSearchResult {
   total_pages: number;
   has_next: boolean;
   has_previous: boolean;
+  next_cursor: string | null;
 }
 
 export interface CandidateStats {
@@ -170,8 +174,8 @@ export const candidateService = {
     return restApiAuthUtil.get(`/jobs/candidates/job-profiles/${candidateId}/`);
   },
 
-  async getAllCandidates(): Promise<Candidate[]> {
-    return restApiAuthUtil.get('/jobs/candidates/job-profiles/');
+  async getAllCandidates(cursor?: string): Promise<CursorPage<Candidate>> {
+    return restApiAuthUtil.get('/jobs/candidates/job-profiles/', cursor ? { params: { cursor } } : undefined);
   }
 };
 
@@ -63,7 +63,28 @@ export interface ExecutionResult extends CodeSubmission {
   plagiarism_flagged: boolean;
 }
 
+// Submissions evaluated by the backend's submission workers
+const QUEUED_SUBMISSION_TYPES = ['learn', 'practice'];
+const SUBMISSION_POLL_INTERVAL_MS = 500;
+const SUBMISSION_WAIT_LIMIT_MS = 120000;
+
 class CodeEditorService {
+  private async waitForSubmissionJob(job: any): Promise<any> {
+    const deadline = Date.now() + SUBMISSION_WAIT_LIMIT_MS;
+    let current: any = job;
+    while (current.status === 'queued' || current.status === 'running') {
+      if (Date.now() > deadline) {
+        throw new Error('Timed out waiting for the submission to be evaluated');
+      }
+      await new Promise((resolve) => setTimeout(resolve, SUBMISSION_POLL_INTERVAL_MS));
+      current = await restApiAuthUtil.get(`/course/submission-jobs/${job.job_id}/`);
+    }
+    if (current.status === 'failed') {
+      throw new Error(current.result?.error || current.result?.error_message || current.error || 'Submission failed');
+    }
+    return current.result;
+  }
+
   async runCode(request: {
     code: string;
     language: string;
@@ -86,7 +107,8 @@ class CodeEditorService {
           expected_output: tc.expected_output || '',
           weight: 1
         })),
-        timeout: 10
+        timeout: 10,
+        stop_on_first_failure: true
       });
 
       const executionResult = data.execution_result || {};
@@ -189,7 +211,9 @@ class CodeEditorService {
           endpoint = '/course/student-code-practices/submit/';
       }
 
-      const response: any = await restApiAuthUtil.post(endpoint, payload);
+      const response: any = QUEUED_SUBMISSION_TYPES.includes(submissionType)
+        ? await this.waitForSubmissionJob(await restApiAuthUtil.post(endpoint, { ...payload, async: true }))
+        : await restApiAuthUtil.post(endpoint, payload);
 
       return {
         id: response.id || 0,
@@ -60,8 +60,32 @@ export interface Question {
     };
 }
 
+// A page of a cursor-paginated listing; `next` links to the following page
+export interface CursorPage<T> {
+    next: string | null;
+    previous: string | null;
+    results: T[];
+    count?: number;
+}
+
+export const pageParams = (link: string): Record<string, string> =>
+    Object.fromEntries(new URL(link).searchParams.entries());
+
+// Deliberate compatibility shim: the student Jobs page searches and filters
+// the whole list in the browser, so this follows every cursor page and returns
+// one array as the unpaginated endpoint did. Screens that can page through
+// results should request CursorPage<Job> themselves and follow `next` on demand.
 export const fetchJobs = async (): Promise<Job[]> => {
-    return restApiAuthUtil.get('/jobs/');
+    const jobs: Job[] = [];
+    let params: Record<string, string> = { page_size: '100' };
+    for (;;) {
+        const page = await restApiAuthUtil.get<CursorPage<Job>>('/jobs/', { params });
+        jobs.push(...page.results);
+        if (!page.next) {
+            return jobs;
+        }
+        params = pageParams(page.next);
+    }
 };
 
 export interface CreateJobData {
@@ -132,8 +156,8 @@ export const jobService = {
         return restApiAuthUtil.delete(`/jobs/${jobId}/`);
     },
 
-    async filterJobs(filters: JobFilterData): Promise<Job[]> {
-        return restApiAuthUtil.post('/jobs/filter/', filters);
+    async filterJobs(filters: JobFilterData, cursor?: string): Promise<CursorPage<Job>> {
+        return restApiAuthUtil.post('/jobs/filter/', filters, cursor ? { params: { cursor } } : undefined);
     },
 
     async applyToJob(jobId: string, applicationData?: any): Promise<any> {